@@ -21,6 +21,7 @@ sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 from data_loader import DataLoader
 from feature_engineering import FeatureEngineer
 from model_train import StockDirectionPredictor
+from model_registry import get_model_registry
 from backtest import Backtester
 from live_trade import PaperTrader
 
@@ -491,17 +492,14 @@ def main():
     with tab2:
         st.header("🤖 Model Tahminleri")
         
-        # Model yükleme
-        model_files = []
-        if os.path.exists('src/models'):
-            model_files = [f for f in os.listdir('src/models') if f.endswith('.joblib')]
+        # Model yükleme (kayıt defteri en yeniden eskiye sıralı döndürür)
+        model_files = [entry['filename'] for entry in get_model_registry().list_models()]
         
         if not model_files:
             st.warning("Eğitilmiş model bulunamadı! Önce model eğitimi yapın.")
             return
         
         # En son modeli otomatik seç
-        model_files.sort(reverse=True)  # En yeni modeli başa al
         selected_model = st.selectbox("Model Seçin:", model_files, index=0)
         
         if st.button("Tahmin Yap"):
@@ -599,7 +597,6 @@ def main():
             return
         
         # En son modeli otomatik seç
-        model_files.sort(reverse=True)  # En yeni modeli başa al
         selected_model = st.selectbox("Backtest Modeli:", model_files, key="backtest_model", index=0)
         
         if st.button("Backtest Çalıştır"):
@@ -16,6 +16,8 @@ sys.path.append(os.path.dirname(__file__))
 from data_loader import DataLoader
 from feature_engineering import FeatureEngineer
 from model_train import StockDirectionPredictor
+from model_registry import get_model_registry
+from batch_inference import BatchPredictor
 from price_target_predictor import PriceTargetPredictor
 from dashboard_utils import load_config, load_stock_data
 from src.export_utils import create_export_buttons
@@ -65,9 +67,12 @@ def remove_duplicate_factors(factors):
     
     return clean_factors
 
-def analyze_prediction_factors(data, features_df, prediction, confidence, model_metrics):
+def analyze_prediction_factors(data, features_df, prediction, confidence, model_metrics, contributions=None):
     """
     Tahminin hangi faktörlere dayandığını analiz eder
+    
+    contributions verilirse (BatchPredictor explain=True çıktısı) modelin son satırdaki
+    gerçek özellik katkıları kullanılır; ek model çağrısı yapılmaz.
     """
     factors = {
         'positive': [],
@@ -471,7 +476,14 @@ def analyze_prediction_factors(data, features_df, prediction, confidence, model_
                 factors['negative'].append(f"⚠️ Aşağı gap (%{abs(gap)*100:.1f}) - Yükseliş için olumsuz")
     
     # 18. Modelin Gerçek Özelliklerini Analiz Et - Kullanıcı Dostu
-    if not features_df.empty:
+    if contributions:
+        # Son satırın özellik katkıları (log-odds): pozitif = yükseliş yönünde
+        for item in contributions[:5]:
+            direction = "yükseliş" if item['contribution'] > 0 else "düşüş"
+            text = f"🤖 {item['feature']} ({item['value']:.2f}) - Model için {direction} yönünde etkili ({item['contribution']:+.3f})"
+            supports_prediction = (item['contribution'] > 0) == (prediction == 1)
+            factors['positive' if supports_prediction else 'negative'].append(text)
+    elif not features_df.empty:
         # Momentum özellikleri - Kullanıcı dostu açıklamalar
         momentum_features = [col for col in features_df.columns if 'momentum' in col.lower() or 'roc' in col.lower()]
         if momentum_features:
@@ -606,13 +618,14 @@ def train_model_for_symbol(symbol, config, progress_callback=None, interval="1d"
         if progress_callback:
             progress_callback(f"✅ {symbol} model eğitimi tamamlandı!")
         
-        return True, f"{symbol} model eğitildi - Accuracy: {results['test_metrics']['accuracy']:.3f}"
+        return True, (f"{symbol} model eğitildi - Accuracy: {results['test_metrics']['accuracy']:.3f} "
+                      f"- Süre: {results['training_time']:.1f} sn")
         
     except Exception as e:
         return False, f"{symbol} model eğitimi başarısız: {str(e)}"
 
-def analyze_model_info(model_data, features_df):
-    """Model hakkında detaylı bilgi analizi"""
+def analyze_model_info(model_data, features_df, explanations=None):
+    """Model hakkında detaylı bilgi analizi (explanations: artefakttaki eğitim zamanı açıklamaları)"""
     model_info = {
         'training_period': 'Bilinmiyor',
         'data_points': len(features_df) if not features_df.empty else 0,
@@ -636,8 +649,12 @@ def analyze_model_info(model_data, features_df):
             except:
                 pass
     
-    # En güçlü özellikleri belirleme (detaylı analiz)
-    if not features_df.empty and len(features_df) > 10:
+    # En güçlü özellikleri belirleme (eğitimde hesaplanan ortalama katkılardan)
+    if explanations and explanations.get('mean_abs_contribution'):
+        mean_abs = explanations['mean_abs_contribution']
+        for feature in sorted(mean_abs, key=mean_abs.get, reverse=True)[:6]:
+            model_info['strongest_features'].append(f"{feature} (ortalama katkı {mean_abs[feature]:.3f})")
+    elif not features_df.empty and len(features_df) > 10:
         # Teknik göstergeler
         if 'rsi' in features_df.columns:
             model_info['strongest_features'].append("RSI momentum analizi")
@@ -719,28 +736,19 @@ def show_future_prediction_tab(selected_symbol, config, interval="1d", investmen
     st.info(f"🎯 Bu sekme hissenin **bir sonraki hamlesini** tahmin eder ve size net sinyal verir! (Strateji: {horizon_names.get(investment_horizon, investment_horizon)}, Zaman Dilimi: {interval})")
     
     # Model seçimi - Otomatik hisse bazlı seçim (yatırım süresine göre filtrelenmiş)
-    model_files = []
-    if os.path.exists('src/models'):
-        model_files = [f for f in os.listdir('src/models') if f.endswith('.joblib')]
+    registry = get_model_registry()
+    model_entries = registry.list_models(symbol=selected_symbol) if selected_symbol else []
     
-    if not model_files:
+    if not registry.list_models():
         st.warning("⚠️ Eğitilmiş model bulunamadı! Önce model eğitimi yapın.")
     else:
-        # Hisse bazlı model bul
-        symbol_name = selected_symbol.replace('.IS', '') if selected_symbol else None
-        
-        # Önce yatırım süresine göre filtrele
-        filtered_models = [f for f in model_files if f'{investment_horizon}' in f]
-        
-        # Sonra hisse bazlı filtrele
-        symbol_models = []
-        if filtered_models:
-            symbol_models = [f for f in filtered_models if symbol_name and symbol_name in f] if symbol_name else []
+        # Hisse bazlı modeller (en yeni başta), yatırım süresine göre filtrele
+        symbol_models = [entry['filename'] for entry in model_entries if entry['horizon'] == investment_horizon]
         
         # Eğer yeni format yoksa eski format modelleri kontrol et
-        if not symbol_models and symbol_name:
+        if not symbol_models and selected_symbol:
             # Eski format modelleri kullan (horizon içermeyen)
-            old_format_models = [f for f in model_files if symbol_name in f and all(h not in f for h in ['SHORT_TERM', 'MEDIUM_TERM', 'LONG_TERM'])]
+            old_format_models = [entry['filename'] for entry in model_entries if entry['horizon'] is None]
             if old_format_models:
                 symbol_models = old_format_models
                 st.warning(f"⚠️ **Eski formatta model bulundu. Doğru tahmin için {investment_horizon} stratejisi için yeni model eğitin!**")
@@ -750,8 +758,7 @@ def show_future_prediction_tab(selected_symbol, config, interval="1d", investmen
             st.warning(f"⚠️ {selected_symbol} için {investment_horizon} stratejisinde model bulunamadı!")
         
         if symbol_models:
-            # En son modeli otomatik seç
-            symbol_models.sort(reverse=True)
+            # En son modeli otomatik seç (kayıt defteri en yeniyi başa koyar)
             auto_selected_model = symbol_models[0]
             
             # Model formatını kontrol et
@@ -894,13 +901,7 @@ def show_future_prediction_tab(selected_symbol, config, interval="1d", investmen
                             with col1:
                                 if st.button("🤖 Hemen Model Eğit", type="primary"):
                                     # Önce eski modelleri temizle
-                                    symbol_name = selected_symbol.replace('.IS', '')
-                                    old_models = [f for f in os.listdir('src/models') if f.endswith('.joblib') and symbol_name in f]
-                                    for old_model in old_models:
-                                        try:
-                                            os.remove(f'src/models/{old_model}')
-                                        except:
-                                            pass
+                                    registry.remove_all(symbol=selected_symbol)
                                     
                                     # Progress container
                                     progress_container = st.container()
@@ -925,10 +926,7 @@ def show_future_prediction_tab(selected_symbol, config, interval="1d", investmen
                             with col2:
                                 if st.button("🗑️ Eski Modelleri Sil", type="secondary"):
                                     try:
-                                        import glob
-                                        old_models = glob.glob('src/models/*.joblib')
-                                        for model in old_models:
-                                            os.remove(model)
+                                        registry.remove_all()
                                         st.success("✅ Eski modeller temizlendi! Yukarıdaki buton ile yeni model eğitebilirsiniz.")
                                         st.rerun()
                                     except Exception as e:
@@ -941,42 +939,20 @@ def show_future_prediction_tab(selected_symbol, config, interval="1d", investmen
                             if features_df.empty:
                                 st.error("❌ Özellikler oluşturulamadı!")
                             else:
-                                # Son günün tahminini yap
-                                X, y = predictor.prepare_data(features_df)
-                                predictions, probabilities = predictor.predict(X)
+                                # Son günün tahminini yap - son K satır tek çağrıda, karar istikrarı
+                                # (margin) ve son satırın özellik katkıları ile
+                                batch_result = BatchPredictor(config).predict(
+                                    {selected_symbol: features_df}, model_paths={selected_symbol: model_path}, explain=True
+                                ).get(selected_symbol)
                                 
-                                # Son tahmin (ham)
-                                last_prediction = predictions[-1]
-                                last_confidence = np.max(probabilities[-1])
-                                last_prob_up = probabilities[-1][1]
-                                last_prob_down = probabilities[-1][0]
-
-                                # Karar istikrarı: son N olasılığın ortalaması ile margin uygula
-                                recent_window = min(5, len(probabilities))
-                                if recent_window > 1:
-                                    import numpy as _np
-                                    recent_probs_up = [p[1] for p in probabilities[-recent_window:]]
-                                    avg_prob_up = float(_np.mean(recent_probs_up))
-                                else:
-                                    avg_prob_up = float(last_prob_up)
-
-                                # Histerezis/margin: flip-flop'ı azalt
-                                upper_margin = 0.55
-                                lower_margin = 0.45
-                                if avg_prob_up >= upper_margin:
-                                    stable_prediction = 1
-                                    stable_confidence = avg_prob_up
-                                elif avg_prob_up <= lower_margin:
-                                    stable_prediction = 0
-                                    stable_confidence = 1.0 - avg_prob_up
-                                else:
-                                    # Nötr bölge: son ham tahmini koru ama güveni düşür
-                                    stable_prediction = int(last_prediction)
-                                    stable_confidence = max(abs(avg_prob_up - 0.5) * 2, 0.0)
-
-                                # Ekranda kullanılacak değeri stabilize edilmiş kararla değiştir
-                                last_prediction = stable_prediction
-                                last_confidence = stable_confidence
+                                # Tahmin yoksa varsayılan bir karar üretilmez; sayfanın geri kalanı çizilmez
+                                if batch_result is None:
+                                    st.error("❌ Tahmin yapılamadı")
+                                    st.stop()
+                                
+                                last_prediction = batch_result['prediction']
+                                last_confidence = batch_result['confidence']
+                                prediction_contributions = batch_result.get('contributions')
                                 
                                 # Son fiyat
                                 last_price = data['close'].iloc[-1]
@@ -1027,11 +1003,13 @@ def show_future_prediction_tab(selected_symbol, config, interval="1d", investmen
                             }
                             
                             price_targets = price_predictor.calculate_price_targets(
-                                last_price, last_prediction, last_confidence, volatility, data, model_data
+                                last_price, last_prediction, last_confidence, volatility, data, model_data,
+                                symbol=selected_symbol
                             )
                             
                             # Tahmin faktörlerini analiz et
-                            prediction_factors = analyze_prediction_factors(data, features_df, last_prediction, last_confidence, model_data)
+                            prediction_factors = analyze_prediction_factors(data, features_df, last_prediction, last_confidence, model_data,
+                                                                            contributions=prediction_contributions)
                             
                             # Ana Karar - Basit ve Net
                             st.markdown("---")
@@ -1920,7 +1898,7 @@ def show_future_prediction_tab(selected_symbol, config, interval="1d", investmen
                                 st.info("📊 Bu tahminin hangi model ile yapıldığını ve modelin özelliklerini görün:")
                                 
                                 # Model bilgilerini analiz et
-                                model_info = analyze_model_info(model_data, features_df)
+                                model_info = analyze_model_info(model_data, features_df, explanations=predictor.explanations)
                                 
                                 # Model bilgilerini göster
                                 col1, col2 = st.columns(2)
@@ -17,6 +17,8 @@ sys.path.append(os.path.dirname(__file__))
 from data_loader import DataLoader
 from feature_engineering import FeatureEngineer
 from model_train import StockDirectionPredictor
+from model_registry import get_model_registry
+from model_cache import get_model_cache
 from backtest import Backtester
 from dashboard_utils import load_config, analyze_stock_characteristics, get_auto_params
 
@@ -35,27 +37,23 @@ def show_model_training_tab(all_symbols):
         # Model yönetimi bölümü
         with st.expander("🗂️ Model Yönetimi", expanded=False):
             # Mevcut model sayısını göster
-            model_count = 0
-            if os.path.exists('src/models'):
-                model_files = [f for f in os.listdir('src/models') if f.endswith('.joblib')]
-                model_count = len(model_files)
+            registry = get_model_registry()
+            model_count = len(registry.list_models())
             
             st.write(f"📊 **Mevcut Model Sayısı:** {model_count}")
             
+            # Bellekteki model önbelleği
+            cache_stats = get_model_cache(load_config()).get_stats()
+            st.caption(f"🧠 Önbellek: {cache_stats['entries']} model, {cache_stats['memory_mb']:.1f} MB, "
+                      f"isabet oranı %{cache_stats['hit_rate'] * 100:.0f}, "
+                      f"ort. yükleme {cache_stats['avg_load_time'] * 1000:.0f} ms")
+            
             # Tüm modelleri sil butonu
             if model_count > 0:
                 st.warning("⚠️ Bu işlem geri alınamaz!")
                 if st.button("🗑️ Tüm Modelleri Sil", type="secondary", use_container_width=True):
                     try:
-                        deleted_count = 0
-                        if os.path.exists('src/models'):
-                            model_files = [f for f in os.listdir('src/models') if f.endswith('.joblib')]
-                            for model_file in model_files:
-                                try:
-                                    os.remove(os.path.join('src/models', model_file))
-                                    deleted_count += 1
-                                except Exception as e:
-                                    st.error(f"❌ {model_file} silinemedi: {str(e)}")
+                        deleted_count = registry.remove_all()
                         
                         if deleted_count > 0:
                             st.success(f"✅ {deleted_count} model başarıyla silindi!")
@@ -19,7 +19,9 @@ sys.path.append(os.path.dirname(__file__))
 from data_loader import DataLoader
 from feature_engineering import FeatureEngineer
 from model_train import StockDirectionPredictor
+from model_registry import get_model_registry
 from backtest import Backtester
+from backtest_cache import BacktestCache
 from live_trade import PaperTrader
 from price_target_predictor import PriceTargetPredictor
 
@@ -545,16 +547,13 @@ def main():
         st.header("🔮 Gelecek Tahmin")
         st.info("🎯 Bu sekme hissenin **bir sonraki hamlesini** tahmin eder ve size net sinyal verir!")
         
-        # Model seçimi
-        model_files = []
-        if os.path.exists('src/models'):
-            model_files = [f for f in os.listdir('src/models') if f.endswith('.joblib')]
+        # Model seçimi (kayıt defteri en yeniden eskiye sıralı döndürür)
+        model_files = [entry['filename'] for entry in get_model_registry().list_models()]
         
         if not model_files:
             st.warning("⚠️ Eğitilmiş model bulunamadı! Önce model eğitimi yapın.")
         else:
             # En son modeli otomatik seç
-            model_files.sort(reverse=True)
             selected_model = st.selectbox("🔮 Tahmin Modeli:", model_files, index=0, key="prediction_model_selection")
             
             # Tahmin butonu
@@ -634,7 +633,8 @@ def main():
                                 }
                                 
                                 price_targets = price_predictor.calculate_price_targets(
-                                    last_price, last_prediction, last_confidence, volatility, data, model_data
+                                    last_price, last_prediction, last_confidence, volatility, data, model_data,
+                                    symbol=selected_symbol
                                 )
                                 
                                 # Ana Karar - Basit ve Net
@@ -820,17 +820,14 @@ def main():
     with tab3:
         st.header("🤖 Model Tahminleri")
         
-        # Model yükleme
-        model_files = []
-        if os.path.exists('src/models'):
-            model_files = [f for f in os.listdir('src/models') if f.endswith('.joblib')]
+        # Model yükleme (kayıt defteri en yeniden eskiye sıralı döndürür)
+        model_files = [entry['filename'] for entry in get_model_registry().list_models()]
         
         if not model_files:
             st.warning("Eğitilmiş model bulunamadı! Önce model eğitimi yapın.")
             return
         
         # En son modeli otomatik seç
-        model_files.sort(reverse=True)  # En yeni modeli başa al
         selected_model = st.selectbox("Model Seçin:", model_files, index=0, key="model_selection")
         
         if st.button("Tahmin Yap"):
@@ -928,37 +925,44 @@ def main():
             return
         
         # En son modeli otomatik seç
-        model_files.sort(reverse=True)  # En yeni modeli başa al
         selected_model = st.selectbox("Backtest Modeli:", model_files, key="backtest_model_selection", index=0)
         
         if st.button("Backtest Çalıştır"):
             with st.spinner("Backtest çalıştırılıyor..."):
                 try:
-                    # Modeli yükle
-                    predictor = StockDirectionPredictor(config)
                     model_path = f'src/models/{selected_model}'
-                    
-                    if not predictor.load_model(model_path):
-                        st.error("Model yüklenemedi!")
-                        return
-                    
-                    # Veri hazırla
                     data = load_stock_data(selected_symbol, period)
-                    features_df = create_features(data)
-                    
-                    if features_df.empty:
-                        st.error("Özellikler oluşturulamadı!")
-                        return
+                    # Endeks verisi main.py backtest'i ile aynı: özelliklere ve önbellek anahtarına girer
+                    index_data = DataLoader(config).get_index_data(period="2y")
+                    backtester = Backtester(config)
                     
-                    # Tahminler
-                    X, y = predictor.prepare_data(features_df)
-                    predictions, probabilities = predictor.predict(X)
+                    def run_dashboard_backtest():
+                        # Modeli yükle
+                        predictor = StockDirectionPredictor(config)
+                        if not predictor.load_model(model_path):
+                            st.error("Model yüklenemedi!")
+                            return None
+                        
+                        # Veri hazırla
+                        features_df = FeatureEngineer(config).create_all_features(data, index_data=index_data)
+                        if features_df.empty:
+                            st.error("Özellikler oluşturulamadı!")
+                            return None
+                        
+                        # Tahminler ve backtest
+                        X, y = predictor.prepare_data(features_df)
+                        predictions, probabilities = predictor.predict(X)
+                        return backtester.run_backtest(features_df, predictions, probabilities, selected_symbol)
                     
-                    # Backtest
-                    backtester = Backtester(config)
-                    results = backtester.run_backtest(features_df, predictions, probabilities, selected_symbol)
+                    # Aynı model, veri ve parametrelerle önceki sonuç diskten okunur
+                    results, cached = BacktestCache(config).get_or_run(model_path, selected_symbol, (data, index_data),
+                                                                       run_dashboard_backtest, {'period': period})
                     
                     if results:
+                        backtester.results = results
+                        if cached:
+                            st.caption("⚡ Sonuç önbellekten (model ve veri değişmedi)")
+                        
                         # Performans metrikleri
                         metrics = results['performance_metrics']
                         
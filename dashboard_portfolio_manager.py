@@ -17,8 +17,9 @@ sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 sys.path.append(os.path.dirname(__file__))
 
 from dashboard_utils import load_config, load_stock_data
-from dashboard_stock_hunter import analyze_single_stock, train_model_for_symbol
+from dashboard_stock_hunter import analyze_single_stock, analyze_stocks_batch
 from price_target_predictor import PriceTargetPredictor
+from batch_trainer import BatchTrainer
 from src.data_loader import DataLoader
 from src.database import Database
 from src.auth import require_auth, init_session_state
@@ -505,6 +506,19 @@ def analyze_bist100_trend(config, interval="1d"):
     except Exception as e:
         return None
 
+def ensure_models_trained(symbols, config, interval="1d", investment_horizon="MEDIUM_TERM"):
+    """Modeli olmayan hisseleri worker havuzunda toplu eğitir (sessiz mod)"""
+    if not symbols:
+        return []
+    
+    try:
+        trainer = BatchTrainer(config, interval=interval, investment_horizon=investment_horizon,
+                               use_index_data=False)
+        return trainer.train_all(symbols, only_missing=True)
+    except Exception as e:
+        # Model eğitimi başarısız olsa bile analiz devam eder (teknik analiz yedeği)
+        return []
+
 def calculate_daily_recommendations(portfolio, config, interval="1d", investment_horizon="MEDIUM_TERM"):
     """Günlük önerileri hesapla"""
     recommendations = []
@@ -517,6 +531,9 @@ def calculate_daily_recommendations(portfolio, config, interval="1d", investment
     # Önce mevcut pozisyonlar için analiz yap - SAT/ARTIR/TUT
     analyzed_positions = {}
     
+    # Modeli olmayan pozisyonlar için toplu otomatik eğitim (sessiz mod, paralel)
+    ensure_models_trained(list(stocks.keys()), config, interval, investment_horizon)
+    
     # İlk aşama: SAT önerilerini belirle (satıştan gelen parayı hesaplamak için)
     sell_recommendations = []
     for symbol in stocks:
@@ -525,26 +542,6 @@ def calculate_daily_recommendations(portfolio, config, interval="1d", investment
             quantity = stock_info['quantity']
             avg_cost = stock_info['avg_cost']
             
-            # Model kontrolü ve otomatik eğitim
-            symbol_name = symbol.replace('.IS', '')
-            model_exists = False
-            
-            if os.path.exists('src/models'):
-                model_files = [f for f in os.listdir('src/models') if f.endswith('.joblib')]
-                model_exists = any(symbol_name in f for f in model_files)
-            
-            # Model yoksa otomatik eğit (sessiz mod)
-            if not model_exists:
-                try:
-                    success, message = train_model_for_symbol(
-                        symbol, config, 
-                        progress_callback=None,
-                        interval=interval, 
-                        investment_horizon=investment_horizon
-                    )
-                except Exception as e:
-                    pass
-            
             # Hisse analizi yap
             result = analyze_single_stock(symbol, config, period="1y", interval=interval)
             
@@ -606,28 +603,6 @@ def calculate_daily_recommendations(portfolio, config, interval="1d", investment
             quantity = stock_info['quantity']
             avg_cost = stock_info['avg_cost']
             
-            # Model kontrolü ve otomatik eğitim
-            symbol_name = symbol.replace('.IS', '')
-            model_exists = False
-            
-            if os.path.exists('src/models'):
-                model_files = [f for f in os.listdir('src/models') if f.endswith('.joblib')]
-                model_exists = any(symbol_name in f for f in model_files)
-            
-            # Model yoksa otomatik eğit (sessiz mod)
-            if not model_exists:
-                try:
-                    # Sessiz modda model eğit (mesaj gösterme)
-                    success, message = train_model_for_symbol(
-                        symbol, config, 
-                        progress_callback=None,  # Sessiz mod
-                        interval=interval, 
-                        investment_horizon=investment_horizon
-                    )
-                except Exception as e:
-                    # Model eğitimi başarısız olsa bile devam et
-                    pass
-            
             # Hisse analizi yap
             result = analyze_single_stock(symbol, config, period="1y", interval=interval)
             
@@ -789,20 +764,25 @@ def calculate_daily_recommendations(portfolio, config, interval="1d", investment
             target_max_date = ''
             
             try:
-                volatility = result.get('volatility', 0.3)
-                data = load_stock_data(symbol, period="1y", interval=interval, silent=True)
-                
-                if not data.empty and prediction is not None:
-                    price_predictor = PriceTargetPredictor(config)
-                    price_targets = price_predictor.calculate_price_targets(
-                        current_price, 
-                        prediction, 
-                        confidence, 
-                        volatility / 100 if volatility > 1 else volatility, 
-                        data,
-                        {}
-                    )
+                # Analizde hesaplanan hedefler kullanılır (yoksa yeniden hesaplanır)
+                price_targets = result.get('price_targets')
+                if price_targets is None and prediction is not None:
+                    volatility = result.get('volatility', 0.3)
+                    data = load_stock_data(symbol, period="1y", interval=interval, silent=True)
                     
+                    if not data.empty:
+                        price_predictor = PriceTargetPredictor(config)
+                        price_targets = price_predictor.calculate_price_targets(
+                            current_price, 
+                            prediction, 
+                            confidence, 
+                            volatility / 100 if volatility > 1 else volatility, 
+                            data,
+                            {},
+                            symbol=symbol
+                        )
+                
+                if price_targets is not None and prediction is not None:
                     # Hedef fiyat bilgilerini ekle
                     target_price = price_targets['targets']['moderate']
                     time_targets = price_targets.get('time_targets', {})
@@ -862,32 +842,16 @@ def calculate_daily_recommendations(portfolio, config, interval="1d", investment
     if remaining_cash > min_cash_for_new_stocks:
         scored_candidates = []
         
+        # Portföy dışı hisseler için eksik modelleri toplu eğit (düşük eşikli ikinci tarama da bunları kullanır)
+        ensure_models_trained([s for s in all_stocks if s not in stocks], config, interval, investment_horizon)
+        
+        # Portföy dışı hisseler tek toplu analizde (tahmin ve hedef fiyatlar toplu)
+        scan_results = analyze_stocks_batch([s for s in all_stocks if s not in stocks], config, interval=interval)
+        
         for symbol in all_stocks:
             if symbol not in stocks:  # Sadece portföyde olmayan hisseler
                 try:
-                    # Model kontrolü ve otomatik eğitim
-                    symbol_name = symbol.replace('.IS', '')
-                    model_exists = False
-                    
-                    if os.path.exists('src/models'):
-                        model_files = [f for f in os.listdir('src/models') if f.endswith('.joblib')]
-                        model_exists = any(symbol_name in f for f in model_files)
-                    
-                    # Model yoksa otomatik eğit (sessiz mod)
-                    if not model_exists:
-                        try:
-                            # Sessiz modda model eğit (mesaj gösterme)
-                            success, message = train_model_for_symbol(
-                                symbol, config, 
-                                progress_callback=None,  # Sessiz mod
-                                interval=interval, 
-                                investment_horizon=investment_horizon
-                            )
-                        except Exception as e:
-                            # Model eğitimi başarısız olsa bile devam et
-                            pass
-                    
-                    result = analyze_single_stock(symbol, config, period="1y", interval=interval, silent=True)
+                    result = scan_results.get(symbol)
                     
                     if result is None:
                         continue
@@ -942,27 +906,7 @@ def calculate_daily_recommendations(portfolio, config, interval="1d", investment
                 for symbol in all_stocks:
                     if symbol not in stocks and symbol not in checked_symbols:
                         try:
-                            # Model kontrolü ve otomatik eğitim
-                            symbol_name = symbol.replace('.IS', '')
-                            model_exists = False
-                            
-                            if os.path.exists('src/models'):
-                                model_files = [f for f in os.listdir('src/models') if f.endswith('.joblib')]
-                                model_exists = any(symbol_name in f for f in model_files)
-                            
-                            # Model yoksa otomatik eğit (sessiz mod)
-                            if not model_exists:
-                                try:
-                                    success, message = train_model_for_symbol(
-                                        symbol, config, 
-                                        progress_callback=None,
-                                        interval=interval, 
-                                        investment_horizon=investment_horizon
-                                    )
-                                except Exception as e:
-                                    pass
-                            
-                            result = analyze_single_stock(symbol, config, period="1y", interval=interval, silent=True)
+                            result = scan_results.get(symbol)
                             if result is None:
                                 continue
                             
@@ -1041,20 +985,25 @@ def calculate_daily_recommendations(portfolio, config, interval="1d", investment
                 # Hedef fiyat ve tarih bilgilerini hesapla
                 try:
                     result_data = candidate['result']
-                    volatility = result_data.get('volatility', 0.3)
-                    data = load_stock_data(symbol, period="1y", interval=interval, silent=True)
-                    
-                    if not data.empty:
-                        price_predictor = PriceTargetPredictor(config)
-                        price_targets = price_predictor.calculate_price_targets(
-                            current_price, 
-                            candidate['prediction'], 
-                            confidence, 
-                            volatility / 100 if volatility > 1 else volatility, 
-                            data,
-                            {}
-                        )
+                    # Taramada toplu hesaplanan hedefler kullanılır (yoksa yeniden hesaplanır)
+                    price_targets = result_data.get('price_targets')
+                    if price_targets is None:
+                        volatility = result_data.get('volatility', 0.3)
+                        data = load_stock_data(symbol, period="1y", interval=interval, silent=True)
                         
+                        if not data.empty:
+                            price_predictor = PriceTargetPredictor(config)
+                            price_targets = price_predictor.calculate_price_targets(
+                                current_price, 
+                                candidate['prediction'], 
+                                confidence, 
+                                volatility / 100 if volatility > 1 else volatility, 
+                                data,
+                                {},
+                                symbol=symbol
+                            )
+                    
+                    if price_targets is not None:
                         # Hedef fiyat bilgilerini ekle
                         target_moderate = price_targets['targets']['moderate']
                         time_targets = price_targets.get('time_targets', {})
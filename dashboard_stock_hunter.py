@@ -10,9 +10,8 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import sys
 import os
-from datetime import datetime, timedelta
+import logging
 import concurrent.futures
-import time
 import threading
 
 # Proje modüllerini import et
@@ -21,10 +20,14 @@ sys.path.append(os.path.dirname(__file__))
 
 from data_loader import DataLoader
 from feature_engineering import FeatureEngineer
-from model_train import StockDirectionPredictor
 from price_target_predictor import PriceTargetPredictor
+from batch_trainer import BatchTrainer, train_symbol
+from model_registry import get_model_registry
+from batch_inference import BatchPredictor
 from dashboard_utils import load_config, load_stock_data
 
+logger = logging.getLogger(__name__)
+
 @st.cache_data(ttl=3600)  # 1 saat cache - Optimizasyon: Daha uzun cache süresi
 def load_stock_data_cached(symbol, period="1y", interval="1d", silent=False):
     """Hisse verilerini cache'li olarak yükle
@@ -40,39 +43,57 @@ def load_stock_data_cached(symbol, period="1y", interval="1d", silent=False):
         return pd.DataFrame()
 
 
-def analyze_single_stock(symbol, config, period="1y", interval="1d", silent=False):
+def compute_stock_features(symbol, config, period="1y", interval="1d", silent=False):
+    """Hisse verisini yükler ve özellikleri oluşturur - Thread-safe
+    
+    Returns:
+        (data, features_df) - başarısızsa (None, None)
+    """
+    # Veri yükle
+    data = load_stock_data_cached(symbol, period, interval=interval, silent=silent)
+    if data.empty:
+        return None, None
+    
+    # Özellikler oluştur
+    try:
+        # Interval'ı config'e ekle
+        config_with_interval = config.copy()
+        if 'MODEL_CONFIG' not in config_with_interval:
+            config_with_interval['MODEL_CONFIG'] = {}
+        config_with_interval['MODEL_CONFIG']['interval'] = interval
+        
+        # DataLoader ve FeatureEngineer oluştur
+        loader = DataLoader(config_with_interval)
+        engineer = FeatureEngineer(config_with_interval, data_loader=loader)
+        
+        # BIST 100 endeks verisini yükle
+        index_data = loader.get_index_data(period="1y", interval=interval)
+        
+        # Özellikleri oluştur
+        features_df = engineer.create_all_features(data, index_data=index_data)
+    except Exception as e:
+        st.error(f"❌ {symbol} özellikler oluşturulamadı: {str(e)}")
+        return None, None
+    if features_df.empty:
+        return None, None
+    
+    return data, features_df
+
+def analyze_single_stock(symbol, config, period="1y", interval="1d", silent=False,
+                         precomputed=None, model_result=None, price_targets=None):
     """Tek hisse analizi - Thread-safe
     
     Args:
         silent: True ise veri yükleme mesajları gösterilmez (batch işlemler için)
+        precomputed: compute_stock_features çıktısı (data, features_df) - verilmezse hesaplanır
+        model_result: BatchPredictor sonucu - verilmezse bu hisse için tahmin yapılır
+        price_targets: calculate_price_targets_batch sonucu - verilmezse bu hisse için hesaplanır
     """
     try:
-        # Veri yükle
-        data = load_stock_data_cached(symbol, period, interval=interval, silent=silent)
-        if data.empty:
-            return None
-        
-        # Özellikler oluştur
-        try:
-            # Interval'ı config'e ekle
-            config_with_interval = config.copy()
-            if 'MODEL_CONFIG' not in config_with_interval:
-                config_with_interval['MODEL_CONFIG'] = {}
-            config_with_interval['MODEL_CONFIG']['interval'] = interval
-            
-            # DataLoader ve FeatureEngineer oluştur
-            loader = DataLoader(config_with_interval)
-            engineer = FeatureEngineer(config_with_interval, data_loader=loader)
-            
-            # BIST 100 endeks verisini yükle
-            index_data = loader.get_index_data(period="1y", interval=interval)
-            
-            # Özellikleri oluştur
-            features_df = engineer.create_all_features(data, index_data=index_data)
-        except Exception as e:
-            st.error(f"❌ {symbol} özellikler oluşturulamadı: {str(e)}")
-            return None
-        if features_df.empty:
+        if precomputed is None:
+            precomputed = compute_stock_features(symbol, config, period, interval, silent)
+        data, features_df = precomputed
+        if data is None:
             return None
         
         # Temel metrikler
@@ -114,58 +135,21 @@ def analyze_single_stock(symbol, config, period="1y", interval="1d", silent=Fals
         
         # AI model tahmini (varsa) - Öncelik
         try:
-            # En uygun modeli bul
-            model_files = []
-            if os.path.exists('src/models'):
-                model_files = [f for f in os.listdir('src/models') if f.endswith('.joblib')]
-            
-            symbol_name = symbol.replace('.IS', '')
-            symbol_models = [f for f in model_files if symbol_name in f]
+            # En son model ile son satırların tahmini (stabilize edilmiş)
+            if model_result is None:
+                model_result = BatchPredictor(config).predict({symbol: features_df}, interval=interval)[symbol]
             
-            if symbol_models:
-                # En son modeli seç
-                symbol_models.sort(reverse=True)
-                selected_model = symbol_models[0]
+            if model_result is not None:
+                prediction = model_result['prediction']
+                confidence = model_result['confidence']
                 
-                # Modeli yükle ve tahmin yap
-                predictor = StockDirectionPredictor(config)
-                model_path = f'src/models/{selected_model}'
-                
-                if predictor.load_model(model_path):
-                    # prepare_data otomatik olarak hedef değişkenleri filtreler
-                    X, y = predictor.prepare_data(features_df)
-                    predictions, probabilities = predictor.predict(X)
-                    
-                    # AI model tahmini (stabilize edilmiş)
-                    raw_prediction = predictions[-1]
-                    raw_confidence = np.max(probabilities[-1])
-
-                    # Son N olasılığın ortalaması ile margin uygula (flip-flop azaltma)
-                    recent_window = min(5, len(probabilities))
-                    if recent_window > 1:
-                        recent_probs_up = [p[1] for p in probabilities[-recent_window:]]
-                        avg_prob_up = float(np.mean(recent_probs_up))
-                    else:
-                        avg_prob_up = float(probabilities[-1][1])
-
-                    upper_margin = 0.55
-                    lower_margin = 0.45
-                    if avg_prob_up >= upper_margin:
-                        prediction = 1
-                        confidence = avg_prob_up
-                    elif avg_prob_up <= lower_margin:
-                        prediction = 0
-                        confidence = 1.0 - avg_prob_up
-                    else:
-                        prediction = int(raw_prediction)
-                        confidence = max(abs(avg_prob_up - 0.5) * 2, 0.0)
-                    
-                    # Hedef fiyat hesapla
+                # Hedef fiyat hesapla
+                if price_targets is None:
                     price_predictor = PriceTargetPredictor(config)
                     price_targets = price_predictor.calculate_price_targets(
-                        current_price, prediction, confidence, volatility/100, data, {}
+                        current_price, prediction, confidence, volatility/100, data, {}, symbol=symbol
                     )
-                    price_target = price_targets['targets']['moderate']
+                price_target = price_targets['targets']['moderate']
         
         except Exception as e:
             # Model tahmini başarısız olursa teknik analiz kullan
@@ -234,6 +218,7 @@ def analyze_single_stock(symbol, config, period="1y", interval="1d", silent=Fals
             'prediction': prediction,
             'confidence': confidence,
             'price_target': price_target,
+            'price_targets': price_targets,
             'data_points': len(data),
             # BIST 100 Endeks Bilgileri - YENİ!
             'beta_20d': beta_20d,
@@ -249,97 +234,137 @@ def analyze_single_stock(symbol, config, period="1y", interval="1d", silent=Fals
 
 def train_model_for_symbol(symbol, config, progress_callback=None, interval="1d", investment_horizon="MEDIUM_TERM"):
     """Tek hisse için model eğitimi"""
-    try:
-        if progress_callback:
-            progress_callback(f"📊 {symbol} verisi yükleniyor...")
-        
-        # Veri yükle
-        data = load_stock_data(symbol, "2y", interval=interval)
-        if data.empty:
-            return False, f"{symbol} verisi yüklenemedi"
-        
-        if progress_callback:
-            progress_callback(f"🔧 {symbol} özellikler oluşturuluyor...")
-        
-        # Özellikler oluştur
-        try:
-            # Interval ve investment_horizon'ı config'e ekle
-            config_with_interval = config.copy()
-            if 'MODEL_CONFIG' not in config_with_interval:
-                config_with_interval['MODEL_CONFIG'] = {}
-            config_with_interval['MODEL_CONFIG']['interval'] = interval
-            config_with_interval['MODEL_CONFIG']['investment_horizon'] = investment_horizon
-            
-            engineer = FeatureEngineer(config_with_interval)
-            features_df = engineer.create_all_features(data)
-        except Exception as e:
-            return False, f"{symbol} özellikler oluşturulamadı: {str(e)}"
-        
-        if features_df.empty:
-            return False, f"{symbol} özellikler oluşturulamadı"
-        
-        if progress_callback:
-            progress_callback(f"🤖 {symbol} model eğitiliyor...")
-        
-        # Model eğit
-        predictor = StockDirectionPredictor(config)
-        X, y = predictor.prepare_data(features_df)
-        
-        if len(X) < 100:  # Yeterli veri yok
-            return False, f"{symbol} yeterli veri yok ({len(X)} gün)"
-        
-        # Model eğitimi
-        results = predictor.train_model(X, y)
-        
-        if progress_callback:
-            progress_callback(f"💾 {symbol} model kaydediliyor...")
-        
-        # Modeli kaydet (yatırım süresini dahil et)
-        symbol_name = symbol.replace('.IS', '')
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{symbol_name}_{investment_horizon}_Model_{timestamp}.joblib"
-        
-        model_path = predictor.save_model(filename)
-        
-        if progress_callback:
-            progress_callback(f"✅ {symbol} model eğitimi tamamlandı!")
-        
-        return True, f"{symbol} model eğitildi - Accuracy: {results['test_metrics']['accuracy']:.3f}"
-        
-    except Exception as e:
-        return False, f"{symbol} model eğitimi başarısız: {str(e)}"
+    result = train_symbol(
+        symbol, config,
+        interval=interval,
+        investment_horizon=investment_horizon,
+        use_index_data=False,
+        progress_callback=progress_callback
+    )
+    return result['success'], result['message']
 
-def train_models_batch(symbols, config, progress_container, interval="1d", investment_horizon="MEDIUM_TERM"):
-    """Toplu model eğitimi - Progress bar ile"""
+def train_models_batch(symbols, config, progress_container, interval="1d", investment_horizon="MEDIUM_TERM",
+                       force=False, only_missing=False):
+    """Toplu model eğitimi - Worker havuzu ve progress bar ile
+    
+    Modeli verisinden daha yeni olan hisseler atlanır (force=True ile tümü yeniden eğitilir).
+    """
     results = []
-    total_symbols = len(symbols)
     
     # Progress bar oluştur
     progress_bar = progress_container.progress(0)
     status_text = progress_container.empty()
     
-    for i, symbol in enumerate(symbols):
-        # Progress güncelle
-        progress = (i + 1) / total_symbols
-        progress_bar.progress(progress)
+    trainer = BatchTrainer(config, interval=interval, investment_horizon=investment_horizon,
+                           use_index_data=False)
+    
+    for event in trainer.run(symbols, force=force, only_missing=only_missing):
+        if event['total'] > 0:
+            progress_bar.progress(event['completed'] / event['total'])
+        status_text.text(event['message'])
         
-        # Model eğit
-        success, message = train_model_for_symbol(symbol, config, status_text.text, interval, investment_horizon)
-        results.append({
-            'symbol': symbol,
-            'success': success,
-            'message': message
-        })
+        if event['type'] in ('skipped', 'finished', 'failed'):
+            results.append({
+                'symbol': event['symbol'],
+                'success': event['success'],
+                'message': event['message']
+            })
+    
+    return results
+
+def batch_price_targets(config, precomputed, model_results):
+    """Model tahmini olan hisselerin hedef fiyatları - tek toplu hesap
+    
+    Args:
+        precomputed: {sembol: (data, features_df)}
+        model_results: BatchPredictor sonuçları
+    
+    Returns:
+        {sembol: calculate_price_targets çıktısı}; hata durumunda boş (hisse bazlı hesaplanır)
+    """
+    panel = {symbol: precomputed[symbol][0] for symbol, result in model_results.items()
+             if result is not None and result.get('prediction') is not None
+             and precomputed.get(symbol, (None, None))[0] is not None}
+    if not panel:
+        return {}
+    
+    try:
+        return PriceTargetPredictor(config).calculate_price_targets_batch(
+            panel,
+            [model_results[symbol]['prediction'] for symbol in panel],
+            [model_results[symbol]['confidence'] for symbol in panel],
+            model_data={}
+        )
+    except Exception as e:
+        logger.warning(f"Toplu hedef fiyat hesabı başarısız, hisse bazlı hesaplanacak: {str(e)}")
+        return {}
+
+def analyze_stocks_batch(symbols, config, max_workers=None, interval="1d", progress_callback=None):
+    """Çoklu hisse analizi (arayüzsüz) - veri/özellik paralel, tahmin ve hedef fiyatlar toplu
+    
+    Args:
+        progress_callback: (tamamlanan, toplam, mesaj) ile çağrılır
+    
+    Returns:
+        {sembol: analyze_single_stock sonucu} - başarısız hisseler dahil edilmez (loglanır)
+    """
+    results = {}
+    if max_workers is None:
+        max_workers = min(3, len(symbols))
+    max_workers = max(1, max_workers)
+    total = len(symbols)
+    
+    def report(completed, message):
+        if progress_callback is not None:
+            progress_callback(completed, total, message)
+    
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # 1) Veri ve özellikler paralel hazırlanır
+        report(0, f"📊 {total} hissenin verileri hazırlanıyor...")
+        future_to_symbol = {
+            executor.submit(compute_stock_features, symbol, config, "1y", interval, True): symbol
+            for symbol in symbols
+        }
+        precomputed = {}
+        for future in concurrent.futures.as_completed(future_to_symbol):
+            try:
+                precomputed[future_to_symbol[future]] = future.result()
+            except Exception:
+                precomputed[future_to_symbol[future]] = (None, None)
         
-        # Kısa bekleme
-        time.sleep(0.1)
+        # 2) Tüm hisseler için model tahmini tek seferde (model başına tek booster çağrısı)
+        model_results = BatchPredictor(config).predict(
+            {symbol: features_df for symbol, (_, features_df) in precomputed.items() if features_df is not None},
+            interval=interval
+        )
+        
+        # 3) Tahmini olan hisselerin hedef fiyatları tek seferde (ortak grafik analizi ve simülasyon)
+        report(0, f"🎯 {len(model_results)} hissenin hedef fiyatları hesaplanıyor...")
+        price_targets = batch_price_targets(config, precomputed, model_results)
+        
+        # 4) Hisse bazlı analiz hazır veri, tahmin ve hedeflerle
+        future_to_symbol = {
+            executor.submit(analyze_single_stock, symbol, config, "1y", interval, True,
+                            precomputed[symbol], model_results.get(symbol), price_targets.get(symbol)): symbol
+            for symbol in symbols
+        }
+        
+        completed = 0
+        for future in concurrent.futures.as_completed(future_to_symbol):
+            symbol = future_to_symbol[future]
+            try:
+                result = future.result()
+                if result is not None:
+                    results[symbol] = result
+            except Exception as e:
+                logger.warning(f"{symbol} analizi başarısız: {str(e)}")
+            completed += 1
+            report(completed, f"📊 {completed}/{total} hisse analiz edildi...")
     
     return results
 
 def analyze_multiple_stocks(symbols, config, max_workers=None, interval="1d"):
     """Çoklu hisse analizi - Paralel işlem - Optimizasyon: Worker sayısı azaltıldı"""
-    results = []
-    
     # Optimizasyon: Ücretsiz sunucular için worker sayısını azalt
     if max_workers is None:
         max_workers = min(3, len(symbols))  # Maksimum 3 worker (ücretsiz sunucular için)
@@ -348,35 +373,17 @@ def analyze_multiple_stocks(symbols, config, max_workers=None, interval="1d"):
     progress_bar = st.progress(0)
     status_text = st.empty()
     
+    def update_progress(completed, total, message):
+        progress_bar.progress(completed / total if total else 1.0)
+        status_text.text(message)
+    
     with st.spinner(f"🔍 {len(symbols)} hisse analiz ediliyor..."):
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Tüm hisseleri paralel olarak analiz et
-            future_to_symbol = {
-                executor.submit(analyze_single_stock, symbol, config, "1y", interval, silent=True): symbol 
-                for symbol in symbols
-            }
-            
-            completed = 0
-            total = len(symbols)
-            
-            for future in concurrent.futures.as_completed(future_to_symbol):
-                symbol = future_to_symbol[future]
-                try:
-                    result = future.result()
-                    if result is not None:
-                        results.append(result)
-                    completed += 1
-                    # Progress güncelle
-                    progress_bar.progress(completed / total)
-                    status_text.text(f"📊 {completed}/{total} hisse analiz edildi...")
-                except Exception as e:
-                    st.error(f"❌ {symbol} analizi başarısız: {str(e)}")
-                    completed += 1
-                    progress_bar.progress(completed / total)
+        results = analyze_stocks_batch(symbols, config, max_workers=max_workers, interval=interval,
+                                       progress_callback=update_progress)
     
     progress_bar.empty()
     status_text.empty()
-    return results
+    return list(results.values())
 
 def calculate_stock_score(stock_data):
     """Hisse skoru hesapla - AI sinyali öncelikli"""
@@ -611,24 +618,12 @@ def show_stock_hunter_tab(bist_stocks, all_symbols, config, interval="1d", inves
     with col3:
         if st.button("🧹 Eski Modelleri Temizle", help="7 günden eski modelleri sil"):
             # Eski modelleri temizle
-            if os.path.exists('src/models'):
-                model_files = [f for f in os.listdir('src/models') if f.endswith('.joblib')]
-                old_models = []
-                cutoff_date = datetime.now() - timedelta(days=7)
-                
-                for model_file in model_files:
-                    model_path = f'src/models/{model_file}'
-                    if os.path.getctime(model_path) < cutoff_date.timestamp():
-                        old_models.append(model_file)
-                
-                if old_models:
-                    for model_file in old_models:
-                        os.remove(f'src/models/{model_file}')
-                    st.success(f"✅ {len(old_models)} eski model temizlendi!")
-                else:
-                    st.info("ℹ️ Temizlenecek eski model bulunamadı.")
+            old_models = get_model_registry().garbage_collect(keep_latest=None, max_age_days=7)
+            
+            if old_models:
+                st.success(f"✅ {len(old_models)} eski model temizlendi!")
             else:
-                st.warning("⚠️ Model klasörü bulunamadı.")
+                st.info("ℹ️ Temizlenecek eski model bulunamadı.")
     
     # Hisse seçimi
     st.markdown("### 📊 Analiz Edilecek Hisseler")
@@ -693,16 +688,10 @@ def show_stock_hunter_tab(bist_stocks, all_symbols, config, interval="1d", inves
                 symbols_without_models = []
                 symbols_to_update = []
                 
-                if os.path.exists('src/models'):
-                    model_files = [f for f in os.listdir('src/models') if f.endswith('.joblib')]
-                    existing_models = {f.split('_')[0]: f for f in model_files}
-                else:
-                    existing_models = {}
+                registry = get_model_registry()
                 
                 for symbol in selected_symbols:
-                    symbol_name = symbol.replace('.IS', '')
-                    
-                    if symbol_name not in existing_models:
+                    if registry.find_latest(symbol) is None:
                         symbols_without_models.append(symbol)
                     elif update_existing_models:
                         symbols_to_update.append(symbol)
@@ -22,6 +22,13 @@ from data_loader import DataLoader
 from feature_engineering import FeatureEngineer
 from model_train import StockDirectionPredictor
 from backtest import Backtester
+from backtest_log import save_backtest_log
+from backtest_cache import BacktestCache
+from param_sweep import ParameterSweep, parse_grid_args, parse_random_args
+from portfolio_backtest import PortfolioBacktester
+from robustness import MonteCarloAnalyzer
+from walk_forward_backtest import WalkForwardBacktester
+from streaming_backtest import StreamingBacktester, model_signals
 from live_trade import PaperTrader, LiveSignalGenerator
 
 # Logging ayarları
@@ -64,13 +71,22 @@ class StockPredictionSystem:
             logger.error(f"Konfigürasyon yükleme hatası: {str(e)}")
             raise
     
-    def train_model(self, symbols: List[str] = None, period: str = "2y", model_name: str = None) -> str:
+    def train_model(self, symbols: List[str] = None, period: str = "2y", model_name: str = None,
+                    tune: bool = False, pooled: bool = None) -> str:
         """Model eğitir"""
         logger.info("Model eğitimi başlıyor...")
         
         if symbols is None:
             symbols = self.config.get('TARGET_STOCKS', [])
         
+        # Havuzlu eğitim: veriler birleştirilmeden diskten akıtılır
+        if pooled is None:
+            pooled = self.config.get('POOLED_TRAINING', {}).get('enabled', False)
+        if pooled:
+            if tune:
+                logger.warning("Havuzlu eğitimde hiperparametre araması desteklenmiyor, atlanıyor")
+            return self.train_pooled_model(symbols, period, model_name)
+        
         # Veri yükle
         logger.info(f"Veri yükleniyor: {symbols}")
         all_data = self.data_loader.fetch_multiple_stocks(symbols, period)
@@ -106,8 +122,49 @@ class StockPredictionSystem:
         X, y = self.predictor.prepare_data(combined_features)
         
         # Model eğitimi
-        results = self.predictor.train_model(X, y)
+        results = self.predictor.train_model(X, y, tune=tune)
+        
+        return self._save_trained_model(results, model_name)
+    
+    def train_pooled_model(self, symbols: List[str], period: str = "2y", model_name: str = None) -> str:
+        """
+        Tüm hisseler için tek model eğitir (out-of-core)
+        
+        Her hissenin verisi sırayla yüklenip özellikleri diske yazılır; bellekte aynı anda
+        tek hissenin verisi ve bütçeye göre boyutlanan bir eğitim batch'i bulunur.
+        """
+        from pooled_training import PooledTrainer
+        
+        index_data = self.data_loader.get_index_data(period=period)
+        trainer = PooledTrainer(self.config, self.predictor)
+        
+        try:
+            for symbol in symbols:
+                data = self.data_loader.fetch_stock_data(symbol, period)
+                if data.empty:
+                    logger.warning(f"Veri yüklenemedi: {symbol}")
+                    continue
+                
+                features_df = self.feature_engineer.create_all_features(data, index_data=index_data)
+                if features_df.empty:
+                    logger.warning(f"Özellik oluşturulamadı: {symbol}")
+                    continue
+                
+                rows = trainer.add_symbol(symbol, features_df)
+                logger.info(f"Havuza eklendi: {symbol} ({rows} satır)")
+                del data, features_df
+            
+            results = trainer.train()
+        finally:
+            trainer.cleanup()
+        
+        if results is None:
+            return None
         
+        return self._save_trained_model(results, model_name)
+    
+    def _save_trained_model(self, results: Dict, model_name: str = None) -> str:
+        """Eğitilen modeli kaydeder ve özet metrikleri loglar"""
         # Modeli kaydet
         if model_name:
             # Özel isimle kaydet
@@ -118,10 +175,145 @@ class StockPredictionSystem:
         logger.info("Model eğitimi tamamlandı!")
         logger.info(f"Test Accuracy: {results['test_metrics']['accuracy']:.4f}")
         logger.info(f"Test F1 Score: {results['test_metrics']['f1']:.4f}")
+        logger.info(f"Eğitim süresi: {results['training_time']:.2f} sn "
+                   f"(n_jobs={results['resources']['n_jobs']}, tree_method={results['resources']['tree_method']})")
         logger.info(f"Model kaydedildi: {model_path}")
         
         return model_path
     
+    def update_model(self, model_path: str, symbols: List[str] = None, period: str = "6mo") -> str:
+        """Mevcut modeli yeni barlarla artımlı (warm-start) günceller"""
+        logger.info("Artımlı model güncellemesi başlıyor...")
+        
+        if not self.predictor.load_model(model_path):
+            logger.error("Model yüklenemedi!")
+            return None
+        
+        if symbols is None:
+            symbols = self.config.get('TARGET_STOCKS', [])
+        
+        all_data = self.data_loader.fetch_multiple_stocks(symbols, period)
+        if not all_data:
+            logger.error("Veri yüklenemedi!")
+            return None
+        
+        index_data = self.data_loader.get_index_data(period=period)
+        
+        all_features = []
+        for symbol, data in all_data.items():
+            features_df = self.feature_engineer.create_all_features(data, index_data=index_data)
+            if not features_df.empty:
+                features_df['symbol'] = symbol
+                all_features.append(features_df)
+        
+        if not all_features:
+            logger.error("Özellik oluşturulamadı!")
+            return None
+        
+        # Birden fazla hissede yeni barlar zaman sırasına göre dizilir
+        combined_features = pd.concat(all_features, ignore_index=False).sort_index(kind='stable')
+        X, y = self.predictor.prepare_data(combined_features)
+        
+        result = self.predictor.update_model(X, y)
+        if result['mode'] == 'skipped':
+            logger.info("Yeni bar yok, model güncel")
+            return model_path
+        
+        new_path = self.predictor.save_model()
+        logger.info(f"Güncelleme modu: {result['mode']}, yeni bar: {result['new_rows']}, "
+                   f"sapma: {result['drift']:.3f}, güncelleme öncesi accuracy: {result['pre_update_accuracy']:.4f}")
+        logger.info(f"Model kaydedildi: {new_path}")
+        
+        return new_path
+    
+    def tune_volatility_buckets(self, symbols: List[str] = None, period: str = "2y") -> Dict:
+        """Hisseleri volatilite gruplarına ayırıp her grup için hiperparametre araması yapar"""
+        from feature_engineering import get_prediction_horizon
+        from hyperparam_search import HyperparameterSearch, save_bucket_params
+        
+        logger.info("Volatilite grubu bazlı hiperparametre araması başlıyor...")
+        
+        if symbols is None:
+            symbols = self.config.get('TARGET_STOCKS', [])
+        
+        index_data = self.data_loader.get_index_data(period=period)
+        test_size = 1 - self.config.get('MODEL_CONFIG', {}).get('train_test_split', 0.8)
+        
+        # Grup -> [(X_train_scaled, y_train)] ve grup başına temel parametreler
+        bucket_datasets = {}
+        bucket_params = {}
+        
+        for symbol in symbols:
+            data = self.data_loader.fetch_stock_data(symbol, period)
+            if data.empty:
+                logger.warning(f"Veri bulunamadı: {symbol}")
+                continue
+            
+            features_df = self.feature_engineer.create_all_features(data, index_data=index_data)
+            if features_df.empty:
+                continue
+            
+            predictor = StockDirectionPredictor(self.config)
+            X, y = predictor.prepare_data(features_df)
+            volatility = predictor.calculate_volatility(X)
+            bucket = predictor.get_volatility_bucket(volatility)
+            
+            # Test kısmı aramaya dahil edilmez
+            split_idx = int(len(X) * (1 - test_size))
+            X_train_scaled = predictor.scaler.fit_transform(X.iloc[:split_idx])
+            
+            bucket_datasets.setdefault(bucket, []).append((X_train_scaled, y.iloc[:split_idx].values))
+            if bucket not in bucket_params:
+                bucket_params[bucket] = predictor._build_xgb_params(predictor.get_volatility_config(volatility))
+            logger.info(f"{symbol}: {bucket}")
+        
+        gap = get_prediction_horizon(self.config)
+        results = {}
+        for bucket, datasets in bucket_datasets.items():
+            logger.info(f"{bucket}: {len(datasets)} hisse ile arama yapılıyor")
+            results[bucket] = HyperparameterSearch(self.config).search_pooled(datasets, bucket_params[bucket], gap=gap)
+        
+        if results:
+            save_bucket_params(results)
+        
+        return results
+    
+    def validate_model(self, symbols: List[str] = None, period: str = "2y", mode: str = None) -> Dict:
+        """Hisse bazlı walk-forward doğrulama çalıştırır"""
+        logger.info("Walk-forward doğrulama başlıyor...")
+        
+        if symbols is None:
+            symbols = self.config.get('TARGET_STOCKS', [])
+        
+        # BIST 100 endeks verisini yükle (tüm hisseler için ortak)
+        index_data = self.data_loader.get_index_data(period=period)
+        
+        all_results = {}
+        
+        for symbol in symbols:
+            data = self.data_loader.fetch_stock_data(symbol, period)
+            
+            if data.empty:
+                logger.warning(f"Veri bulunamadı: {symbol}")
+                continue
+            
+            features_df = self.feature_engineer.create_all_features(data, index_data=index_data)
+            
+            if features_df.empty:
+                logger.warning(f"Özellik oluşturulamadı: {symbol}")
+                continue
+            
+            predictor = StockDirectionPredictor(self.config)
+            X, y = predictor.prepare_data(features_df)
+            results = predictor.walk_forward_evaluate(X, y, mode=mode)
+            all_results[symbol] = results
+            
+            summary = results['summary']
+            logger.info(f"{symbol}: accuracy {summary['accuracy_mean']:.4f} ± {summary['accuracy_std']:.4f}, "
+                       f"f1 {summary['f1_mean']:.4f} ({results['n_splits']} kat, {results['elapsed']:.1f} sn)")
+        
+        return all_results
+    
     def run_backtest(self, model_path: str, symbols: List[str] = None) -> Dict:
         """Backtest çalıştırır"""
         logger.info("Backtest başlıyor...")
@@ -135,6 +327,8 @@ class StockPredictionSystem:
             return None
         
         all_results = {}
+        robustness = MonteCarloAnalyzer(self.config)
+        backtest_cache = BacktestCache(self.config)
         
         # BIST 100 endeks verisini yükle (tüm hisseler için ortak)
         logger.info("BIST 100 endeks verisi yükleniyor...")
@@ -143,33 +337,36 @@ class StockPredictionSystem:
         for symbol in symbols:
             logger.info(f"Backtest çalıştırılıyor: {symbol}")
             
-            # Veri yükle
             data = self.data_loader.fetch_stock_data(symbol, "2y")
             
-            if data.empty:
-                logger.warning(f"Veri bulunamadı: {symbol}")
-                continue
-            
-            # Özellikleri oluştur
-            features_df = self.feature_engineer.create_all_features(data, index_data=index_data)
-            
-            if features_df.empty:
-                logger.warning(f"Özellik oluşturulamadı: {symbol}")
-                continue
-            
-            # Tahminler
-            X, y = self.predictor.prepare_data(features_df)
-            predictions, probabilities = self.predictor.predict(X)
+            def run_symbol_backtest():
+                prepared = self._prepare_backtest_inputs(symbol, index_data, data=data)
+                if prepared is None:
+                    return None
+                return self.backtester.run_backtest(*prepared, symbol)
             
-            # Backtest
-            results = self.backtester.run_backtest(features_df, predictions, probabilities, symbol)
+            # Backtest (aynı model, veri ve parametrelerle önceki sonuç diskten okunur)
+            results, cached = backtest_cache.get_or_run(model_path, symbol, (data, index_data),
+                                                        run_symbol_backtest, {'period': "2y"})
             
             if results:
                 all_results[symbol] = results
+                self.backtester.results = results
+                
+                # Monte Carlo güven aralıkları
+                if robustness.enabled:
+                    results['robustness'] = robustness.analyze(results, self.backtester.initial_capital)
+                    logger.info(f"\n{robustness.format_report(results['robustness'])}")
                 
-                # Grafik kaydet
+                # Grafik kaydet (önbellekten gelen sonuçta grafik varsa yeniden çizilmez)
                 plot_path = f"logs/backtest_{symbol}_{datetime.now().strftime('%Y%m%d')}.png"
-                self.backtester.plot_results(plot_path)
+                if not (cached and os.path.exists(plot_path)):
+                    self.backtester.plot_results(plot_path)
+                
+                # Kolonlu equity/işlem kayıtları (dashboard bellek eşlemeli okur)
+                log_dir = self.config.get('BACKTEST_CONFIG', {}).get('log_dir')
+                if log_dir:
+                    save_backtest_log(results, os.path.join(log_dir, f"{symbol}_{datetime.now().strftime('%Y%m%d')}"))
                 
                 # Rapor yazdır
                 report = self.backtester.generate_report()
@@ -178,12 +375,184 @@ class StockPredictionSystem:
         # Genel özet
         if all_results:
             total_return = sum([r['total_return'] for r in all_results.values()]) / len(all_results)
-            logger.info(f"\n=== GENEL BACKTEST ÖZETİ ===")
+            logger.info("\n=== GENEL BACKTEST ÖZETİ ===")
             logger.info(f"Ortalama Getiri: {total_return:.2%}")
             logger.info(f"Test Edilen Hisse Sayısı: {len(all_results)}")
         
         return all_results
     
+    def run_streaming_backtest(self, model_path: str, symbols: List[str] = None, interval: str = None) -> Dict:
+        """Diskten parça parça okunan barlarla gün içi akış backtest'i (bar içi stop/take profit)"""
+        logger.info("Akış backtest başlıyor...")
+        
+        if symbols is None:
+            symbols = self.config.get('TARGET_STOCKS', [])
+        
+        # Modeli yükle
+        if not self.predictor.load_model(model_path):
+            logger.error("Model yüklenemedi!")
+            return None
+        
+        streaming = StreamingBacktester(self.config)
+        interval = interval or streaming.interval
+        index_data = self.data_loader.get_index_data(period="2y", interval=interval)
+        
+        results = streaming.run_universe(
+            symbols, lambda symbol: model_signals(self.config, self.predictor, symbol, index_data), interval)
+        
+        if not results['summary'].empty:
+            logger.info(f"\n=== AKIŞ BACKTEST ÖZETİ ({interval}) ===\n{results['summary'].to_string(index=False)}")
+        
+        return results
+    
+    def run_walk_forward_backtest(self, symbols: List[str] = None, period: str = "2y") -> Dict:
+        """Periyodik yeniden eğitimli walk-forward backtest (örneklem dışı tahminlerle)"""
+        logger.info("Walk-forward backtest başlıyor...")
+        
+        if symbols is None:
+            symbols = self.config.get('TARGET_STOCKS', [])
+        
+        # Özellikler hisse başına bir kez hesaplanır, tüm segmentlerde paylaşılır
+        index_data = self.data_loader.get_index_data(period=period)
+        symbol_features = {}
+        for symbol in symbols:
+            data = self.data_loader.fetch_stock_data(symbol, period)
+            if data.empty:
+                logger.warning(f"Veri bulunamadı: {symbol}")
+                continue
+            
+            features_df = self.feature_engineer.create_all_features(data, index_data=index_data)
+            if features_df.empty:
+                logger.warning(f"Özellik oluşturulamadı: {symbol}")
+                continue
+            symbol_features[symbol] = features_df
+        
+        all_results = WalkForwardBacktester(self.config).run(symbol_features)
+        
+        logger.info("\n=== WALK-FORWARD BACKTEST ÖZETİ ===")
+        for symbol, results in all_results.items():
+            walk_forward = results['walk_forward']
+            accuracy = walk_forward['oos_accuracy']
+            logger.info(f"{symbol}: Getiri {results['total_return']:.2%}, "
+                       f"Sharpe {results['performance_metrics']['sharpe_ratio']:.2f}, "
+                       f"İşlem {len(results['trades'])}, {len(walk_forward['segments'])} segment, "
+                       f"örneklem dışı isabet {accuracy:.2%}" if accuracy is not None else
+                       f"{symbol}: hiçbir segment eğitilemedi")
+        
+        return all_results
+    
+    def run_portfolio_backtest(self, model_path: str, symbols: List[str] = None) -> Dict:
+        """Ortak sermayeli portföy backtest'i (tüm hisseler aynı takvimde)"""
+        logger.info("Portföy backtest başlıyor...")
+        
+        if symbols is None:
+            symbols = self.config.get('TARGET_STOCKS', [])
+        
+        # Modeli yükle
+        if not self.predictor.load_model(model_path):
+            logger.error("Model yüklenemedi!")
+            return None
+        
+        index_data = self.data_loader.get_index_data(period="2y")
+        
+        symbol_data = {}
+        for symbol in symbols:
+            prepared = self._prepare_backtest_inputs(symbol, index_data)
+            if prepared is not None:
+                symbol_data[symbol] = prepared
+        
+        portfolio_backtester = PortfolioBacktester(self.config)
+        results = portfolio_backtester.run_backtest(symbol_data)
+        if not results:
+            return None
+        
+        metrics = results['performance_metrics']
+        logger.info("\n=== PORTFÖY BACKTEST ÖZETİ ===")
+        logger.info(f"Toplam Getiri: {results['total_return']:.2%}")
+        logger.info(f"Sharpe: {metrics['sharpe_ratio']:.2f}, Max Drawdown: {metrics['max_drawdown']:.2%}")
+        logger.info(f"İşlem Sayısı: {metrics['total_trades']}, Ortalama Açık Pozisyon: {metrics['avg_open_positions']:.1f}")
+        for _, row in results['symbol_summary'].iterrows():
+            logger.info(f"  {row['symbol']}: {row['trades']} işlem, Kâr: {row['realized_pnl']:,.0f} TL, "
+                       f"Kazanma: {row['win_rate']:.0%}")
+        
+        # Monte Carlo güven aralıkları
+        robustness = MonteCarloAnalyzer(self.config)
+        if robustness.enabled:
+            results['robustness'] = robustness.analyze(results, portfolio_backtester.initial_capital)
+            logger.info(f"\n{robustness.format_report(results['robustness'])}")
+        
+        return results
+    
+    def _prepare_backtest_inputs(self, symbol: str, index_data: pd.DataFrame, period: str = "2y",
+                                 data: pd.DataFrame = None):
+        """Hisse verisi, özellikler ve tahminler - (features_df, predictions, probabilities) veya None"""
+        # Veri yükle (verilmediyse)
+        if data is None:
+            data = self.data_loader.fetch_stock_data(symbol, period)
+        
+        if data.empty:
+            logger.warning(f"Veri bulunamadı: {symbol}")
+            return None
+        
+        # Özellikleri oluştur
+        features_df = self.feature_engineer.create_all_features(data, index_data=index_data)
+        
+        if features_df.empty:
+            logger.warning(f"Özellik oluşturulamadı: {symbol}")
+            return None
+        
+        # Tahminler
+        features_df['symbol'] = symbol
+        X, y = self.predictor.prepare_data(features_df)
+        predictions, probabilities = self.predictor.predict(X)
+        
+        return features_df, predictions, probabilities
+    
+    def run_parameter_sweep(self, model_path: str, symbols: List[str] = None, grid: Dict = None,
+                            random_ranges: Dict = None, n_samples: int = None) -> Dict:
+        """Backtest parametre taraması (tahminler hisse başına bir kez, kombinasyonlar paralel)"""
+        logger.info("Parametre taraması başlıyor...")
+        
+        # Rastgele aralıklar örnek sayısı olmadan (config'de 0) sessizce düşerdi
+        if random_ranges and not n_samples:
+            logger.error("Rastgele aralıklar için örnek sayısı gerekli (--samples)!")
+            return None
+        
+        if symbols is None:
+            symbols = self.config.get('TARGET_STOCKS', [])
+        
+        # Modeli yükle
+        if not self.predictor.load_model(model_path):
+            logger.error("Model yüklenemedi!")
+            return None
+        
+        sweep = ParameterSweep(self.config)
+        index_data = self.data_loader.get_index_data(period="2y")
+        
+        for symbol in symbols:
+            prepared = self._prepare_backtest_inputs(symbol, index_data)
+            if prepared is not None:
+                sweep.add_symbol(*prepared, symbol)
+        
+        # Yalnızca rastgele aralıklar verildiyse örnekler config grid'iyle çaprazlanmaz
+        if not grid:
+            grid = {} if random_ranges else None
+        combinations = sweep.build_combinations(grid, random_ranges or None, n_samples)
+        results = sweep.run(combinations)
+        if results.empty:
+            return None
+        
+        output_path = sweep.save_results(results)
+        summary = sweep.summarize(results)
+        
+        logger.info(f"\n=== PARAMETRE TARAMASI ({sweep.rank_by}) ===")
+        for _, row in summary.head(5).iterrows():
+            params = ", ".join(f"{name}={row[name]:.4g}" for name in sweep.swept_parameters)
+            logger.info(f"{params} -> Getiri: {row['total_return']:.2%}, Sharpe: {row['sharpe_ratio']:.2f}, "
+                       f"Drawdown: {row['max_drawdown']:.2%}, İşlem: {row['total_trades']:.0f}")
+        
+        return {'results': results, 'summary': summary, 'output_path': output_path}
+    
     def run_paper_trading(self, model_path: str, symbols: List[str] = None) -> None:
         """Paper trading başlatır"""
         logger.info("Paper trading başlıyor...")
@@ -269,12 +638,20 @@ class StockPredictionSystem:
 def main():
     """Ana fonksiyon"""
     parser = argparse.ArgumentParser(description='Hisse Senedi Yön Tahmini Sistemi')
-    parser.add_argument('command', choices=['train', 'backtest', 'paper-trade', 'signals', 'portfolio'],
+    parser.add_argument('command', choices=['train', 'update', 'tune', 'validate', 'backtest', 'wf-backtest', 'portfolio-backtest', 'stream-backtest', 'sweep', 'paper-trade', 'signals', 'portfolio'],
                        help='Çalıştırılacak komut')
     parser.add_argument('--model-path', help='Model dosya yolu')
     parser.add_argument('--symbols', nargs='+', help='İşlem yapılacak hisse senetleri')
     parser.add_argument('--period', default='2y', help='Veri periyodu')
     parser.add_argument('--model-name', help='Model ismi (opsiyonel)')
+    parser.add_argument('--tune', action='store_true', help='Eğitimden önce hiperparametre araması yap')
+    parser.add_argument('--pooled', action='store_true', default=None,
+                       help='Tüm hisseler için diskten akışlı (out-of-core) tek model eğit')
+    parser.add_argument('--wf-mode', choices=['expanding', 'rolling'], help='Walk-forward pencere tipi')
+    parser.add_argument('--grid', nargs='+', help='Tarama grid\'i, ör. stop_loss_pct=0.03,0.05 take_profit_pct=0.08,0.12')
+    parser.add_argument('--random', nargs='+', help='Rastgele aralıklar, ör. confidence_threshold=0.5:0.7')
+    parser.add_argument('--samples', type=int, help='Rastgele aralıklardan çekilecek kombinasyon sayısı (--random ile gerekli)')
+    parser.add_argument('--interval', help='Zaman dilimi (stream-backtest), ör. 1h')
     
     args = parser.parse_args()
     
@@ -284,10 +661,35 @@ def main():
         
         if args.command == 'train':
             # Model eğitimi
-            model_path = system.train_model(args.symbols, args.period, args.model_name)
+            model_path = system.train_model(args.symbols, args.period, args.model_name, args.tune, args.pooled)
             if model_path:
                 logger.info(f"Model eğitimi tamamlandı: {model_path}")
         
+        elif args.command == 'update':
+            # Artımlı model güncellemesi
+            if not args.model_path:
+                logger.error("Güncelleme için model yolu gerekli!")
+                return
+            
+            model_path = system.update_model(args.model_path, args.symbols, args.period)
+            if model_path:
+                logger.info(f"Model güncellemesi tamamlandı: {model_path}")
+        
+        elif args.command == 'tune':
+            # Volatilite grubu bazlı hiperparametre araması
+            results = system.tune_volatility_buckets(args.symbols, args.period)
+            for bucket, result in results.items():
+                baseline = result['baseline_score']
+                baseline_text = f"{baseline:.4f}" if baseline is not None else "yok"
+                logger.info(f"{bucket}: logloss {result['best_score']:.4f} "
+                          f"(referans {baseline_text}) - {result['best_params']}")
+        
+        elif args.command == 'validate':
+            # Walk-forward doğrulama
+            results = system.validate_model(args.symbols, args.period, args.wf_mode)
+            if results:
+                logger.info("Walk-forward doğrulama tamamlandı!")
+        
         elif args.command == 'backtest':
             # Backtest
             if not args.model_path:
@@ -298,6 +700,43 @@ def main():
             if results:
                 logger.info("Backtest tamamlandı!")
         
+        elif args.command == 'wf-backtest':
+            # Walk-forward backtest (model yolu gerekmez, segment başına yeniden eğitilir)
+            results = system.run_walk_forward_backtest(args.symbols, args.period)
+            if results:
+                logger.info("Walk-forward backtest tamamlandı!")
+        
+        elif args.command == 'portfolio-backtest':
+            # Ortak sermayeli portföy backtest'i
+            if not args.model_path:
+                logger.error("Portföy backtest için model yolu gerekli!")
+                return
+            
+            results = system.run_portfolio_backtest(args.model_path, args.symbols)
+            if results:
+                logger.info("Portföy backtest tamamlandı!")
+        
+        elif args.command == 'stream-backtest':
+            # Diskten akışlı gün içi backtest
+            if not args.model_path:
+                logger.error("Akış backtest için model yolu gerekli!")
+                return
+            
+            results = system.run_streaming_backtest(args.model_path, args.symbols, args.interval)
+            if results:
+                logger.info("Akış backtest tamamlandı!")
+        
+        elif args.command == 'sweep':
+            # Backtest parametre taraması
+            if not args.model_path:
+                logger.error("Parametre taraması için model yolu gerekli!")
+                return
+            
+            results = system.run_parameter_sweep(args.model_path, args.symbols, parse_grid_args(args.grid),
+                                                 parse_random_args(args.random), args.samples)
+            if results:
+                logger.info(f"Parametre taraması tamamlandı: {results['output_path']}")
+        
         elif args.command == 'paper-trade':
             # Paper trading
             if not args.model_path:
@@ -11,6 +11,11 @@ from datetime import datetime, timedelta
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+from performance_metrics import compute_metrics, drawdown_series, trades_to_array
+from backtest_log import allocate_equity_log, equity_frame
+from backtest_kernel import (run_kernel, prediction_codes, day_numbers, ACTION_BUY, ACTION_BUY_REJECTED,
+                             EXIT_STOP_LOSS, EXIT_TAKE_PROFIT)
+
 logger = logging.getLogger(__name__)
 
 class Backtester:
@@ -171,7 +176,7 @@ class Backtester:
         return confidence_threshold
     
     def run_backtest(self, features_df: pd.DataFrame, predictions: np.ndarray, 
-                    probabilities: np.ndarray, symbol: str) -> Dict:
+                    probabilities: np.ndarray, symbol: str, engine: Optional[str] = None) -> Dict:
         """
         Backtest çalıştırır
         
@@ -180,10 +185,15 @@ class Backtester:
             predictions: Model tahminleri
             probabilities: Tahmin olasılıkları
             symbol: Hisse sembolü
+            engine: 'vectorized' (NumPy durum makinesi) veya 'loop' (satır satır) - None ise config
             
         Returns:
             Backtest sonuçları
         """
+        engine = engine or self.backtest_config.get('engine', 'vectorized')
+        if engine not in ('vectorized', 'loop'):
+            raise ValueError(f"Bilinmeyen backtest motoru: {engine}")
+        
         logger.info(f"Backtest başlıyor: {symbol}")
         
         # Volatilite hesapla ve dinamik eşik belirle
@@ -193,6 +203,45 @@ class Backtester:
         
         logger.info(f"{symbol} volatilitesi: %{volatility*100:.1f}, Güven eşiği: {confidence_threshold:.2f}")
         
+        # Güven skorları (0-1 arası normalize) - Düzeltilmiş hesaplama
+        confidence_scores = np.max(probabilities, axis=1)  # En yüksek olasılığı al
+        
+        if engine == 'vectorized':
+            equity_log, trade_log, capital = self._run_vectorized(features_df, predictions, confidence_scores,
+                                                                  symbol, confidence_threshold)
+        else:
+            equity_log, trade_log, capital = self._run_loop(features_df, predictions, confidence_scores,
+                                                            symbol, confidence_threshold)
+        
+        # Equity eğrisi yapılandırılmış dizinin kolonlarından, işlemler kompakt kayıt dizisine
+        equity_df = equity_frame(equity_log, features_df.index)
+        trade_records = trades_to_array(trade_log, [symbol])
+        
+        # Performans metrikleri (alış-satış çiftleri aynı geçişte)
+        performance_metrics, round_trips = compute_metrics(equity_df, trade_records, self.initial_capital)
+        
+        # Sonuçları kaydet
+        self.results = {
+            'symbol': symbol,
+            'equity_curve': equity_df,
+            'trades': trade_log,
+            'equity_log': equity_log,
+            'trade_records': trade_records,
+            'round_trips': round_trips,
+            'performance_metrics': performance_metrics,
+            'final_capital': capital,
+            'total_return': (capital - self.initial_capital) / self.initial_capital
+        }
+        
+        logger.info(f"Backtest tamamlandı: {symbol}")
+        logger.info(f"Toplam getiri: {self.results['total_return']:.2%}")
+        logger.info(f"Toplam işlem sayısı: {len(trade_log)}")
+        
+        return self.results
+    
+    def _run_loop(self, features_df: pd.DataFrame, predictions: np.ndarray, confidence_scores: np.ndarray,
+                  symbol: str, confidence_threshold: float) -> Tuple[np.ndarray, List[Dict], float]:
+        """Satır satır (iterrows) backtest döngüsü - (equity kaydı, işlemler, son sermaye) döndürür"""
         # Başlangıç değerleri
         capital = self.initial_capital
         position = 0  # Pozisyon miktarı
@@ -201,13 +250,10 @@ class Backtester:
         daily_trades = 0
         last_trade_date = None
         
-        # Sonuç listeleri
-        equity_values = []
+        # Sonuç kayıtları (equity bar başına önceden ayrılmış dizide)
+        equity_log = allocate_equity_log(features_df.index)
         trade_log = []
         
-        # Güven skorları (0-1 arası normalize) - Düzeltilmiş hesaplama
-        confidence_scores = np.max(probabilities, axis=1)  # En yüksek olasılığı al
-        
         for i, (date, row) in enumerate(features_df.iterrows()):
             current_price = row['close']
             prediction = predictions[i]
@@ -276,13 +322,10 @@ class Backtester:
             else:
                 current_equity = capital
             
-            equity_values.append({
-                'date': date,
-                'equity': current_equity,
-                'capital': capital,
-                'position_value': position * current_price if position > 0 else 0,
-                'position': position
-            })
+            equity_log['equity'][i] = current_equity
+            equity_log['capital'][i] = capital
+            equity_log['position_value'][i] = position * current_price if position > 0 else 0
+            equity_log['position'][i] = position
         
         # Son pozisyonu kapat
         if position > 0:
@@ -293,79 +336,72 @@ class Backtester:
                 capital = trade['capital_after']
                 trade_log.append(trade)
         
-        # Sonuçları hazırla
-        equity_df = pd.DataFrame(equity_values)
-        equity_df.set_index('date', inplace=True)
+        return equity_log, trade_log, capital
+    
+    def _run_vectorized(self, features_df: pd.DataFrame, predictions: np.ndarray, confidence_scores: np.ndarray,
+                        symbol: str, confidence_threshold: float) -> Tuple[np.ndarray, List[Dict], float]:
+        """
+        NumPy durum makinesi ile backtest (_run_loop ile aynı işlemler ve equity eğrisi)
         
-        # Performans metrikleri
-        performance_metrics = self._calculate_performance_metrics(equity_df, trade_log)
+        Pozisyon büyüklüğü ve maliyetler tüm barlar için tek seferde hesaplanır, döngü
+        backtest_kernel içinde yalnızca dizilerle çalışır.
+        """
+        n = len(features_df)
+        dates = features_df.index
+        prices = features_df['close'].to_numpy(dtype=np.float64)
+        confidence = np.asarray(confidence_scores[:n], dtype=np.float64)
         
-        # Sonuçları kaydet
-        self.results = {
-            'symbol': symbol,
-            'equity_curve': equity_df,
-            'trades': trade_log,
-            'performance_metrics': performance_metrics,
-            'final_capital': capital,
-            'total_return': (capital - self.initial_capital) / self.initial_capital
-        }
+        result = run_kernel(prices, prediction_codes(predictions[:n]), confidence, day_numbers(dates),
+                            self.initial_capital, self.max_position_size, self.stop_loss_pct,
+                            self.take_profit_pct, self.commission_rate, self.slippage_rate,
+                            confidence_threshold, self.max_daily_trades)
         
-        logger.info(f"Backtest tamamlandı: {symbol}")
-        logger.info(f"Toplam getiri: {self.results['total_return']:.2%}")
-        logger.info(f"Toplam işlem sayısı: {len(trade_log)}")
+        # İşlem kayıtları (olay barlarının değerleri tek seferde alınır)
+        trade_log = []
+        event_bar = result['event_bar']
+        events = zip(dates[event_bar], prices[event_bar], result['event_action'], result['event_reason'],
+                     result['quantity'][event_bar], result['size'][event_bar], result['costs'][event_bar],
+                     confidence[event_bar], result['event_capital_after'])
+        for date, current_price, action, reason, quantity, position_size, costs, bar_confidence, capital_after in events:
+            if action == ACTION_BUY_REJECTED:
+                logger.warning(f"Yetersiz sermaye: {symbol} - {date}")
+                continue
+            
+            trade_log.append({
+                'date': date,
+                'symbol': symbol,
+                'action': 'buy' if action == ACTION_BUY else 'sell',
+                'price': current_price,
+                'quantity': quantity,
+                'position_size': position_size,
+                'costs': costs,
+                'confidence': bar_confidence,
+                'capital_after': capital_after
+            })
+            if reason == EXIT_STOP_LOSS:
+                logger.info(f"Stop loss: {symbol} - {date} - Fiyat: {current_price:.2f}")
+            elif reason == EXIT_TAKE_PROFIT:
+                logger.info(f"Take profit: {symbol} - {date} - Fiyat: {current_price:.2f}")
         
-        return self.results
+        equity_log = allocate_equity_log(dates)
+        equity_log['equity'] = result['equity']
+        equity_log['capital'] = result['capital']
+        equity_log['position_value'] = result['position_value']
+        equity_log['position'] = result['position']
+        
+        # Son pozisyonu kapat
+        capital = result['capital'][-1] if n > 0 else self.initial_capital
+        if n > 0 and result['position'][-1] > 0:
+            trade = self.execute_trade(dates[-1], symbol, 'sell', prices[-1], 0.5, capital)
+            if trade:
+                capital = trade['capital_after']
+                trade_log.append(trade)
+        
+        return equity_log, trade_log, capital
     
     def _calculate_performance_metrics(self, equity_df: pd.DataFrame, trades: List[Dict]) -> Dict:
-        """Performans metriklerini hesaplar"""
-        
-        # Temel metrikler
-        total_return = (equity_df['equity'].iloc[-1] - self.initial_capital) / self.initial_capital
-        
-        # Günlük getiriler
-        daily_returns = equity_df['equity'].pct_change().dropna()
-        
-        # Sharpe ratio
-        sharpe_ratio = daily_returns.mean() / daily_returns.std() * np.sqrt(252) if daily_returns.std() > 0 else 0
-        
-        # Maximum drawdown
-        rolling_max = equity_df['equity'].expanding().max()
-        drawdown = (equity_df['equity'] - rolling_max) / rolling_max
-        max_drawdown = drawdown.min()
-        
-        # Win rate - doğru hesaplama
-        profitable_trades = []
-        for i, trade in enumerate(trades):
-            if trade['action'] == 'sell' and i > 0:
-                prev_trade = trades[i-1]
-                if prev_trade['action'] == 'buy' and trade['price'] > prev_trade['price']:
-                    profitable_trades.append(trade)
-        
-        total_sell_trades = len([t for t in trades if t['action'] == 'sell'])
-        win_rate = len(profitable_trades) / total_sell_trades if total_sell_trades > 0 else 0
-        
-        # Ortalama işlem süresi
-        trade_durations = []
-        for i, trade in enumerate(trades):
-            if trade['action'] == 'sell' and i > 0:
-                prev_trade = trades[i-1]
-                if prev_trade['action'] == 'buy':
-                    duration = (trade['date'] - prev_trade['date']).days
-                    trade_durations.append(duration)
-        
-        avg_trade_duration = np.mean(trade_durations) if trade_durations else 0
-        
-        metrics = {
-            'total_return': total_return,
-            'annualized_return': (1 + total_return) ** (252 / len(equity_df)) - 1,
-            'sharpe_ratio': sharpe_ratio,
-            'max_drawdown': max_drawdown,
-            'win_rate': win_rate,
-            'total_trades': len(trades),
-            'avg_trade_duration': avg_trade_duration,
-            'volatility': daily_returns.std() * np.sqrt(252)
-        }
-        
+        """Performans metriklerini hesaplar (yıllıklandırma bar aralığından)"""
+        metrics, _ = compute_metrics(equity_df, trades, self.initial_capital)
         return metrics
     
     def plot_results(self, save_path: str = None):
@@ -384,24 +420,16 @@ class Backtester:
         axes[0, 0].grid(True)
         
         # Drawdown
-        rolling_max = equity_df['equity'].expanding().max()
-        drawdown = (equity_df['equity'] - rolling_max) / rolling_max * 100
+        drawdown = drawdown_series(equity_df['equity'].to_numpy()) * 100
         axes[0, 1].fill_between(equity_df.index, drawdown, 0, alpha=0.3, color='red')
         axes[0, 1].set_title("Drawdown (%)")
         axes[0, 1].set_ylabel("Drawdown (%)")
         axes[0, 1].grid(True)
         
         # Trade distribution
-        trades = self.results['trades']
-        trade_returns = []
-        for i, trade in enumerate(trades):
-            if trade['action'] == 'sell' and i > 0:
-                prev_trade = trades[i-1]
-                if prev_trade['action'] == 'buy':
-                    ret = (trade['price'] - prev_trade['price']) / prev_trade['price']
-                    trade_returns.append(ret)
-        
-        if trade_returns:
+        trade_returns = self.results['round_trips']['return']
+        
+        if len(trade_returns):
             axes[1, 0].hist(trade_returns, bins=20, alpha=0.7)
             axes[1, 0].set_title("İşlem Getirileri Dağılımı")
             axes[1, 0].set_xlabel("Getiri")
@@ -449,9 +477,12 @@ PERFORMANS METRİKLERİ:
 - Toplam Getiri: {metrics['total_return']:.2%}
 - Yıllık Getiri: {metrics['annualized_return']:.2%}
 - Sharpe Ratio: {metrics['sharpe_ratio']:.3f}
-- Maksimum Drawdown: {metrics['max_drawdown']:.2%}
+- Sortino Ratio: {metrics['sortino_ratio']:.3f}
+- Maksimum Drawdown: {metrics['max_drawdown']:.2%} ({metrics['max_drawdown_duration']} bar)
 - Kazanma Oranı: {metrics['win_rate']:.2%}
+- Kâr Faktörü: {metrics['profit_factor']:.2f}
 - Toplam İşlem: {metrics['total_trades']}
+- Piyasada Kalma: {metrics['exposure']:.2%}
 - Ortalama İşlem Süresi: {metrics['avg_trade_duration']:.1f} gün
 - Volatilite: {metrics['volatility']:.2%}
 
@@ -0,0 +1,216 @@
+"""
+Backtest Sonuç Önbelleği
+(model artefakt hash'i, veri filigranı, parametre hash'i) anahtarlı disk önbelleği - equity eğrisi ve işlemler kolonlu kayıtlardan okunur
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import logging
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+import pandas as pd
+
+from model_artifact import artifact_files
+from backtest_log import save_backtest_log, load_backtest_results, META_FILE
+
+logger = logging.getLogger(__name__)
+
+# Backtest sonucunu etkileyen konfigürasyon bölümleri
+PARAM_SECTIONS = ('MODEL_CONFIG', 'RISK_MANAGEMENT', 'BACKTEST_CONFIG')
+
+# Sonucu değiştirmeyen BACKTEST_CONFIG anahtarları (iki motor birebir aynı sonuç verir)
+IGNORED_PARAMS = ('engine', 'log_dir')
+
+# Filigrana değerleri katılan son bar sayısı (yerinde güncellenen barlar)
+WATERMARK_TAIL_ROWS = 3
+
+def data_watermark(*frames: pd.DataFrame) -> str:
+    """
+    Verinin filigranı: her çerçevenin ilk/son bar zamanı, bar sayısı ve son barların değer hash'i
+
+    Yeni bar geldiğinde, dönem değiştiğinde veya veri kaynağı son (tamamlanmamış) barı
+    aynı zaman damgasıyla yeniden yazdığında filigran değişir.
+    """
+    parts = []
+    for frame in frames:
+        if frame is None or frame.empty:
+            parts.append('empty')
+        else:
+            tail_hash = hashlib.sha256(
+                pd.util.hash_pandas_object(frame.tail(WATERMARK_TAIL_ROWS), index=True).to_numpy().tobytes()
+            ).hexdigest()[:16]
+            parts.append(f"{frame.index[0]}/{frame.index[-1]}/{len(frame)}/{tail_hash}")
+    return '|'.join(parts)
+
+def params_hash(config: Dict, extra: Optional[Dict] = None) -> str:
+    """Backtest parametrelerinin hash'i (PARAM_SECTIONS + ek parametreler)"""
+    params = {section: config.get(section, {}) or {} for section in PARAM_SECTIONS}
+    params['BACKTEST_CONFIG'] = {name: value for name, value in params['BACKTEST_CONFIG'].items()
+                                 if name not in IGNORED_PARAMS}
+    params['extra'] = extra or {}
+    payload = json.dumps(params, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class BacktestCache:
+    def __init__(self, config: Dict):
+        """
+        Disk üzerinde backtest sonuç önbelleği
+
+        Kayıt dizini adı hisse, model hash'i, parametre hash'i ve veri filigranından oluşur.
+        Yeni bar geldiğinde aynı hisse/model/parametre için eski filigranlı kayıt silinir;
+        yeni model eski kayıtları kullanmaz, bunlar en eski erişim sırasıyla atılır.
+
+        Args:
+            config: Sistem konfigürasyonu (BACKTEST_CACHE bölümü)
+        """
+        self.config = config
+        cache_config = config.get('BACKTEST_CACHE', {}) or {}
+
+        self.enabled = cache_config.get('enabled', True)
+        self.cache_dir = cache_config.get('cache_dir', 'logs/backtest_cache')
+        self.max_entries = cache_config.get('max_entries', 200)
+
+        self._model_hashes = {}  # (yol, mtime, boyut) -> içerik hash'i
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def model_hash(self, model_path: str) -> str:
+        """Model artefakt dosyalarının içerik hash'i (dosya değişmedikçe yeniden okunmaz)"""
+        files = [path for path in artifact_files(model_path) if os.path.exists(path)]
+        stats = tuple((os.path.abspath(path), os.stat(path).st_mtime_ns, os.stat(path).st_size) for path in files)
+
+        with self._lock:
+            if stats in self._model_hashes:
+                return self._model_hashes[stats]
+
+        digest = hashlib.sha256()
+        for path in files:
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1024 * 1024), b''):
+                    digest.update(block)
+
+        with self._lock:
+            self._model_hashes[stats] = digest.hexdigest()
+        return digest.hexdigest()
+
+    def make_key(self, model_path: str, symbol: str, watermark: str, extra_params: Optional[Dict] = None) -> str:
+        """
+        Kayıt anahtarı: <hisse>_<model hash>_<parametre hash>_<filigran hash>
+
+        Args:
+            model_path: Model dosya yolu
+            symbol: Hisse sembolü
+            watermark: data_watermark çıktısı
+            extra_params: Konfigürasyon dışındaki backtest girdileri (ör. dönem)
+        """
+        symbol_part = symbol.replace('.', '_').replace('/', '_')
+        watermark_hash = hashlib.sha256(watermark.encode('utf-8')).hexdigest()
+        return (f"{symbol_part}_{self.model_hash(model_path)[:16]}_"
+                f"{params_hash(self.config, extra_params)[:16]}_{watermark_hash[:16]}")
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Kayıtlı backtest sonucunu döndürür (yoksa None)"""
+        directory = os.path.join(self.cache_dir, key)
+        meta_path = os.path.join(directory, META_FILE)
+        if not os.path.exists(meta_path):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        try:
+            results = load_backtest_results(directory)
+        except Exception as e:
+            logger.warning(f"Backtest önbellek kaydı okunamadı, siliniyor: {key} ({str(e)})")
+            shutil.rmtree(directory, ignore_errors=True)
+            with self._lock:
+                self.misses += 1
+            return None
+
+        # Erişim zamanı: en eski kayıtlar önce atılır
+        os.utime(meta_path)
+        with self._lock:
+            self.hits += 1
+        logger.info(f"Backtest önbellekten okundu: {key}")
+        return results
+
+    def put(self, key: str, results: Dict) -> None:
+        """Backtest sonucunu yazar; aynı hisse/model/parametrenin eski filigranlı kayıtlarını siler"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        directory = os.path.join(self.cache_dir, key)
+
+        # Yarım yazılmış kayıt okunmasın: geçici dizine yaz, sonra yer değiştir
+        tmp_directory = f"{directory}.tmp{threading.get_ident()}"
+        try:
+            save_backtest_log(results, tmp_directory)
+            shutil.rmtree(directory, ignore_errors=True)
+            os.replace(tmp_directory, directory)
+        except Exception as e:
+            logger.warning(f"Backtest önbelleğe yazılamadı: {key} ({str(e)})")
+            shutil.rmtree(tmp_directory, ignore_errors=True)
+            return
+
+        prefix = key.rsplit('_', 1)[0] + '_'
+        with self._lock:
+            for name in os.listdir(self.cache_dir):
+                if name.startswith(prefix) and name != key and '.tmp' not in name:
+                    shutil.rmtree(os.path.join(self.cache_dir, name), ignore_errors=True)
+            self._evict()
+
+    def _evict(self) -> None:
+        # Kilit altında çağrılır; en uzun süre erişilmeyen kayıtlar atılır
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            meta_path = os.path.join(self.cache_dir, name, META_FILE)
+            if '.tmp' not in name and os.path.exists(meta_path):
+                entries.append((os.stat(meta_path).st_mtime_ns, name))
+
+        for _, name in sorted(entries)[:max(0, len(entries) - self.max_entries)]:
+            shutil.rmtree(os.path.join(self.cache_dir, name), ignore_errors=True)
+            logger.debug(f"Backtest önbellekten çıkarıldı: {name}")
+
+    def get_or_run(self, model_path: str, symbol: str, frames: Tuple[pd.DataFrame, ...],
+                   run_func: Callable[[], Optional[Dict]], extra_params: Optional[Dict] = None) -> Tuple[Optional[Dict], bool]:
+        """
+        Önbellekteki sonucu döndürür, yoksa run_func'ı çalıştırıp yazar
+
+        Args:
+            model_path: Model dosya yolu
+            symbol: Hisse sembolü
+            frames: Backtest girdisi ham veriler (hisse, endeks) - filigran bunlardan
+            run_func: Özellik, tahmin ve backtest'i yapan fonksiyon
+            extra_params: Konfigürasyon dışındaki backtest girdileri
+
+        Returns:
+            (sonuç, önbellekten mi)
+        """
+        if not self.enabled:
+            return run_func(), False
+
+        key = self.make_key(model_path, symbol, data_watermark(*frames), extra_params)
+        results = self.get(key)
+        if results is not None:
+            return results, True
+
+        results = run_func()
+        if results:
+            self.put(key, results)
+        return results, False
+
+    def get_stats(self) -> Dict:
+        """Önbellek metrikleri: isabet/ıska ve kayıt sayısı"""
+        with self._lock:
+            requests = self.hits + self.misses
+            entries = 0
+            if os.path.isdir(self.cache_dir):
+                entries = sum(1 for name in os.listdir(self.cache_dir) if '.tmp' not in name)
+            return {
+                'entries': entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / requests if requests else 0.0
+            }
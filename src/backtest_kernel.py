@@ -0,0 +1,193 @@
+"""
+Backtest Çekirdeği
+Long-only stop-loss / take-profit / sinyal çıkışlı stratejinin NumPy dizileri üzerinde çalışan durum makinesi
+"""
+
+import logging
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# numba opsiyonel: kuruluysa çekirdek derlenir, değilse aynı kod saf Python/NumPy ile çalışır
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# İşlem olay kodları
+ACTION_SELL = 0
+ACTION_BUY = 1
+ACTION_BUY_REJECTED = 2  # Yetersiz sermaye
+
+# Çıkış nedenleri
+EXIT_NONE = 0
+EXIT_STOP_LOSS = 1
+EXIT_TAKE_PROFIT = 2
+EXIT_SIGNAL = 3
+
+def _state_machine(price, prediction, confidence, day, size, quantity, costs,
+                   initial_capital, stop_loss_pct, take_profit_pct, confidence_threshold, max_daily_trades):
+    n = len(price)
+
+    equity = np.empty(n)
+    capital_curve = np.empty(n)
+    position_value = np.empty(n)
+    position_curve = np.empty(n)
+
+    # Her bar en fazla bir olay üretir
+    event_bar = np.empty(n, dtype=np.int64)
+    event_action = np.empty(n, dtype=np.int8)
+    event_reason = np.empty(n, dtype=np.int8)
+    event_capital_after = np.empty(n)
+    n_events = 0
+
+    capital = initial_capital
+    position = 0.0
+    entry_price = 0.0
+    daily_trades = 0
+    last_day = -1
+
+    for i in range(n):
+        current_price = price[i]
+
+        # Günlük işlem sayısı gün değişiminde sıfırlanır
+        if day[i] != last_day:
+            daily_trades = 0
+            last_day = day[i]
+
+        if position > 0:
+            reason = EXIT_NONE
+            if current_price <= entry_price * (1 - stop_loss_pct):
+                reason = EXIT_STOP_LOSS
+            elif current_price >= entry_price * (1 + take_profit_pct):
+                reason = EXIT_TAKE_PROFIT
+            elif prediction[i] == 0 and confidence[i] > confidence_threshold:
+                reason = EXIT_SIGNAL
+
+            if reason != EXIT_NONE:
+                # execute_trade ile aynı: işlem kaydındaki sermaye bardaki güvene göre hesaplanır
+                event_bar[n_events] = i
+                event_action[n_events] = ACTION_SELL
+                event_reason[n_events] = reason
+                event_capital_after[n_events] = capital + (quantity[i] * current_price) - costs[i]
+                n_events += 1
+
+                capital = capital + (position * current_price) - costs[i]
+                position = 0.0
+                daily_trades += 1
+
+        elif position == 0 and daily_trades < max_daily_trades:
+            if prediction[i] == 1 and confidence[i] > confidence_threshold:
+                event_bar[n_events] = i
+                event_reason[n_events] = EXIT_NONE
+                if size[i] + costs[i] > capital:
+                    event_action[n_events] = ACTION_BUY_REJECTED
+                    event_capital_after[n_events] = capital
+                else:
+                    capital = capital - (size[i] + costs[i])
+                    position = quantity[i]
+                    entry_price = current_price
+                    daily_trades += 1
+                    event_action[n_events] = ACTION_BUY
+                    event_capital_after[n_events] = capital
+                n_events += 1
+
+        capital_curve[i] = capital
+        position_curve[i] = position
+        if position > 0:
+            position_value[i] = position * current_price
+            equity[i] = capital + (position * current_price)
+        else:
+            position_value[i] = 0.0
+            equity[i] = capital
+
+    return (equity, capital_curve, position_value, position_curve,
+            event_bar[:n_events], event_action[:n_events], event_reason[:n_events],
+            event_capital_after[:n_events])
+
+_kernel = njit(cache=True)(_state_machine) if NUMBA_AVAILABLE else _state_machine
+
+def prediction_codes(predictions: np.ndarray) -> np.ndarray:
+    """Tahmin kodları: 1 = yükseliş, 0 = düşüş, -1 = diğer"""
+    predictions = np.asarray(predictions)
+    return np.where(predictions == 1, 1, np.where(predictions == 0, 0, -1))
+
+def day_numbers(dates: pd.DatetimeIndex) -> np.ndarray:
+    """Bar başına gün numarası (date.date() değişiminde artar)"""
+    day_keys = dates.normalize()
+    days = np.zeros(len(dates), dtype=np.int64)
+    if len(dates) > 1:
+        days[1:] = np.cumsum(day_keys[1:] != day_keys[:-1])
+    return days
+
+def trade_arrays(price: np.ndarray, confidence: np.ndarray, base_position: float,
+                 commission_rate: float, slippage_rate: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Her bar için işlem büyüklüğü, miktar ve maliyet
+
+    Backtester.calculate_position_size / calculate_trade_costs ile aynı işlem sırası
+    kullanıldığından sonuçlar bit düzeyinde aynıdır.
+    """
+    size = base_position * np.minimum(confidence * 2, 1.0)
+    quantity = size / price
+    trade_value = price * quantity
+    costs = trade_value * commission_rate + trade_value * slippage_rate
+    return size, quantity, costs
+
+def run_kernel(price: np.ndarray, prediction: np.ndarray, confidence: np.ndarray, day: np.ndarray,
+               initial_capital: float, max_position_size: float, stop_loss_pct: float,
+               take_profit_pct: float, commission_rate: float, slippage_rate: float,
+               confidence_threshold: float, max_daily_trades: int) -> Dict[str, np.ndarray]:
+    """
+    Backtest durum makinesini çalıştırır
+
+    Args:
+        price: Kapanış fiyatları
+        prediction: Model tahminleri (1 = yükseliş, 0 = düşüş)
+        confidence: Güven skorları (en yüksek sınıf olasılığı)
+        day: Bar başına gün numarası (günlük işlem sınırı için)
+        initial_capital, max_position_size, stop_loss_pct, take_profit_pct,
+        commission_rate, slippage_rate, confidence_threshold, max_daily_trades: Strateji parametreleri
+
+    Returns:
+        equity, capital, position_value, position (bar başına) ve size, quantity, costs ile
+        olay dizileri (event_bar, event_action, event_reason, event_capital_after)
+    """
+    price = np.ascontiguousarray(price, dtype=np.float64)
+    confidence = np.ascontiguousarray(confidence, dtype=np.float64)
+    prediction = np.ascontiguousarray(prediction, dtype=np.int64)
+    day = np.ascontiguousarray(day, dtype=np.int64)
+
+    size, quantity, costs = trade_arrays(price, confidence, initial_capital * max_position_size,
+                                         commission_rate, slippage_rate)
+
+    if NUMBA_AVAILABLE:
+        inputs = (price, prediction, confidence, day, size, quantity, costs)
+    else:
+        # Saf Python döngüsünde liste indeksleme NumPy skalerlerinden hızlıdır (değerler aynı kalır)
+        inputs = tuple(array.tolist() for array in (price, prediction, confidence, day, size, quantity, costs))
+
+    (equity, capital, position_value, position,
+     event_bar, event_action, event_reason, event_capital_after) = _kernel(
+        *inputs,
+        float(initial_capital), float(stop_loss_pct), float(take_profit_pct),
+        float(confidence_threshold), int(max_daily_trades)
+    )
+
+    return {
+        'equity': equity,
+        'capital': capital,
+        'position_value': position_value,
+        'position': position,
+        'size': size,
+        'quantity': quantity,
+        'costs': costs,
+        'event_bar': event_bar,
+        'event_action': event_action,
+        'event_reason': event_reason,
+        'event_capital_after': event_capital_after
+    }
@@ -0,0 +1,237 @@
+"""
+Backtest Kayıtları
+Equity ve işlem kayıtları için yapılandırılmış NumPy dizileri ve bellek eşlemeli (.npy) kolonlu saklama
+"""
+
+import os
+import json
+import logging
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from performance_metrics import epoch_ns, trades_to_array, pair_round_trips
+
+logger = logging.getLogger(__name__)
+
+# Bar bazlı equity kaydının yapılandırılmış dizi tipi
+EQUITY_DTYPE = np.dtype([
+    ('time', 'i8'),            # Bar zamanı (epoch ns)
+    ('equity', 'f8'),
+    ('capital', 'f8'),
+    ('position_value', 'f8'),
+    ('position', 'f8')         # Pozisyon miktarı (lot)
+])
+
+# equity_curve DataFrame kolonları (zaman indekste)
+EQUITY_COLUMNS = ['equity', 'capital', 'position_value', 'position']
+
+# Kayıt dizininin dosyaları
+EQUITY_FILE = 'equity.npy'
+TRADES_FILE = 'trades.npy'
+ROUND_TRIPS_FILE = 'round_trips.npy'
+META_FILE = 'meta.json'
+
+def allocate_equity_log(dates: pd.DatetimeIndex) -> np.ndarray:
+    """Bar sayısı kadar önceden ayrılmış equity kaydı (zaman alanı dolu)"""
+    equity_log = np.zeros(len(dates), dtype=EQUITY_DTYPE)
+    equity_log['time'] = epoch_ns(dates)
+    return equity_log
+
+def equity_frame(equity_log: np.ndarray, index: Optional[pd.DatetimeIndex] = None,
+                 tz: Optional[str] = None) -> pd.DataFrame:
+    """
+    Equity kaydını equity_curve DataFrame'ine çevirir
+
+    Args:
+        equity_log: EQUITY_DTYPE dizisi (bellek eşlemeli olabilir)
+        index: Tarih indeksi (None = zaman alanından, tz saat dilimiyle)
+        tz: Saat dilimi (index verilmediğinde)
+    """
+    if index is None:
+        index = pd.DatetimeIndex(np.asarray(equity_log['time']), tz='UTC')
+        index = index.tz_convert(tz) if tz else index.tz_localize(None)
+
+    equity_df = pd.DataFrame({name: equity_log[name] for name in EQUITY_COLUMNS}, index=index)
+    equity_df.index.name = 'date'
+    return equity_df
+
+def equity_log_from_frame(equity_df: pd.DataFrame) -> np.ndarray:
+    """equity_curve DataFrame'inden equity kaydı (eksik kolonlar 0)"""
+    equity_log = allocate_equity_log(equity_df.index)
+    for name in EQUITY_COLUMNS:
+        if name in equity_df.columns:
+            equity_log[name] = equity_df[name].to_numpy(dtype=np.float64)
+    return equity_log
+
+def records_to_trades(trade_records: np.ndarray, symbols: List[str], tz: Optional[str] = None) -> List[Dict]:
+    """TRADE_DTYPE dizisini Backtester işlem dict listesine çevirir"""
+    dates = pd.DatetimeIndex(np.asarray(trade_records['time']), tz='UTC')
+    dates = dates.tz_convert(tz) if tz else dates.tz_localize(None)
+
+    trades = []
+    for date, record in zip(dates, trade_records.tolist()):
+        trades.append({
+            'date': date,
+            'symbol': symbols[record[1]],
+            'action': 'buy' if record[2] == 1 else 'sell',
+            'price': record[3],
+            'quantity': record[4],
+            'position_size': record[5],
+            'costs': record[6],
+            'confidence': record[7],
+            'capital_after': record[8]
+        })
+    return trades
+
+def _json_value(value):
+    if isinstance(value, (np.integer, np.floating, np.bool_)):
+        return value.item()
+    return value
+
+def save_backtest_log(results: Dict, directory: str) -> str:
+    """
+    Backtest sonucunu kolonlu dosyalara yazar
+
+    Equity, işlem ve alış-satış çiftleri ayrı .npy dosyalarıdır (np.load(mmap_mode='r') ile
+    kopyalanmadan okunur); sembol listesi, saat dilimi ve metrikler meta.json'dadır.
+
+    Args:
+        results: Backtester (veya PortfolioBacktester) sonucu
+        directory: Kayıt dizini
+
+    Returns:
+        Kayıt dizini
+    """
+    os.makedirs(directory, exist_ok=True)
+
+    equity_df = results['equity_curve']
+    symbols = results.get('symbols') or [results['symbol']]
+
+    equity_log = results.get('equity_log')
+    if equity_log is None:
+        equity_log = equity_log_from_frame(equity_df)
+
+    trade_records = results.get('trade_records')
+    if trade_records is None:
+        trade_records = trades_to_array(results['trades'], symbols)
+
+    round_trips = results.get('round_trips')
+    if round_trips is None:
+        round_trips = pair_round_trips(trade_records, equity_log['time'])
+
+    np.save(os.path.join(directory, EQUITY_FILE), equity_log)
+    tz = str(equity_df.index.tz) if getattr(equity_df.index, 'tz', None) else None
+    write_trade_log(directory, trade_records, round_trips, symbols, tz, results)
+
+    logger.info(f"Backtest kayıtları yazıldı: {directory} ({len(equity_log)} bar, {len(trade_records)} işlem)")
+    return directory
+
+def write_trade_log(directory: str, trade_records: np.ndarray, round_trips: np.ndarray,
+                    symbols: List[str], tz: Optional[str], results: Dict) -> None:
+    """İşlem, alış-satış çifti dosyalarını ve meta.json'u yazar (equity.npy ayrı yazılır)"""
+    np.save(os.path.join(directory, TRADES_FILE), trade_records)
+    np.save(os.path.join(directory, ROUND_TRIPS_FILE), round_trips)
+
+    meta = {
+        'symbols': list(symbols),
+        'tz': tz,
+        'final_capital': _json_value(results.get('final_capital')),
+        'total_return': _json_value(results.get('total_return')),
+        'performance_metrics': {name: _json_value(value)
+                                for name, value in results.get('performance_metrics', {}).items()}
+    }
+    with open(os.path.join(directory, META_FILE), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+
+class EquityLogWriter:
+    def __init__(self, directory: str, copy_chunk: int = 1_000_000):
+        """
+        Equity kaydını parça parça diske yazar (akış backtest'i)
+
+        Parçalar ham dosyaya eklenir; close() ile .npy'ye çevrilir. Bellek kullanımı
+        parça boyutuyla sınırlıdır.
+
+        Args:
+            directory: Kayıt dizini
+            copy_chunk: .npy'ye kopyalamada bar grubu
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.copy_chunk = copy_chunk
+        self.raw_path = os.path.join(directory, EQUITY_FILE + '.raw')
+        self._file = open(self.raw_path, 'wb')
+        self.n = 0
+
+    def append(self, equity_log: np.ndarray) -> None:
+        equity_log.astype(EQUITY_DTYPE, copy=False).tofile(self._file)
+        self.n += len(equity_log)
+
+    def close(self) -> str:
+        """Ham dosyayı equity.npy'ye çevirir; .npy yolunu döndürür"""
+        self._file.close()
+        path = os.path.join(self.directory, EQUITY_FILE)
+        output = np.lib.format.open_memmap(path, mode='w+', dtype=EQUITY_DTYPE, shape=(self.n,))
+        if self.n:
+            raw = np.memmap(self.raw_path, dtype=EQUITY_DTYPE, mode='r', shape=(self.n,))
+            for start in range(0, self.n, self.copy_chunk):
+                output[start:start + self.copy_chunk] = raw[start:start + self.copy_chunk]
+            del raw
+        output.flush()
+        del output
+        os.remove(self.raw_path)
+        return path
+
+def load_backtest_log(directory: str, mmap: bool = True) -> Optional[Dict]:
+    """
+    Kayıt dizinini okur
+
+    Args:
+        directory: save_backtest_log dizini
+        mmap: Diziler bellek eşlemeli açılır (grafik için kopyasız)
+
+    Returns:
+        equity_log, trade_records, round_trips dizileri ve meta alanları; dizin yoksa None
+    """
+    if not os.path.exists(os.path.join(directory, META_FILE)):
+        logger.error(f"Backtest kaydı bulunamadı: {directory}")
+        return None
+
+    mmap_mode = 'r' if mmap else None
+    with open(os.path.join(directory, META_FILE), 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+
+    return {
+        **meta,
+        'equity_log': np.load(os.path.join(directory, EQUITY_FILE), mmap_mode=mmap_mode),
+        'trade_records': np.load(os.path.join(directory, TRADES_FILE), mmap_mode=mmap_mode),
+        'round_trips': np.load(os.path.join(directory, ROUND_TRIPS_FILE), mmap_mode=mmap_mode)
+    }
+
+def load_backtest_results(directory: str, mmap: bool = True) -> Optional[Dict]:
+    """
+    Kayıt dizininden Backtester sonuç dict'i (equity_curve, trades, metrikler)
+
+    Tek hisseli kayıtta 'symbol', portföy kaydında 'symbols' alanı doldurulur.
+    """
+    log = load_backtest_log(directory, mmap)
+    if log is None:
+        return None
+
+    symbols = log['symbols']
+    results = {
+        'equity_curve': equity_frame(log['equity_log'], tz=log['tz']),
+        'trades': records_to_trades(log['trade_records'], symbols, log['tz']),
+        'equity_log': log['equity_log'],
+        'trade_records': log['trade_records'],
+        'round_trips': log['round_trips'],
+        'performance_metrics': log['performance_metrics'],
+        'final_capital': log['final_capital'],
+        'total_return': log['total_return']
+    }
+    if len(symbols) == 1:
+        results['symbol'] = symbols[0]
+    else:
+        results['symbols'] = symbols
+    return results
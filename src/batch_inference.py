@@ -0,0 +1,190 @@
+"""
+Toplu Tahmin (Batch Inference)
+Birçok hissenin son K satırını modele göre gruplayıp her model için tek booster çağrısı yapar
+"""
+
+import time
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from model_registry import get_model_registry
+from model_cache import get_model_cache
+from pooled_training import SYMBOL_FEATURE, encode_symbol
+from model_explain import compute_contributions, top_contributions
+
+logger = logging.getLogger(__name__)
+
+def stabilize_prediction(prob_up_history: np.ndarray, window: int = 5,
+                         upper_margin: float = 0.55, lower_margin: float = 0.45) -> Tuple[int, float]:
+    """
+    Son olasılıkların ortalaması ile margin uygular (flip-flop azaltma)
+
+    Ortalama yükseliş olasılığı upper_margin üstündeyse AL, lower_margin altındaysa SAT;
+    aradaysa son satırın ham tahmini düşük güvenle kullanılır.
+
+    Args:
+        prob_up_history: Zaman sıralı yükseliş olasılıkları (son eleman en güncel)
+        window: Ortalaması alınacak son olasılık sayısı
+        upper_margin: AL eşiği
+        lower_margin: SAT eşiği
+
+    Returns:
+        (prediction, confidence)
+    """
+    recent_window = min(window, len(prob_up_history))
+    if recent_window > 1:
+        avg_prob_up = float(np.mean(prob_up_history[-recent_window:]))
+    else:
+        avg_prob_up = float(prob_up_history[-1])
+
+    if avg_prob_up >= upper_margin:
+        return 1, avg_prob_up
+    if avg_prob_up <= lower_margin:
+        return 0, 1.0 - avg_prob_up
+
+    raw_prediction = int(prob_up_history[-1] > 0.5)
+    return raw_prediction, max(abs(avg_prob_up - 0.5) * 2, 0.0)
+
+class BatchPredictor:
+    def __init__(self, config: Dict, last_k: int = None):
+        """
+        Toplu tahmin
+
+        Args:
+            config: Sistem konfigürasyonu (MODEL_CONFIG.INFERENCE bölümü)
+            last_k: Hisse başına modele verilecek son satır sayısı (None = config)
+        """
+        self.config = config
+        inference_config = config.get('MODEL_CONFIG', {}).get('INFERENCE', {}) or {}
+
+        self.stabilization_window = inference_config.get('stabilization_window', 5)
+        self.last_k = last_k or inference_config.get('last_k', self.stabilization_window)
+        self.upper_margin = inference_config.get('upper_margin', 0.55)
+        self.lower_margin = inference_config.get('lower_margin', 0.45)
+        explain_config = config.get('MODEL_CONFIG', {}).get('EXPLANATIONS', {}) or {}
+        self.top_contributions = explain_config.get('top_contributions', 10)
+
+        self.registry = get_model_registry()
+        self.cache = get_model_cache(config)
+
+    def _prepare_rows(self, features_df: pd.DataFrame, feature_columns: List[str]) -> pd.DataFrame:
+        """
+        Son K satırı modelin kolon sırasıyla hazırlar (prepare_data ile aynı temizlik)
+
+        Eksik kolonlar 0 ile, eksik/sonsuz değerler kolonun tüm geçmişteki medyanı ile
+        doldurulur; medyan sadece boşluk olan kolonlar için hesaplanır.
+        """
+        rows = features_df.tail(self.last_k)
+        rows = rows.reindex(columns=feature_columns)
+        missing = [col for col in feature_columns if col not in features_df.columns]
+        if missing:
+            rows[missing] = 0
+
+        rows = rows.apply(pd.to_numeric, errors='coerce').replace([np.inf, -np.inf], np.nan)
+        gap_columns = rows.columns[rows.isnull().any()]
+        if len(gap_columns) > 0:
+            history = features_df[gap_columns].replace([np.inf, -np.inf], np.nan)
+            rows = rows.fillna(history.median())
+        return rows[~rows.isnull().any(axis=1)]
+
+    def predict(self, features_by_symbol: Dict[str, pd.DataFrame], interval: str = None,
+                horizon: str = None, model_paths: Dict[str, str] = None,
+                explain: bool = False) -> Dict[str, Optional[Dict]]:
+        """
+        Birden fazla hisse için son K satırın tahminini yapar
+
+        Hisseler modellerine göre gruplanır; her model için satırlar tek matriste
+        birleştirilip tek predict_proba çağrısı yapılır.
+
+        Args:
+            features_by_symbol: {sembol: özellik DataFrame'i}
+            interval: Zaman dilimi (model araması için)
+            horizon: Yatırım süresi (None = herhangi)
+            model_paths: {sembol: model yolu} - verilmeyenler kayıt defterinden bulunur
+            explain: True ise son satırın özellik katkıları da hesaplanır (model başına tek
+                pred_contribs çağrısı, sadece son satırlar)
+
+        Returns:
+            {sembol: prediction, confidence, prob_up, probability_history, timestamps, model_path}
+            (explain=True ise + contributions, base_value, explanations)
+            Modeli veya verisi olmayan hisseler için None
+        """
+        start = time.perf_counter()
+        model_paths = model_paths or {}
+        results = {}
+
+        # Hisseleri modele göre grupla
+        groups = {}
+        for symbol, features_df in features_by_symbol.items():
+            model_path = model_paths.get(symbol) or self.registry.find_latest(symbol, horizon, interval)
+            if model_path is None or features_df is None or features_df.empty:
+                results[symbol] = None
+                continue
+            groups.setdefault(model_path, []).append(symbol)
+
+        for model_path, symbols in groups.items():
+            try:
+                artifact = self.cache.get(model_path)
+            except Exception as e:
+                logger.error(f"Model yüklenemedi: {model_path} - {str(e)}")
+                results.update({symbol: None for symbol in symbols})
+                continue
+
+            blocks = []
+            for symbol in symbols:
+                rows = self._prepare_rows(features_by_symbol[symbol], artifact.feature_columns)
+                if rows.empty:
+                    results[symbol] = None
+                    continue
+                # Havuzlu model: hisse kimliği kategorik kodu
+                symbol_categories = artifact.metadata.get('symbol_categories')
+                if symbol_categories and SYMBOL_FEATURE in rows.columns:
+                    rows[SYMBOL_FEATURE] = encode_symbol(symbol, symbol_categories)
+                blocks.append((symbol, rows))
+
+            if not blocks:
+                continue
+
+            # Tek matris, tek booster çağrısı (scaler.transform ile aynı aritmetik)
+            stacked = np.vstack([rows.to_numpy(dtype=np.float64) for _, rows in blocks])
+            scaled = (stacked - artifact.scaler.mean_) / artifact.scaler.scale_
+            prob_up = artifact.get_model().predict_proba(scaled)[:, 1]
+
+            # Her hissenin son satırı için katkılar (tek çağrı)
+            contributions = None
+            if explain:
+                last_rows = np.cumsum([len(rows) for _, rows in blocks]) - 1
+                contributions = compute_contributions(artifact.get_model(), scaled[last_rows])
+
+            offset = 0
+            for block_no, (symbol, rows) in enumerate(blocks):
+                history = prob_up[offset:offset + len(rows)]
+                offset += len(rows)
+
+                prediction, confidence = stabilize_prediction(
+                    history, self.stabilization_window, self.upper_margin, self.lower_margin
+                )
+                results[symbol] = {
+                    'symbol': symbol,
+                    'model_path': model_path,
+                    'prediction': prediction,
+                    'confidence': confidence,
+                    'raw_prediction': int(history[-1] > 0.5),
+                    'prob_up': float(history[-1]),
+                    'probability_history': history.tolist(),
+                    'timestamps': list(rows.index)
+                }
+                if contributions is not None:
+                    results[symbol].update({
+                        'contributions': top_contributions(contributions[block_no], artifact.feature_columns,
+                                                           rows.iloc[-1].to_numpy(), self.top_contributions),
+                        'base_value': float(contributions[block_no, -1]),
+                        'explanations': artifact.metadata.get('explanations')
+                    })
+
+        elapsed = time.perf_counter() - start
+        logger.info(f"Toplu tahmin: {len(features_by_symbol)} hisse, {len(groups)} model, {elapsed * 1000:.0f} ms")
+        return results
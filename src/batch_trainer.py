@@ -0,0 +1,363 @@
+"""
+Toplu Model Eğitimi Zamanlayıcısı
+Hisse eğitimlerini sınırlı eşzamanlılıkla bir worker havuzunda çalıştırır
+"""
+
+import os
+import time
+import logging
+import concurrent.futures
+from datetime import datetime
+from typing import Dict, List, Optional, Callable, Iterator
+
+from data_loader import DataLoader
+from feature_engineering import FeatureEngineer
+from model_train import StockDirectionPredictor, get_training_resources
+from model_registry import get_model_registry
+
+logger = logging.getLogger(__name__)
+
+MODEL_DIR = "src/models"
+
+def find_latest_model(symbol: str, investment_horizon: str, interval: str = None,
+                      model_dir: str = MODEL_DIR) -> Optional[str]:
+    """Hisse, yatırım süresi ve zaman dilimi için en son model dosyasını bulur (kayıt defterinden)"""
+    return get_model_registry(model_dir).find_latest(symbol, investment_horizon, interval)
+
+def _incremental_slice(data, watermark, config: Dict):
+    """
+    Artımlı güncelleme için gereken son barları seçer
+
+    Güncelleme penceresi + özellik ısınma payı kadar bar filigrandan geriye alınır;
+    böylece tüm geçmiş için özellik hesaplanmaz.
+    """
+    inc_config = config.get('MODEL_CONFIG', {}).get('INCREMENTAL', {}) or {}
+    window = inc_config.get('window', 120)
+    lookback = inc_config.get('feature_lookback', 250)
+
+    if watermark is None:
+        return data
+
+    watermark_pos = int(data.index.searchsorted(watermark, side='right'))
+    start = max(0, watermark_pos - window - lookback)
+    return data.iloc[start:]
+
+def train_symbol(symbol: str, config: Dict, interval: str = "1d",
+                 investment_horizon: str = "MEDIUM_TERM", period: str = "2y",
+                 n_jobs: Optional[int] = None, use_index_data: bool = True,
+                 progress_callback: Optional[Callable[[str], None]] = None,
+                 incremental: bool = False) -> Dict:
+    """
+    Tek hisse için veri → özellik → eğitim → kayıt adımlarını çalıştırır
+
+    Worker süreçlerinde çalışabilmesi için Streamlit'e bağımlı değildir.
+
+    Args:
+        symbol: Hisse sembolü
+        config: Sistem konfigürasyonu
+        interval: Zaman dilimi
+        investment_horizon: Yatırım süresi (SHORT_TERM, MEDIUM_TERM, LONG_TERM)
+        period: Veri periyodu
+        n_jobs: Model başına XGBoost thread sayısı (None = config'den)
+        use_index_data: BIST 100 endeks özellikleri eklensin mi
+        progress_callback: Aşama mesajları için opsiyonel callback
+        incremental: Mevcut model varsa sadece yeni barlarla warm-start güncelleme yap
+
+    Returns:
+        symbol, success, message, model_path, accuracy, training_time, elapsed, mode içeren dict
+    """
+    start = time.perf_counter()
+
+    def _result(success: bool, message: str, **extra) -> Dict:
+        result = {
+            'symbol': symbol,
+            'success': success,
+            'message': message,
+            'model_path': None,
+            'accuracy': None,
+            'training_time': None,
+            'mode': 'full',
+            'elapsed': time.perf_counter() - start
+        }
+        result.update(extra)
+        return result
+
+    try:
+        if progress_callback:
+            progress_callback(f"📊 {symbol} verisi yükleniyor...")
+
+        loader = DataLoader(config)
+        data = loader.load_cached_stock_data(symbol, period, interval=interval)
+        if data.empty:
+            return _result(False, f"{symbol} verisi yüklenemedi")
+
+        # Interval ve investment_horizon'ı config'e ekle
+        config_with_interval = config.copy()
+        config_with_interval['MODEL_CONFIG'] = dict(config_with_interval.get('MODEL_CONFIG', {}))
+        config_with_interval['MODEL_CONFIG']['interval'] = interval
+        config_with_interval['MODEL_CONFIG']['investment_horizon'] = investment_horizon
+
+        # Artımlı mod: mevcut modeli yükle, sadece filigran civarındaki barları işle
+        predictor = StockDirectionPredictor(config_with_interval, n_jobs=n_jobs)
+        existing_model = find_latest_model(symbol, investment_horizon, interval) if incremental else None
+        if existing_model and predictor.load_model(existing_model):
+            data = _incremental_slice(data, predictor.data_watermark, config)
+        else:
+            existing_model = None
+
+        if progress_callback:
+            progress_callback(f"🔧 {symbol} özellikler oluşturuluyor...")
+
+        try:
+            if use_index_data:
+                index_loader = DataLoader(config_with_interval)
+                engineer = FeatureEngineer(config_with_interval, data_loader=index_loader)
+                index_data = index_loader.get_index_data(period=period, interval=interval)
+                features_df = engineer.create_all_features(data, index_data=index_data)
+            else:
+                engineer = FeatureEngineer(config_with_interval)
+                features_df = engineer.create_all_features(data)
+        except Exception as e:
+            return _result(False, f"{symbol} özellikler oluşturulamadı: {str(e)}")
+
+        if features_df.empty:
+            return _result(False, f"{symbol} özellikler oluşturulamadı")
+
+        if existing_model:
+            if progress_callback:
+                progress_callback(f"🔄 {symbol} model güncelleniyor...")
+
+            X, y = predictor.prepare_data(features_df)
+            update = predictor.update_model(X, y, allow_refit=False)
+
+            if update['mode'] == 'skipped':
+                return _result(True, f"{symbol} için yeni bar yok, model güncel",
+                               model_path=existing_model, mode='skipped')
+
+            if update['mode'] == 'incremental':
+                symbol_name = symbol.replace('.IS', '')
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                model_path = predictor.save_model(f"{symbol_name}_{investment_horizon}_Model_{timestamp}.joblib")
+                return _result(
+                    True,
+                    f"{symbol} model güncellendi - {update['new_rows']} yeni bar, "
+                    f"+{update['rounds_added']} tur - Süre: {update['training_time']:.2f} sn",
+                    model_path=model_path,
+                    accuracy=update['pre_update_accuracy'],
+                    training_time=update['training_time'],
+                    mode='incremental'
+                )
+
+            # Sapma/güncelleme sınırı: tam veriyle yeniden eğitim
+            return train_symbol(symbol, config, interval, investment_horizon, period,
+                                n_jobs, use_index_data, progress_callback, incremental=False)
+
+        if progress_callback:
+            progress_callback(f"🤖 {symbol} model eğitiliyor...")
+
+        X, y = predictor.prepare_data(features_df)
+
+        if len(X) < 100:  # Yeterli veri yok
+            return _result(False, f"{symbol} yeterli veri yok ({len(X)} gün)")
+
+        results = predictor.train_model(X, y)
+
+        if progress_callback:
+            progress_callback(f"💾 {symbol} model kaydediliyor...")
+
+        # Modeli kaydet (yatırım süresini dahil et)
+        symbol_name = symbol.replace('.IS', '')
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"{symbol_name}_{investment_horizon}_Model_{timestamp}.joblib"
+        model_path = predictor.save_model(filename)
+
+        if progress_callback:
+            progress_callback(f"✅ {symbol} model eğitimi tamamlandı!")
+
+        accuracy = results['test_metrics']['accuracy']
+        return _result(
+            True,
+            f"{symbol} model eğitildi - Accuracy: {accuracy:.3f} - Süre: {results['training_time']:.1f} sn",
+            model_path=model_path,
+            accuracy=accuracy,
+            training_time=results['training_time']
+        )
+
+    except Exception as e:
+        return _result(False, f"{symbol} model eğitimi başarısız: {str(e)}")
+
+class BatchTrainer:
+    def __init__(self, config: Dict, interval: str = "1d", investment_horizon: str = "MEDIUM_TERM",
+                 period: str = "2y", max_workers: Optional[int] = None, use_index_data: bool = True,
+                 incremental: bool = False):
+        """
+        Toplu eğitim zamanlayıcısı
+
+        Args:
+            config: Sistem konfigürasyonu (TRAINING_RESOURCES bölümü kullanılır)
+            interval: Zaman dilimi
+            investment_horizon: Yatırım süresi
+            period: Veri periyodu
+            max_workers: Aynı anda eğitilecek hisse sayısı (None = parallel_symbols)
+            use_index_data: BIST 100 endeks özellikleri eklensin mi
+            incremental: Modeli olan hisseleri yeni barlarla warm-start güncelle
+        """
+        self.config = config
+        self.interval = interval
+        self.investment_horizon = investment_horizon
+        self.period = period
+        self.use_index_data = use_index_data
+        self.incremental = incremental
+        self.model_dir = MODEL_DIR
+
+        # Thread bütçesi worker sayısına göre paylaştırılır
+        self.resources = get_training_resources(config, parallel_jobs=max_workers)
+        self.max_workers = self.resources['parallel_symbols']
+        self.executor_type = config.get('TRAINING_RESOURCES', {}).get('executor', 'process')
+
+        self.data_loader = DataLoader(config)
+
+    def find_latest_model(self, symbol: str) -> Optional[str]:
+        """Hisse ve yatırım süresi için en son model dosyasını bulur"""
+        return find_latest_model(symbol, self.investment_horizon, self.interval, self.model_dir)
+
+    def is_model_fresh(self, symbol: str) -> bool:
+        """
+        Model, hissenin en son verisinden daha yeni mi kontrol eder
+
+        Cache'de veri yoksa veya model yoksa eğitim gerekir (False).
+        """
+        model_path = self.find_latest_model(symbol)
+        if model_path is None:
+            return False
+
+        watermark = self.data_loader.get_data_watermark(symbol, self.interval)
+        if watermark is None:
+            return False
+
+        return os.path.getmtime(model_path) >= watermark.timestamp()
+
+    def plan(self, symbols: List[str], force: bool = False, only_missing: bool = False) -> Dict[str, List[str]]:
+        """
+        Hangi hisselerin eğitileceğini belirler
+
+        Args:
+            symbols: Hisse listesi
+            force: True ise tüm hisseler yeniden eğitilir
+            only_missing: True ise sadece modeli hiç olmayan hisseler eğitilir
+
+        Returns:
+            {'train': [...], 'skip': [...]}
+        """
+        to_train, to_skip = [], []
+
+        for symbol in symbols:
+            if force:
+                to_train.append(symbol)
+            elif only_missing:
+                (to_skip if self.find_latest_model(symbol) else to_train).append(symbol)
+            else:
+                (to_skip if self.is_model_fresh(symbol) else to_train).append(symbol)
+
+        return {'train': to_train, 'skip': to_skip}
+
+    def _create_executor(self) -> concurrent.futures.Executor:
+        if self.executor_type == 'thread' or self.max_workers == 1:
+            return concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers)
+        return concurrent.futures.ProcessPoolExecutor(max_workers=self.max_workers)
+
+    def run(self, symbols: List[str], force: bool = False, only_missing: bool = False) -> Iterator[Dict]:
+        """
+        Eğitimleri worker havuzunda çalıştırır ve ilerleme olaylarını akıtır
+
+        Olay tipleri: 'skipped', 'submitted', 'finished', 'failed', 'done'.
+        Her olay symbol, completed, total ve message alanlarını içerir.
+
+        Args:
+            symbols: Eğitilecek hisseler
+            force: Taze modelleri de yeniden eğit
+            only_missing: Sadece modeli olmayan hisseleri eğit
+
+        Yields:
+            İlerleme olayı dict'leri
+        """
+        batch_start = time.perf_counter()
+        plan = self.plan(symbols, force=force, only_missing=only_missing)
+        total = len(symbols)
+        completed = 0
+
+        for symbol in plan['skip']:
+            completed += 1
+            yield {
+                'type': 'skipped',
+                'symbol': symbol,
+                'completed': completed,
+                'total': total,
+                'success': True,
+                'message': f"{symbol} modeli güncel, atlandı"
+            }
+
+        if plan['train']:
+            logger.info(f"Toplu eğitim: {len(plan['train'])} hisse, {self.max_workers} worker, "
+                       f"model başına {self.resources['n_jobs']} thread")
+
+            with self._create_executor() as executor:
+                future_to_symbol = {}
+                for symbol in plan['train']:
+                    future = executor.submit(
+                        train_symbol, symbol, self.config, self.interval, self.investment_horizon,
+                        self.period, self.resources['n_jobs'], self.use_index_data,
+                        None, self.incremental
+                    )
+                    future_to_symbol[future] = symbol
+                    yield {
+                        'type': 'submitted',
+                        'symbol': symbol,
+                        'completed': completed,
+                        'total': total,
+                        'message': f"{symbol} eğitim kuyruğuna alındı"
+                    }
+
+                for future in concurrent.futures.as_completed(future_to_symbol):
+                    symbol = future_to_symbol[future]
+                    completed += 1
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = {
+                            'symbol': symbol,
+                            'success': False,
+                            'message': f"{symbol} model eğitimi başarısız: {str(e)}"
+                        }
+
+                    event = dict(result)
+                    event.update({
+                        'type': 'finished' if result['success'] else 'failed',
+                        'completed': completed,
+                        'total': total
+                    })
+                    yield event
+
+        # Yerini yenisine bırakan model dosyalarını temizle
+        keep_latest = self.config.get('MODEL_REGISTRY', {}).get('keep_latest', 0)
+        if plan['train'] and keep_latest:
+            get_model_registry(self.model_dir).garbage_collect(keep_latest=keep_latest)
+
+        elapsed = time.perf_counter() - batch_start
+        logger.info(f"Toplu eğitim tamamlandı: {len(plan['train'])} eğitildi, "
+                   f"{len(plan['skip'])} atlandı, süre {elapsed:.1f} sn")
+        yield {
+            'type': 'done',
+            'symbol': None,
+            'completed': completed,
+            'total': total,
+            'trained': len(plan['train']),
+            'skipped': len(plan['skip']),
+            'elapsed': elapsed,
+            'message': f"{len(plan['train'])} hisse eğitildi, {len(plan['skip'])} hisse atlandı ({elapsed:.1f} sn)"
+        }
+
+    def train_all(self, symbols: List[str], force: bool = False, only_missing: bool = False) -> List[Dict]:
+        """run() olaylarını tüketir ve hisse bazlı sonuçları döndürür"""
+        return [event for event in self.run(symbols, force=force, only_missing=only_missing)
+                if event['type'] in ('skipped', 'finished', 'failed')]
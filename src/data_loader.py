@@ -67,6 +67,99 @@ class DataLoader:
             logger.error(f"Veri yükleme hatası {symbol}: {str(e)}")
             return pd.DataFrame()
     
+    def get_cache_path(self, symbol: str, interval: str = "1d") -> str:
+        """
+        Dashboard ile paylaşılan disk cache dosyasının yolunu döndürür
+        
+        Args:
+            symbol: Hisse senedi sembolü
+            interval: Zaman dilimi
+            
+        Returns:
+            data/raw/<SEMBOL>_<interval>_cache.csv yolu
+        """
+        return os.path.join(self.data_dir, f"{symbol.replace('.IS', '')}_{interval}_cache.csv")
+    
+    def load_cached_stock_data(self, symbol: str, period: str = "2y", interval: str = "1d",
+                               max_age: int = 3600) -> pd.DataFrame:
+        """
+        Disk cache'li veri yükler (Streamlit'e bağımlı olmadan, worker süreçleri için)
+        
+        dashboard_utils.load_stock_data ile aynı cache dosyasını ve aynı
+        temizleme adımlarını kullanır.
+        
+        Args:
+            symbol: Hisse senedi sembolü
+            period: Veri periyodu
+            interval: Zaman dilimi
+            max_age: Cache geçerlilik süresi (saniye)
+            
+        Returns:
+            OHLCV verisi içeren DataFrame
+        """
+        cache_file = self.get_cache_path(symbol, interval)
+        
+        if os.path.exists(cache_file):
+            cache_age = datetime.now().timestamp() - os.path.getmtime(cache_file)
+            if cache_age < max_age:
+                try:
+                    return pd.read_csv(cache_file, index_col=0, parse_dates=True)
+                except Exception as e:
+                    logger.warning(f"Cache okuma hatası {symbol}: {str(e)}")
+        
+        try:
+            ticker = yf.Ticker(symbol)
+            data = ticker.history(period=period, interval=interval)
+            
+            if data.empty:
+                logger.warning(f"Veri bulunamadı: {symbol}")
+                return pd.DataFrame()
+            
+            # Kolon isimlerini standardize et
+            data.columns = [col.lower() for col in data.columns]
+            data = data.rename(columns={'adj close': 'adj_close'})
+            data = data.dropna()
+            
+            data.to_csv(cache_file)
+            return data
+            
+        except Exception as e:
+            logger.error(f"Veri yükleme hatası {symbol}: {str(e)}")
+            return pd.DataFrame()
+    
+    def get_data_watermark(self, symbol: str, interval: str = "1d") -> Optional[pd.Timestamp]:
+        """
+        Cache'deki son barın zamanını döndürür (dosyanın tamamını okumadan)
+        
+        Args:
+            symbol: Hisse senedi sembolü
+            interval: Zaman dilimi
+            
+        Returns:
+            Son bar zamanı veya cache yoksa None
+        """
+        cache_file = self.get_cache_path(symbol, interval)
+        if not os.path.exists(cache_file):
+            return None
+        
+        try:
+            # Sadece dosyanın sonunu oku
+            with open(cache_file, 'rb') as f:
+                f.seek(0, os.SEEK_END)
+                size = f.tell()
+                f.seek(max(0, size - 4096))
+                lines = f.read().decode('utf-8', errors='ignore').strip().splitlines()
+            
+            if len(lines) == 0:
+                return None
+            
+            last_timestamp = lines[-1].split(',')[0]
+            return pd.Timestamp(last_timestamp)
+            
+        except Exception as e:
+            logger.warning(f"Veri filigranı okunamadı {symbol}: {str(e)}")
+            return None
+    
     def fetch_multiple_stocks(self, symbols: List[str], period: str = "2y") -> Dict[str, pd.DataFrame]:
         """
         Birden fazla hisse senedi için veri çeker
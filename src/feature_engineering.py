@@ -11,6 +11,43 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+def get_prediction_horizon(config: Dict) -> int:
+    """
+    Hedef değişkenin kaç bar ileriye baktığını döndürür
+    
+    Yatırım süresinin prediction_days değeri interval'a göre bar sayısına
+    çevrilir; MODEL_CONFIG.prediction_horizon varsa onu kullanır.
+    
+    Args:
+        config: Sistem konfigürasyonu
+        
+    Returns:
+        Tahmin ufku (bar sayısı)
+    """
+    model_config = config.get('MODEL_CONFIG', {})
+    investment_horizon = model_config.get('investment_horizon', 'MEDIUM_TERM')
+    horizon_configs = model_config.get('INVESTMENT_HORIZON_CONFIGS', {})
+    horizon_config = horizon_configs.get(investment_horizon, horizon_configs.get('MEDIUM_TERM', {}))
+    
+    # Yatırım süresine göre tahmin periyotunu belirle
+    prediction_days = horizon_config.get('prediction_days', 30)
+    
+    # Interval'a göre prediction horizon belirle
+    interval = model_config.get('interval', '1d')
+    if interval == '1h':
+        # Günlük veri için 1h interval'ında kaç periyot var
+        prediction_horizon = int(prediction_days * 24)  # Günlük veri = 24 saat
+    elif interval == '4h':
+        prediction_horizon = int(prediction_days * 6)  # Günlük veri = 6 periyot
+    elif interval == '1wk':
+        # Haftalık veri için
+        prediction_horizon = max(1, int(prediction_days / 7))  # Kaç hafta
+    else:  # 1d
+        prediction_horizon = int(prediction_days)  # Kaç gün
+    
+    # Config'den override varsa kullan
+    return int(model_config.get('prediction_horizon', prediction_horizon))
+
 class FeatureEngineer:
     def __init__(self, config: Dict, data_loader=None):
         self.config = config
@@ -354,24 +391,9 @@ class FeatureEngineer:
         horizon_configs = self.config.get('MODEL_CONFIG', {}).get('INVESTMENT_HORIZON_CONFIGS', {})
         horizon_config = horizon_configs.get(investment_horizon, horizon_configs.get('MEDIUM_TERM', {}))
         
-        # Yatırım süresine göre tahmin periyotunu belirle
+        # Yatırım süresine göre tahmin periyotu ve bar cinsinden ufuk
         prediction_days = horizon_config.get('prediction_days', 30)
-        
-        # Interval'a göre prediction horizon belirle
-        interval = self.config.get('MODEL_CONFIG', {}).get('interval', '1d')
-        if interval == '1h':
-            # Günlük veri için 1h interval'ında kaç periyot var
-            prediction_horizon = int(prediction_days * 24)  # Günlük veri = 24 saat
-        elif interval == '4h':
-            prediction_horizon = int(prediction_days * 6)  # Günlük veri = 6 periyot
-        elif interval == '1wk':
-            # Haftalık veri için
-            prediction_horizon = max(1, int(prediction_days / 7))  # Kaç hafta
-        else:  # 1d
-            prediction_horizon = int(prediction_days)  # Kaç gün
-        
-        # Config'den override varsa kullan
-        prediction_horizon = self.config.get('MODEL_CONFIG', {}).get('prediction_horizon', prediction_horizon)
+        prediction_horizon = get_prediction_horizon(self.config)
         
         # Gelecek fiyat
         features_df['future_price'] = features_df['close'].shift(-prediction_horizon)
@@ -0,0 +1,93 @@
+"""
+İlk Geçiş Süresi (First Passage)
+Her başlangıç barından hedef hareketin ilk görüldüğü bara kadar geçen periyot - ileri pencere görünümüyle tüm başlangıçlar tek seferde
+"""
+
+import logging
+from typing import Optional, Sequence
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+logger = logging.getLogger(__name__)
+
+# Bir blokta işlenen (başlangıç x ufuk) hücre sayısı - bellek kullanımını sınırlar
+BLOCK_CELLS = 2_000_000
+
+def forward_changes(close: np.ndarray, horizon: int, start: int = 0,
+                    stop: Optional[int] = None) -> tuple:
+    """
+    Başlangıç barlarından sonraki horizon bara göre mutlak değişim ve yön
+
+    Satır j, sütun h: close[start + j + h + 1] ile close[start + j] arasındaki değişim.
+    Serinin sonunu aşan hücreler NaN (hiçbir koşulu sağlamaz).
+
+    Args:
+        close: Kapanış fiyatları
+        horizon: İleri bakılan bar sayısı
+        start, stop: Başlangıç barı aralığı [start, stop)
+
+    Returns:
+        (mutlak değişim, yukarı hareket mi) - (başlangıç sayısı, horizon) dizileri
+    """
+    close = np.asarray(close, dtype=np.float64)
+    stop = len(close) if stop is None else stop
+
+    # Sona horizon kadar NaN eklenir; pencereler kopyalanmadan görünüm olarak alınır
+    padded = np.concatenate([close, np.full(horizon, np.nan)])
+    windows = sliding_window_view(padded[start + 1:stop + horizon], horizon)
+    start_price = close[start:stop, None]
+
+    change = np.abs(windows - start_price) / start_price
+    up = windows > start_price
+    return change, up
+
+def first_passage_periods(close: np.ndarray, target_changes: Sequence[float], horizon: int,
+                          tolerance: float, direction: Optional[int] = None,
+                          start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+    """
+    Her başlangıç barı ve hedef için benzer büyüklükteki hareketin ilk görüldüğü periyot
+
+    Hareket |değişim - hedef| < hedef x tolerance ise hedefe benzer sayılır; direction
+    verilirse yalnızca o yöndeki (1: yukarı, 0: aşağı/yatay) hareketler kabul edilir.
+
+    Args:
+        close: Kapanış fiyatları
+        target_changes: Hedef değişim oranları (ör. 0.05 = %5)
+        horizon: En fazla ileri bakılan bar sayısı
+        tolerance: Göreli büyüklük toleransı
+        direction: Hareket yönü filtresi (None = iki yön)
+        start, stop: Başlangıç barı aralığı [start, stop)
+
+    Returns:
+        (hedef sayısı, başlangıç sayısı) periyot dizisi; hedefe ulaşılmayan başlangıçlar -1
+    """
+    close = np.asarray(close, dtype=np.float64)
+    stop = len(close) if stop is None else stop
+    targets = np.asarray(target_changes, dtype=np.float64)
+
+    n_starts = max(0, stop - start)
+    periods = np.full((len(targets), n_starts), -1, dtype=np.int64)
+    if n_starts == 0 or horizon <= 0 or len(targets) == 0:
+        return periods
+
+    block = max(1, BLOCK_CELLS // horizon)
+    for offset in range(0, n_starts, block):
+        block_start = start + offset
+        block_stop = min(stop, block_start + block)
+        change, up = forward_changes(close, horizon, block_start, block_stop)
+
+        if direction is not None:
+            direction_mask = up if direction == 1 else ~up
+
+        # Değişimler bir kez hesaplanır, tüm hedefler aynı blok üzerinde taranır
+        for i, target in enumerate(targets):
+            hit = np.abs(change - target) < target * tolerance
+            if direction is not None:
+                hit &= direction_mask
+
+            first = hit.argmax(axis=1)
+            found = hit[np.arange(len(first)), first]
+            periods[i, offset:offset + len(first)] = np.where(found, first + 1, -1)
+
+    return periods
@@ -0,0 +1,178 @@
+"""
+Hedef Süre Tabloları
+Hisse/zaman dilimi başına ±x% hareketin kaç barda görüldüğünün ampirik dağılımı - veri filigranı değişene kadar önbellekte tutulur
+"""
+
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from first_passage import first_passage_periods
+from backtest_cache import data_watermark
+
+logger = logging.getLogger(__name__)
+
+# Geçmiş hareket analizinin parametreleri (PriceTargetPredictor ile aynı)
+HIT_HORIZON = 99         # En fazla ileri bakılan bar
+HIT_TOLERANCE = 0.3      # Göreli büyüklük toleransı
+HIT_END_MARGIN = 10      # Son barlar başlangıç olarak kullanılmaz
+HIT_PERCENTILES = (25, 50, 75)
+MIN_SAMPLES = 3          # Dağılım için en az örnek
+
+def hit_time_quantiles(periods: np.ndarray) -> Optional[np.ndarray]:
+    """Hedefe ulaşan başlangıçların periyot yüzdelikleri (yetersiz örnekte None)"""
+    periods = periods[periods > 0]
+    if len(periods) < MIN_SAMPLES:
+        return None
+    return np.percentile(periods, HIT_PERCENTILES)
+
+class HitTimeTable:
+    def __init__(self, grid: np.ndarray, quantiles: Dict, counts: Dict):
+        """
+        Hareket büyüklüğü ızgarası üzerinde hedef süre dağılımı
+
+        Args:
+            grid: Hareket büyüklükleri (artan, ör. 0.005 ... 0.40)
+            quantiles: Yön (None = iki yön, 1 = yukarı, 0 = aşağı) -> (ızgara, yüzdelik)
+                       periyot dizisi (yetersiz örnekte NaN)
+            counts: Yön -> ızgara başına örnek sayısı
+        """
+        self.grid = grid
+        self.quantiles = quantiles
+        self.counts = counts
+
+    @classmethod
+    def build(cls, close: np.ndarray, grid: np.ndarray) -> 'HitTimeTable':
+        """Kapanış serisinden tabloyu oluşturur (ızgaradaki her büyüklük ve yön için tek tarama)"""
+        close = np.asarray(close, dtype=np.float64)
+        stop = len(close) - HIT_END_MARGIN
+
+        by_direction = {
+            direction: first_passage_periods(close, grid, HIT_HORIZON, HIT_TOLERANCE,
+                                             direction=direction, stop=stop)
+            for direction in (1, 0)
+        }
+        # İki yönlü ilk geçiş, yukarı ve aşağı ilk geçişlerin erken olanıdır
+        up, down = by_direction[1], by_direction[0]
+        by_direction[None] = np.where((up > 0) & ((down <= 0) | (up < down)), up, down)
+
+        quantiles, counts = {}, {}
+        for direction, periods in by_direction.items():
+            quantiles[direction] = np.full((len(grid), len(HIT_PERCENTILES)), np.nan)
+            counts[direction] = (periods > 0).sum(axis=1)
+            for i, row in enumerate(periods):
+                values = hit_time_quantiles(row)
+                if values is not None:
+                    quantiles[direction][i] = values
+
+        return cls(grid, quantiles, counts)
+
+    def lookup(self, target_change: float, direction: Optional[int] = None) -> Optional[np.ndarray]:
+        """
+        Hedef hareket için periyot yüzdelikleri (ızgara komşuları arasında log-doğrusal)
+
+        Izgara dışındaki veya komşularından birinde yeterli örnek olmayan hedeflerde None.
+        """
+        grid = self.grid
+        values = self.quantiles[direction]
+
+        # Izgara noktasındaki hedef (kayan nokta farkıyla) doğrudan o satırı kullanır
+        nearest = int(np.abs(grid - target_change).argmin())
+        if np.isclose(grid[nearest], target_change, rtol=1e-9, atol=0.0):
+            return None if np.isnan(values[nearest]).any() else values[nearest].copy()
+
+        if not grid[0] < target_change < grid[-1]:
+            return None
+
+        right = int(np.searchsorted(grid, target_change))
+        left = right - 1
+        if np.isnan(values[left]).any() or np.isnan(values[right]).any():
+            return None
+
+        weight = np.log(target_change / grid[left]) / np.log(grid[right] / grid[left])
+        return values[left] + weight * (values[right] - values[left])
+
+class HitTimeTableCache:
+    def __init__(self, grid: np.ndarray, max_entries: int = 256):
+        """
+        (hisse, zaman dilimi) anahtarlı hedef süre tablosu önbelleği
+
+        Kayıt, verinin filigranı (ilk/son bar, bar sayısı, son barların değerleri) değişene
+        kadar kullanılır; yeni bar geldiğinde veya son bar güncellendiğinde tablo yeniden oluşturulur.
+
+        Args:
+            grid: Hareket büyüklüğü ızgarası
+            max_entries: Önbellekteki en fazla tablo
+        """
+        self.grid = grid
+        self.max_entries = max_entries
+
+        self._entries = OrderedDict()  # (hisse, zaman dilimi) -> (filigran, tablo)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.total_build_time = 0.0
+
+    def get(self, symbol: str, interval: str, data: pd.DataFrame) -> HitTimeTable:
+        """Hissenin tablosunu döndürür (filigran değiştiyse yeniden oluşturur)"""
+        key = (symbol, interval)
+        watermark = data_watermark(data)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == watermark:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+        start = time.perf_counter()
+        table = HitTimeTable.build(data['close'].to_numpy(), self.grid)
+        build_time = time.perf_counter() - start
+
+        with self._lock:
+            self.misses += 1
+            self.total_build_time += build_time
+            self._entries[key] = (watermark, table)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        logger.debug(f"Hedef süre tablosu oluşturuldu: {symbol} {interval} ({build_time * 1000:.0f} ms)")
+        return table
+
+    def get_stats(self) -> Dict:
+        """Önbellek metrikleri: isabet/ıska ve toplam tablo oluşturma süresi"""
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / requests if requests else 0.0,
+                'total_build_time': self.total_build_time
+            }
+
+_hit_time_cache = None
+_hit_time_cache_lock = threading.Lock()
+
+def get_hit_time_cache(config: Optional[Dict] = None) -> HitTimeTableCache:
+    """
+    Süreç genelindeki hedef süre tablosu önbelleğini döndürür
+
+    İlk çağrıda config'deki PRICE_TARGETS bölümüne göre oluşturulur.
+    """
+    global _hit_time_cache
+    with _hit_time_cache_lock:
+        if _hit_time_cache is None:
+            target_config = (config or {}).get('PRICE_TARGETS', {}) or {}
+            grid = np.geomspace(target_config.get('min_move', 0.005),
+                                target_config.get('max_move', 0.40),
+                                target_config.get('grid_size', 41))
+            _hit_time_cache = HitTimeTableCache(grid, target_config.get('max_entries', 256))
+        return _hit_time_cache
@@ -0,0 +1,289 @@
+"""
+XGBoost Hiperparametre Araması
+Zaman sıralı doğrulama, erken durdurma ve medyan kuralı ile deneme budama
+"""
+
+import os
+import json
+import time
+import threading
+import logging
+import concurrent.futures
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import xgboost as xgb
+
+logger = logging.getLogger(__name__)
+
+# Volatilite grubu bazlı ayarlanmış parametrelerin saklandığı dosya
+TUNED_PARAMS_FILE = "src/models/tuned_volatility_params.json"
+
+# Arama uzayı: [alt, üst] veya [alt, üst, "log"]
+DEFAULT_SEARCH_SPACE = {
+    'max_depth': [2, 6],
+    'learning_rate': [0.005, 0.2, 'log'],
+    'subsample': [0.4, 1.0],
+    'colsample_bytree': [0.4, 1.0],
+    'min_child_weight': [1, 10],
+    'reg_alpha': [0.01, 1.0, 'log'],
+    'reg_lambda': [0.01, 1.0, 'log']
+}
+
+def load_bucket_params(path: str = TUNED_PARAMS_FILE) -> Dict[str, Dict]:
+    """Volatilite grubu bazlı ayarlanmış parametreleri yükler (yoksa boş dict)"""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('buckets', {})
+    except Exception as e:
+        logger.warning(f"Ayarlanmış parametreler okunamadı: {str(e)}")
+        return {}
+
+def save_bucket_params(bucket_results: Dict[str, Dict], path: str = TUNED_PARAMS_FILE) -> str:
+    """
+    Volatilite grubu bazlı kazanan parametreleri kaydeder
+
+    Mevcut dosyadaki diğer grupların değerleri korunur.
+    """
+    buckets = load_bucket_params(path)
+    for bucket, result in bucket_results.items():
+        buckets[bucket] = result['best_params']
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'updated_at': datetime.now().isoformat(), 'buckets': buckets}, f, indent=2)
+    os.replace(tmp_path, path)
+
+    logger.info(f"Ayarlanmış parametreler kaydedildi: {path}")
+    return path
+
+def time_ordered_split(n_samples: int, validation_fraction: float, gap: int = 0) -> Tuple[slice, slice]:
+    """Son validation_fraction kadarını doğrulama seti yapar; arada gap bar boşluk bırakır"""
+    val_start = int(n_samples * (1 - validation_fraction))
+    train_end = max(1, val_start - gap)
+    return slice(0, train_end), slice(val_start, n_samples)
+
+class _MedianPruningCallback(xgb.callback.TrainingCallback):
+    """Doğrulama kaybı, tamamlanmış denemelerin aynı turdaki medyanından kötüyse denemeyi durdurur"""
+
+    def __init__(self, search: 'HyperparameterSearch'):
+        super().__init__()
+        self.search = search
+        self.curve = []
+        self.pruned = False
+
+    def after_iteration(self, model, epoch: int, evals_log: Dict) -> bool:
+        losses = evals_log.get('validation_0', {}).get('logloss', [])
+        if not losses:
+            return False
+
+        best_so_far = min(losses[-1], self.curve[-1]) if self.curve else losses[-1]
+        self.curve.append(best_so_far)
+
+        rounds = epoch + 1
+        if rounds >= self.search.prune_after_rounds and rounds % self.search.prune_interval == 0:
+            median = self.search.median_at(epoch)
+            if median is not None and best_so_far > median:
+                self.pruned = True
+                return True
+
+        return False
+
+class HyperparameterSearch:
+    def __init__(self, config: Dict):
+        """
+        Rastgele arama + erken durdurma + medyan budama
+
+        Args:
+            config: Sistem konfigürasyonu (MODEL_CONFIG.HYPERPARAM_SEARCH bölümü)
+        """
+        search_config = config.get('MODEL_CONFIG', {}).get('HYPERPARAM_SEARCH', {}) or {}
+
+        self.n_trials = search_config.get('n_trials', 30)
+        self.validation_fraction = search_config.get('validation_fraction', 0.2)
+        self.max_n_estimators = search_config.get('max_n_estimators', 500)
+        self.early_stopping_rounds = search_config.get('early_stopping_rounds', 30)
+        self.prune_after_rounds = search_config.get('prune_after_rounds', 10)
+        self.prune_interval = search_config.get('prune_interval', 10)
+        self.min_completed_trials = search_config.get('min_completed_trials', 3)
+        self.max_workers = search_config.get('max_workers', 0)
+        self.seed = search_config.get('seed', 42)
+        self.space = search_config.get('space', DEFAULT_SEARCH_SPACE)
+
+        # Tamamlanmış denemelerin "en iyi kayıp" eğrileri (budama için)
+        self._curves = []
+        self._lock = threading.Lock()
+
+    def sample_params(self, rng: np.random.Generator) -> Dict:
+        """Arama uzayından bir parametre seti çeker"""
+        params = {}
+        for name, bounds in self.space.items():
+            low, high = bounds[0], bounds[1]
+            if len(bounds) > 2 and bounds[2] == 'log':
+                params[name] = float(np.exp(rng.uniform(np.log(low), np.log(high))))
+            elif isinstance(low, int) and isinstance(high, int):
+                params[name] = int(rng.integers(low, high + 1))
+            else:
+                params[name] = float(rng.uniform(low, high))
+        return params
+
+    def median_at(self, epoch: int) -> Optional[float]:
+        """Tamamlanmış denemelerin verilen turdaki medyan en iyi kaybı"""
+        with self._lock:
+            if len(self._curves) < self.min_completed_trials:
+                return None
+            # Erken duran denemelerin son değeri ileri taşınır
+            values = [curve[min(epoch, len(curve) - 1)] for curve in self._curves]
+        return float(np.median(values))
+
+    def _run_trial(self, trial_no: int, sampled: Dict, base_params: Dict, n_jobs: int,
+                   X_train: np.ndarray, y_train: np.ndarray,
+                   X_val: np.ndarray, y_val: np.ndarray) -> Dict:
+        start = time.perf_counter()
+        pruner = _MedianPruningCallback(self)
+
+        params = dict(base_params)
+        params.update(sampled)
+        params.update({
+            'n_estimators': self.max_n_estimators,
+            'early_stopping_rounds': self.early_stopping_rounds,
+            'callbacks': [pruner],
+            'n_jobs': n_jobs
+        })
+
+        model = xgb.XGBClassifier(**params)
+        model.fit(X_train, y_train, eval_set=[(X_val, y_val)], verbose=False)
+
+        # Budanan denemeler medyanı yukarı çekip budamayı zayıflatmasın
+        if not pruner.pruned:
+            with self._lock:
+                self._curves.append(pruner.curve)
+
+        result = {
+            'trial': trial_no,
+            'params': sampled,
+            'pruned': pruner.pruned,
+            'rounds': len(pruner.curve),
+            'best_iteration': int(model.best_iteration),
+            'val_logloss': float(model.best_score),
+            'val_accuracy': None,
+            'elapsed': time.perf_counter() - start
+        }
+
+        if not pruner.pruned:
+            result['val_accuracy'] = float((model.predict(X_val) == y_val).mean())
+
+        return result
+
+    def search_split(self, X_train: np.ndarray, y_train: np.ndarray,
+                     X_val: np.ndarray, y_val: np.ndarray, base_params: Dict) -> Dict:
+        """
+        Hazır eğitim/doğrulama setleri üzerinde arama yapar
+
+        İlk deneme her zaman base_params'taki mevcut değerlerdir (referans).
+
+        Args:
+            X_train, y_train: Eğitim seti
+            X_val, y_val: Zaman olarak eğitimden sonra gelen doğrulama seti
+            base_params: _build_xgb_params çıktısı (n_jobs toplam thread bütçesi olarak kullanılır)
+
+        Returns:
+            best_params, best_score, trials ve özet bilgiler
+        """
+        start = time.perf_counter()
+        self._curves = []
+        rng = np.random.default_rng(self.seed)
+
+        X_train = np.ascontiguousarray(X_train, dtype=np.float32)
+        X_val = np.ascontiguousarray(X_val, dtype=np.float32)
+        y_train = np.asarray(y_train)
+        y_val = np.asarray(y_val)
+
+        baseline = {name: base_params[name] for name in self.space if name in base_params}
+        candidates = [baseline] + [self.sample_params(rng) for _ in range(max(0, self.n_trials - 1))]
+
+        thread_budget = max(1, int(base_params.get('n_jobs', 1)))
+        max_workers = self.max_workers or thread_budget
+        max_workers = max(1, min(max_workers, len(candidates)))
+        n_jobs = max(1, thread_budget // max_workers)
+
+        trials = []
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(self._run_trial, i + 1, sampled, base_params, n_jobs,
+                                       X_train, y_train, X_val, y_val)
+                       for i, sampled in enumerate(candidates)]
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    trials.append(future.result())
+                except Exception as e:
+                    logger.warning(f"Hiperparametre denemesi başarısız: {str(e)}")
+
+        trials.sort(key=lambda trial: trial['trial'])
+        completed = [trial for trial in trials if not trial['pruned']]
+        if not completed:
+            raise ValueError("Hiçbir hiperparametre denemesi tamamlanamadı!")
+
+        best = min(completed, key=lambda trial: trial['val_logloss'])
+        best_params = dict(best['params'])
+        best_params['n_estimators'] = best['best_iteration'] + 1
+
+        elapsed = time.perf_counter() - start
+        logger.info(f"Hiperparametre araması: {len(trials)} deneme, "
+                   f"{len(trials) - len(completed)} budandı, en iyi logloss {best['val_logloss']:.4f} "
+                   f"(deneme {best['trial']}, {best_params['n_estimators']} tur), süre {elapsed:.1f} sn")
+
+        return {
+            'best_params': best_params,
+            'best_score': best['val_logloss'],
+            'best_accuracy': best['val_accuracy'],
+            'best_trial': best['trial'],
+            'baseline_score': trials[0]['val_logloss'] if trials and trials[0]['trial'] == 1 else None,
+            'n_trials': len(trials),
+            'n_pruned': len(trials) - len(completed),
+            'trials': trials,
+            'elapsed': elapsed
+        }
+
+    def search(self, X: np.ndarray, y: np.ndarray, base_params: Dict, gap: int = 0) -> Dict:
+        """
+        Tek veri seti için arama (son validation_fraction kısmı doğrulama)
+
+        Args:
+            X: Ölçeklenmiş özellik matrisi (zaman sıralı)
+            y: Hedef değişken
+            base_params: Temel XGBoost parametreleri
+            gap: Eğitim ile doğrulama arasındaki arındırma boşluğu (tahmin ufku)
+        """
+        train_slice, val_slice = time_ordered_split(len(X), self.validation_fraction, gap)
+        X = np.asarray(X)
+        y = np.asarray(y)
+        return self.search_split(X[train_slice], y[train_slice], X[val_slice], y[val_slice], base_params)
+
+    def search_pooled(self, datasets: List[Tuple[np.ndarray, np.ndarray]], base_params: Dict,
+                      gap: int = 0) -> Dict:
+        """
+        Aynı volatilite grubundaki birden fazla hisse için ortak arama
+
+        Her hisse kendi içinde zaman sıralı bölünür, eğitim ve doğrulama parçaları birleştirilir.
+
+        Args:
+            datasets: (X, y) listesi - her biri bir hisse
+            base_params: Temel XGBoost parametreleri
+            gap: Arındırma boşluğu
+        """
+        train_X, train_y, val_X, val_y = [], [], [], []
+        for X, y in datasets:
+            X = np.asarray(X)
+            y = np.asarray(y)
+            train_slice, val_slice = time_ordered_split(len(X), self.validation_fraction, gap)
+            train_X.append(X[train_slice])
+            train_y.append(y[train_slice])
+            val_X.append(X[val_slice])
+            val_y.append(y[val_slice])
+
+        return self.search_split(np.vstack(train_X), np.concatenate(train_y),
+                                 np.vstack(val_X), np.concatenate(val_y), base_params)
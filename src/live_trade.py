@@ -609,24 +609,49 @@ class LiveSignalGenerator:
         self.model = None
         self.scaler = None
         self.feature_columns = None
+        self.symbol_categories = None
+        self.evaluator = None
+        
+        # Tahmin backend'i: "xgboost" (predict_proba) veya "numpy" (NumpyTreeEvaluator)
+        inference_config = config.get('MODEL_CONFIG', {}).get('INFERENCE', {}) or {}
+        self.inference_backend = inference_config.get('backend', 'xgboost')
+        # NumPy değerlendirici küçük batch'lerde hızlı; büyük batch'ler booster'a gider
+        self.numpy_max_rows = inference_config.get('numpy_max_rows', 16)
         
     def load_model(self, model_path: str) -> bool:
         """Modeli yükler"""
         try:
-            import joblib
-            model_data = joblib.load(model_path)
+            from model_cache import get_model_cache
+            artifact = get_model_cache(self.config).get(model_path)
             
-            self.model = model_data['model']
-            self.scaler = model_data['scaler']
-            self.feature_columns = model_data['feature_columns']
+            self.model = artifact.get_model()
+            self.scaler = artifact.scaler
+            self.feature_columns = artifact.feature_columns
+            self.symbol_categories = artifact.metadata.get('symbol_categories')
+            self.evaluator = None
+            if self.inference_backend == 'numpy':
+                try:
+                    self.evaluator = artifact.get_evaluator()
+                except ValueError as e:
+                    # Kategorik (havuzlu) modeller NumPy değerlendiricide desteklenmez
+                    logger.warning(f"NumPy backend kullanılamıyor, XGBoost ile devam: {str(e)}")
             
-            logger.info(f"Model yüklendi: {model_path}")
+            logger.info(f"Model yüklendi: {model_path} (backend: {self.inference_backend})")
             return True
             
         except Exception as e:
             logger.error(f"Model yükleme hatası: {str(e)}")
             return False
     
+    def predict_proba(self, features: pd.DataFrame) -> np.ndarray:
+        """Ölçeklenmiş özelliklerle sınıf olasılıkları (seçili backend ile)"""
+        values = features[self.feature_columns].to_numpy(dtype=np.float64)
+        scaled = (values - self.scaler.mean_) / self.scaler.scale_
+        
+        if self.evaluator is not None and len(scaled) <= self.numpy_max_rows:
+            return self.evaluator.predict_proba(scaled)
+        return self.model.predict_proba(scaled)
+    
     def generate_signals(self, symbols: List[str]) -> Dict[str, Dict]:
         """Tüm semboller için sinyal üretir"""
         signals = {}
@@ -654,11 +679,17 @@ class LiveSignalGenerator:
                     logger.warning(f"Özellik oluşturulamadı: {symbol}")
                     continue
                 
+                # Havuzlu model: hisse kimliği kategorik kodu
+                if self.symbol_categories:
+                    from pooled_training import SYMBOL_FEATURE, encode_symbol
+                    features_df[SYMBOL_FEATURE] = encode_symbol(symbol, self.symbol_categories)
+                
                 # Son günün özelliklerini al
                 latest_features = features_df[self.feature_columns].iloc[-1:].copy()
                 
                 # Tahmin yap
-                prediction, probabilities = self.model.predict(latest_features)
+                probabilities = self.predict_proba(latest_features)
+                prediction = (probabilities[:, 1] > 0.5).astype(int)
                 confidence = np.abs(probabilities[0][1] - 0.5) * 2  # 0-1 arası normalize
                 
                 # Mevcut fiyat
@@ -0,0 +1,242 @@
+"""
+Model Artefakt Formatı
+XGBoost booster'ı native UBJ formatında, scaler'ı NumPy sidecar'ında ve meta veriyi JSON manifest'te saklar
+"""
+
+import os
+import json
+import threading
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import joblib
+import xgboost as xgb
+from sklearn.preprocessing import StandardScaler
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+MANIFEST_SUFFIX = ".manifest.json"
+BOOSTER_SUFFIX = ".ubj"
+SCALER_SUFFIX = ".scaler.npz"
+LEGACY_SUFFIX = ".joblib"
+
+def is_native_artifact(path: str) -> bool:
+    return path.endswith(MANIFEST_SUFFIX)
+
+def artifact_stem(path: str) -> str:
+    """Artefakt yolundan uzantısız kök yolu döndürür (manifest veya .joblib)"""
+    for suffix in (MANIFEST_SUFFIX, LEGACY_SUFFIX):
+        if path.endswith(suffix):
+            return path[:-len(suffix)]
+    return path
+
+def artifact_files(path: str) -> List[str]:
+    """Bir artefakta ait tüm dosyalar (silme işlemleri için)"""
+    if not is_native_artifact(path):
+        return [path]
+    stem = artifact_stem(path)
+    return [path, stem + BOOSTER_SUFFIX, stem + SCALER_SUFFIX]
+
+def _to_json(value):
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return float(value)
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (datetime, pd.Timestamp)):
+        return value.isoformat()
+    return str(value)
+
+def _write_atomic(path: str, write_func) -> None:
+    # Yarım yazılmış dosya okunmasın: geçici dosyaya yaz, sonra yer değiştir
+    tmp_path = f"{path}.tmp"
+    write_func(tmp_path)
+    os.replace(tmp_path, path)
+
+def save_native(path: str, model: xgb.XGBClassifier, scaler: StandardScaler,
+                feature_columns: List[str], metadata: Dict) -> str:
+    """
+    Modeli native formatta kaydeder
+
+    Önce booster ve scaler yazılır; manifest en son yazıldığından manifest'in
+    varlığı artefaktın tamamlandığını gösterir.
+
+    Args:
+        path: Manifest yolu (.manifest.json) veya .joblib uzantılı eski tip ad
+        model: Eğitilmiş XGBClassifier
+        scaler: Fit edilmiş StandardScaler
+        feature_columns: Özellik kolonları (sıra önemli)
+        metadata: Manifest'e yazılacak ek bilgiler (JSON'a çevrilebilir olmalı)
+
+    Returns:
+        Manifest dosya yolu
+    """
+    stem = artifact_stem(path)
+    manifest_path = stem + MANIFEST_SUFFIX
+    booster_path = stem + BOOSTER_SUFFIX
+    scaler_path = stem + SCALER_SUFFIX
+
+    # xgboost uzantıya göre format seçtiğinden geçici dosya da .ubj ile bitmeli
+    booster_tmp = f"{stem}.tmp{BOOSTER_SUFFIX}"
+    model.save_model(booster_tmp)
+    os.replace(booster_tmp, booster_path)
+
+    def _write_scaler(tmp_path):
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, mean=scaler.mean_, scale=scaler.scale_, var=scaler.var_,
+                     n_samples_seen=np.asarray(scaler.n_samples_seen_))
+    _write_atomic(scaler_path, _write_scaler)
+
+    # Sadece JSON'a çevrilebilen hiperparametreler (callback vb. hariç)
+    xgb_params = {name: value for name, value in model.get_params().items()
+                  if value is None or isinstance(value, (bool, int, float, str, np.number))}
+
+    manifest = {
+        'format_version': FORMAT_VERSION,
+        'xgboost_version': xgb.__version__,
+        'files': {
+            'booster': os.path.basename(booster_path),
+            'scaler': os.path.basename(scaler_path)
+        },
+        'feature_columns': list(feature_columns),
+        'scaler_has_feature_names': hasattr(scaler, 'feature_names_in_'),
+        'xgb_params': xgb_params
+    }
+    manifest.update(metadata)
+
+    def _write_manifest(tmp_path):
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, default=_to_json)
+    _write_atomic(manifest_path, _write_manifest)
+
+    return manifest_path
+
+def read_manifest(path: str) -> Dict:
+    """Modeli yüklemeden artefakt meta verisini okur (sadece native format)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+class ModelArtifact:
+    def __init__(self, path: str, metadata: Dict, scaler: StandardScaler,
+                 feature_columns: List[str], model: Optional[xgb.XGBClassifier] = None,
+                 size_bytes: int = 0):
+        """
+        Yüklenmiş model artefaktı (native veya eski joblib)
+
+        Native formatta booster ilk get_model() çağrısında yüklenir; NumPy değerlendiricisi
+        (inference backend = numpy) ilk get_evaluator() çağrısında oluşturulur.
+
+        Args:
+            path: Artefakt yolu
+            metadata: tuned_params, data_watermark, update_history, metrics, explanations, timestamp
+            scaler: Fit edilmiş StandardScaler
+            feature_columns: Özellik kolonları
+            model: Yüklenmiş model (None = tembel yükleme)
+            size_bytes: Diskteki toplam boyut (önbellek bellek tahmini için)
+        """
+        self.path = path
+        self.metadata = metadata
+        self.scaler = scaler
+        self.feature_columns = feature_columns
+        self.size_bytes = size_bytes
+        self._model = model
+        self._evaluator = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_model_loaded(self) -> bool:
+        return self._model is not None
+
+    def get_model(self) -> xgb.XGBClassifier:
+        """Booster'ı döndürür (native formatta ilk çağrıda diskten yüklenir)"""
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = _load_booster(self.path, self.metadata)
+        return self._model
+
+    def get_evaluator(self):
+        """NumPy ağaç değerlendiricisini döndürür (ilk çağrıda booster'dan oluşturulur)"""
+        if self._evaluator is None:
+            from tree_evaluator import NumpyTreeEvaluator
+            model = self.get_model()
+            with self._lock:
+                if self._evaluator is None:
+                    self._evaluator = NumpyTreeEvaluator.from_model(model)
+        return self._evaluator
+
+def _load_booster(manifest_path: str, manifest: Dict) -> xgb.XGBClassifier:
+    booster_path = os.path.join(os.path.dirname(manifest_path), manifest['files']['booster'])
+    model = xgb.XGBClassifier(**manifest.get('xgb_params', {}))
+    model.load_model(booster_path)
+    return model
+
+def _load_scaler(manifest_path: str, manifest: Dict) -> StandardScaler:
+    scaler_path = os.path.join(os.path.dirname(manifest_path), manifest['files']['scaler'])
+    with np.load(scaler_path) as arrays:
+        scaler = StandardScaler()
+        scaler.mean_ = arrays['mean']
+        scaler.scale_ = arrays['scale']
+        scaler.var_ = arrays['var']
+        scaler.n_samples_seen_ = arrays['n_samples_seen'][()]
+    scaler.n_features_in_ = len(scaler.mean_)
+    if manifest.get('scaler_has_feature_names'):
+        scaler.feature_names_in_ = np.asarray(manifest['feature_columns'], dtype=object)
+    return scaler
+
+def _parse_metadata(manifest: Dict) -> Dict:
+    watermark = manifest.get('data_watermark')
+    timestamp = manifest.get('timestamp')
+    return {
+        'tuned_params': manifest.get('tuned_params'),
+        'data_watermark': pd.Timestamp(watermark) if watermark else None,
+        'update_history': manifest.get('update_history', []),
+        'metrics': manifest.get('metrics', {}),
+        'symbol_categories': manifest.get('symbol_categories'),
+        'explanations': manifest.get('explanations'),
+        'timestamp': datetime.fromisoformat(timestamp) if timestamp else None
+    }
+
+def load_artifact(path: str, lazy: bool = True) -> ModelArtifact:
+    """
+    Model artefaktını yükler
+
+    .manifest.json için manifest ve scaler okunur, booster tembel yüklenir.
+    .joblib (eski format) dosyaları tamamen unpickle edilir.
+
+    Args:
+        path: Artefakt yolu
+        lazy: False ise native booster da hemen yüklenir
+
+    Returns:
+        ModelArtifact
+    """
+    if is_native_artifact(path):
+        manifest = read_manifest(path)
+        metadata = _parse_metadata(manifest)
+        metadata.update({'files': manifest['files'], 'xgb_params': manifest.get('xgb_params', {})})
+        size = sum(os.path.getsize(f) for f in artifact_files(path) if os.path.exists(f))
+
+        artifact = ModelArtifact(path, metadata, _load_scaler(path, manifest),
+                                 manifest['feature_columns'], size_bytes=size)
+        if not lazy:
+            artifact.get_model()
+        return artifact
+
+    model_data = joblib.load(path)
+    metadata = {
+        'tuned_params': model_data.get('tuned_params'),
+        'data_watermark': model_data.get('data_watermark'),
+        'update_history': model_data.get('update_history', []),
+        'metrics': model_data.get('metrics', {}),
+        'symbol_categories': model_data.get('symbol_categories'),
+        'explanations': model_data.get('explanations'),
+        'timestamp': model_data.get('timestamp')
+    }
+    return ModelArtifact(path, metadata, model_data['scaler'], model_data['feature_columns'],
+                         model=model_data['model'], size_bytes=os.path.getsize(path))
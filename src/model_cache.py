@@ -0,0 +1,149 @@
+"""
+Yüklenmiş Model Önbelleği
+Süreç genelinde paylaşılan, thread-safe LRU model önbelleği (dosya yolu + değişiklik zamanı anahtarlı)
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from model_artifact import ModelArtifact, load_artifact
+
+logger = logging.getLogger(__name__)
+
+class ModelCache:
+    def __init__(self, max_memory_mb: float = 512, max_entries: int = 64):
+        """
+        LRU model önbelleği
+
+        Anahtar (mutlak yol, mtime) olduğundan dosya yeniden yazıldığında eski kayıt
+        kullanılmaz. Bellek kullanımı artefakt dosya boyutu ile tahmin edilir.
+        Native artefaktlarda anahtar manifest dosyasıdır (en son o yazılır).
+
+        Args:
+            max_memory_mb: Önbellekteki modellerin toplam boyut sınırı (MB)
+            max_entries: Önbellekteki en fazla model sayısı
+        """
+        self.max_bytes = int(max_memory_mb * 1024 * 1024)
+        self.max_entries = max_entries
+
+        self._entries = OrderedDict()  # (yol, mtime) -> (ModelArtifact, boyut)
+        self._current_bytes = 0
+        self._lock = threading.Lock()
+        self._load_locks = {}  # Aynı dosyanın eşzamanlı iki kez yüklenmesini önler
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.total_load_time = 0.0
+
+    @staticmethod
+    def _make_key(filepath: str) -> Tuple[str, int]:
+        path = os.path.abspath(filepath)
+        return path, os.stat(path).st_mtime_ns
+
+    def _evict(self) -> None:
+        # Kilit altında çağrılır; en az kullanılan kayıtlar atılır
+        while self._entries and (len(self._entries) > self.max_entries or self._current_bytes > self.max_bytes):
+            key, (_, size) = self._entries.popitem(last=False)
+            self._current_bytes -= size
+            self.evictions += 1
+            logger.debug(f"Model önbellekten çıkarıldı: {key[0]}")
+
+    def _drop_stale(self, path: str) -> None:
+        # Kilit altında çağrılır; aynı dosyanın eski sürümlerini atar
+        for key in [key for key in self._entries if key[0] == path]:
+            _, size = self._entries.pop(key)
+            self._current_bytes -= size
+
+    def get(self, filepath: str) -> ModelArtifact:
+        """
+        Model artefaktını döndürür (önbellekte yoksa diskten yükler)
+
+        Dönen artefakt paylaşılır; çağıran taraf içeriğini değiştirmemelidir.
+
+        Args:
+            filepath: Model dosya yolu (.manifest.json veya .joblib)
+
+        Returns:
+            ModelArtifact (native formatta booster tembel yüklenir)
+        """
+        key = self._make_key(filepath)
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            load_lock = self._load_locks.setdefault(key[0], threading.Lock())
+
+        with load_lock:
+            # Başka bir thread bu sırada yüklemiş olabilir
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return self._entries[key][0]
+
+            start = time.perf_counter()
+            artifact = load_artifact(key[0])
+            load_time = time.perf_counter() - start
+            size = artifact.size_bytes
+
+            with self._lock:
+                self.misses += 1
+                self.total_load_time += load_time
+                self._drop_stale(key[0])
+                self._entries[key] = (artifact, size)
+                self._current_bytes += size
+                self._evict()
+
+        logger.info(f"Model diskten yüklendi: {filepath} ({size / 1024:.0f} KB, {load_time * 1000:.0f} ms)")
+        return artifact
+
+    def invalidate(self, filepath: str = None) -> None:
+        """Bir dosyanın (veya tüm önbelleğin) kayıtlarını siler"""
+        with self._lock:
+            if filepath is None:
+                self._entries.clear()
+                self._current_bytes = 0
+            else:
+                self._drop_stale(os.path.abspath(filepath))
+
+    def get_stats(self) -> Dict:
+        """Önbellek metrikleri: isabet/ıska, atılan kayıt, toplam yükleme süresi, bellek"""
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'memory_mb': self._current_bytes / (1024 * 1024),
+                'max_memory_mb': self.max_bytes / (1024 * 1024),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / requests if requests else 0.0,
+                'evictions': self.evictions,
+                'total_load_time': self.total_load_time,
+                'avg_load_time': self.total_load_time / self.misses if self.misses else 0.0
+            }
+
+_model_cache = None
+_model_cache_lock = threading.Lock()
+
+def get_model_cache(config: Optional[Dict] = None) -> ModelCache:
+    """
+    Süreç genelindeki model önbelleğini döndürür
+
+    İlk çağrıda config'deki MODEL_CACHE bölümüne göre oluşturulur.
+    """
+    global _model_cache
+    with _model_cache_lock:
+        if _model_cache is None:
+            cache_config = (config or {}).get('MODEL_CACHE', {}) or {}
+            _model_cache = ModelCache(
+                max_memory_mb=cache_config.get('max_memory_mb', 512),
+                max_entries=cache_config.get('max_entries', 64)
+            )
+        return _model_cache
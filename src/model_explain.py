@@ -0,0 +1,78 @@
+"""
+Model Açıklamaları
+Özellik önemi ve XGBoost katkı (pred_contribs, TreeSHAP) hesapları - eğitimde bir kez hesaplanıp artefakta yazılır
+"""
+
+import logging
+from datetime import datetime
+from typing import Dict, List
+
+import numpy as np
+import xgboost as xgb
+
+logger = logging.getLogger(__name__)
+
+def compute_contributions(model: xgb.XGBClassifier, X_scaled: np.ndarray) -> np.ndarray:
+    """
+    Satır başına özellik katkıları (log-odds cinsinden, TreeSHAP)
+
+    Args:
+        model: Eğitilmiş XGBClassifier
+        X_scaled: Ölçeklenmiş özellik matrisi
+
+    Returns:
+        (satır, özellik + 1) dizisi - son kolon bias (base value)
+    """
+    booster = model.get_booster()
+    feature_types = booster.feature_types
+    has_categorical = feature_types is not None and 'c' in feature_types
+    dmatrix = xgb.DMatrix(np.asarray(X_scaled, dtype=np.float32), feature_types=feature_types,
+                          enable_categorical=has_categorical, nthread=model.n_jobs)
+    return booster.predict(dmatrix, pred_contribs=True)
+
+def build_explanations(model: xgb.XGBClassifier, feature_columns: List[str],
+                       X_reference: np.ndarray) -> Dict:
+    """
+    Modelin global açıklamalarını hesaplar (eğitim sonunda bir kez)
+
+    Args:
+        model: Eğitilmiş XGBClassifier
+        feature_columns: Özellik kolonları
+        X_reference: Ölçeklenmiş referans örneklem (ör. eğitim setinin son satırları)
+
+    Returns:
+        feature_importance (gain), mean_abs_contribution, base_value, reference_rows, computed_at
+    """
+    importances = model.feature_importances_
+    contributions = compute_contributions(model, X_reference)
+    mean_abs = np.abs(contributions[:, :-1]).mean(axis=0)
+
+    return {
+        'feature_importance': {feature: float(value) for feature, value in zip(feature_columns, importances)},
+        'mean_abs_contribution': {feature: float(value) for feature, value in zip(feature_columns, mean_abs)},
+        'base_value': float(contributions[0, -1]) if len(contributions) else 0.0,
+        'reference_rows': int(len(X_reference)),
+        'computed_at': datetime.now().isoformat()
+    }
+
+def top_contributions(contributions: np.ndarray, feature_columns: List[str], values: np.ndarray = None,
+                      top_n: int = 10) -> List[Dict]:
+    """
+    Tek satırın en büyük (mutlak) katkıları
+
+    Args:
+        contributions: compute_contributions satırı (bias dahil)
+        feature_columns: Özellik kolonları
+        values: Satırın ölçeklenmemiş özellik değerleri (gösterim için)
+        top_n: Döndürülecek özellik sayısı
+
+    Returns:
+        feature, contribution (pozitif = yükseliş yönünde), value içeren dict listesi
+    """
+    feature_contributions = contributions[:len(feature_columns)]
+    order = np.argsort(-np.abs(feature_contributions))[:top_n]
+    return [{
+        'feature': feature_columns[i],
+        'contribution': float(feature_contributions[i]),
+        'value': float(values[i]) if values is not None else None
+    } for i in order]
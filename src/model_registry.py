@@ -0,0 +1,298 @@
+"""
+Model Kayıt Defteri (Registry)
+Eğitilmiş model dosyalarını SQLite indeksinde tutar; en son model araması dizin taraması gerektirmez
+"""
+
+import os
+import re
+import json
+import sqlite3
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from model_artifact import MANIFEST_SUFFIX, LEGACY_SUFFIX, artifact_files, is_native_artifact, read_manifest
+
+logger = logging.getLogger(__name__)
+
+MODEL_DIR = "src/models"
+REGISTRY_FILE = "registry.db"
+
+# <SEMBOL>_<YATIRIM_SÜRESİ>_Model_<YYYYmmdd_HHMMSS>.(joblib|manifest.json) (yatırım süresi eski formatta yok)
+MODEL_FILENAME_PATTERN = re.compile(
+    r'^(?P<symbol>.+?)_(?:(?P<horizon>SHORT_TERM|MEDIUM_TERM|LONG_TERM)_)?Model_(?P<timestamp>\d{8}_\d{6})'
+    r'\.(?:joblib|manifest\.json)$'
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS models (
+    path TEXT PRIMARY KEY,
+    symbol TEXT,
+    horizon TEXT,
+    interval TEXT,
+    created_at TEXT NOT NULL,
+    data_watermark TEXT,
+    metrics TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_models_lookup ON models (symbol, horizon, interval, created_at);
+CREATE INDEX IF NOT EXISTS idx_models_created ON models (created_at);
+"""
+
+def parse_model_filename(filename: str) -> Dict[str, Optional[str]]:
+    """
+    Model dosya adından sembol, yatırım süresi ve oluşturulma zamanını çıkarır
+
+    Returns:
+        symbol, horizon, created_at (ISO) - eşleşmeyen alanlar None
+    """
+    match = MODEL_FILENAME_PATTERN.match(os.path.basename(filename))
+    if not match:
+        return {'symbol': None, 'horizon': None, 'created_at': None}
+
+    created_at = datetime.strptime(match.group('timestamp'), "%Y%m%d_%H%M%S").isoformat()
+    return {'symbol': match.group('symbol'), 'horizon': match.group('horizon'), 'created_at': created_at}
+
+class ModelRegistry:
+    def __init__(self, model_dir: str = MODEL_DIR, db_path: str = None):
+        """
+        SQLite tabanlı model indeksi
+
+        Kayıt defteri ilk kez oluşturulurken model klasörü bir kez taranır; sonrasında
+        kayıt save_model üzerinden yapılır.
+
+        Args:
+            model_dir: Model klasörü
+            db_path: SQLite dosyası (None = model_dir/registry.db)
+        """
+        self.model_dir = model_dir
+        self.db_path = db_path or os.path.join(model_dir, REGISTRY_FILE)
+
+        os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
+        is_new = not os.path.exists(self.db_path)
+
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+        if is_new:
+            self.rebuild()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Her işlem kendi bağlantısını açar (thread ve süreçler arası güvenli)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def _normalize_symbol(symbol: Optional[str]) -> Optional[str]:
+        return symbol.replace('.IS', '') if symbol else symbol
+
+    @staticmethod
+    def _row_to_dict(row: sqlite3.Row) -> Dict:
+        entry = dict(row)
+        entry['filename'] = os.path.basename(entry['path'])
+        entry['metrics'] = json.loads(entry['metrics']) if entry['metrics'] else {}
+        return entry
+
+    def register(self, path: str, symbol: str = None, horizon: str = None, interval: str = None,
+                 created_at: str = None, data_watermark=None, metrics: Dict = None) -> Dict:
+        """
+        Model dosyasını kayıt defterine ekler (aynı yol varsa günceller)
+
+        Sembol ve yatırım süresi verilmezse dosya adından çıkarılır.
+
+        Args:
+            path: Model dosya yolu
+            symbol: Hisse sembolü
+            horizon: Yatırım süresi
+            interval: Zaman dilimi
+            created_at: Oluşturulma zamanı (ISO, None = şimdi)
+            data_watermark: Eğitimde kullanılan son barın zamanı
+            metrics: Test metrikleri
+
+        Returns:
+            Kayıt dict'i
+        """
+        parsed = parse_model_filename(path)
+        entry = {
+            'path': os.path.normpath(path),
+            'symbol': self._normalize_symbol(symbol) or parsed['symbol'],
+            'horizon': horizon or parsed['horizon'],
+            'interval': interval,
+            'created_at': created_at or datetime.now().isoformat(),
+            'data_watermark': str(data_watermark) if data_watermark is not None else None,
+            'metrics': json.dumps(metrics or {}, default=float)
+        }
+
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO models (path, symbol, horizon, interval, created_at, data_watermark, metrics) "
+                "VALUES (:path, :symbol, :horizon, :interval, :created_at, :data_watermark, :metrics)",
+                entry
+            )
+
+        return entry
+
+    def unregister(self, path: str) -> None:
+        """Kaydı siler (dosyaya dokunmaz)"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM models WHERE path = ?", (os.path.normpath(path),))
+
+    def _query(self, symbol: str = None, horizon: str = None, interval: str = None,
+               limit: int = None) -> List[Dict]:
+        clauses, params = [], []
+        if symbol is not None:
+            clauses.append("symbol = ?")
+            params.append(self._normalize_symbol(symbol))
+        if horizon is not None:
+            clauses.append("horizon = ?")
+            params.append(horizon)
+        if interval is not None:
+            # Zaman dilimi bilinmeyen (eski) modeller her aralıkla eşleşir
+            clauses.append("(interval = ? OR interval IS NULL)")
+            params.append(interval)
+
+        sql = "SELECT * FROM models"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY created_at DESC"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+
+        with self._connect() as conn:
+            return [self._row_to_dict(row) for row in conn.execute(sql, params)]
+
+    def list_models(self, symbol: str = None, horizon: str = None, interval: str = None) -> List[Dict]:
+        """Filtrelere uyan modeller (en yeni başta); dosyası silinmiş kayıtlar temizlenir"""
+        entries = []
+        for entry in self._query(symbol, horizon, interval):
+            if os.path.exists(entry['path']):
+                entries.append(entry)
+            else:
+                self.unregister(entry['path'])
+        return entries
+
+    def find_latest(self, symbol: str, horizon: str = None, interval: str = None) -> Optional[str]:
+        """
+        (sembol, yatırım süresi, zaman dilimi) için en son model dosyasının yolu
+
+        İndeks üzerinden tek satır okunur. Dosyası silinmiş kayıtlar temizlenir.
+        """
+        while True:
+            entries = self._query(symbol, horizon, interval, limit=1)
+            if not entries:
+                return None
+
+            path = entries[0]['path']
+            if os.path.exists(path):
+                return path
+
+            logger.warning(f"Model dosyası bulunamadı, kayıt siliniyor: {path}")
+            self.unregister(path)
+
+    def garbage_collect(self, keep_latest: Optional[int] = 1, max_age_days: int = None,
+                        symbol: str = None, dry_run: bool = False) -> List[str]:
+        """
+        Yerini yenisine bırakmış model dosyalarını siler
+
+        Args:
+            keep_latest: Her (sembol, yatırım süresi, zaman dilimi) için tutulacak en yeni model
+                sayısı (None = sadece yaşa göre sil)
+            max_age_days: Bu günden eski modeller yeni olup olmadıklarına bakılmadan silinir
+            symbol: Sadece bu hissenin modelleri
+            dry_run: True ise silmeden silinecekleri döndürür
+
+        Returns:
+            Silinen (silinecek) dosya yolları
+        """
+        entries = self._query(symbol=symbol)
+        cutoff = (datetime.now() - timedelta(days=max_age_days)).isoformat() if max_age_days is not None else None
+
+        seen = {}
+        to_remove = []
+        for entry in entries:  # en yeni başta
+            key = (entry['symbol'], entry['horizon'], entry['interval'])
+            rank = seen.get(key, 0)
+            seen[key] = rank + 1
+
+            superseded = keep_latest is not None and rank >= keep_latest
+            expired = cutoff is not None and entry['created_at'] < cutoff
+            if superseded or expired:
+                to_remove.append(entry['path'])
+
+        if dry_run:
+            return to_remove
+
+        for path in to_remove:
+            try:
+                for filepath in artifact_files(path):
+                    if os.path.exists(filepath):
+                        os.remove(filepath)
+            except OSError as e:
+                logger.warning(f"Model dosyası silinemedi: {path} - {str(e)}")
+                continue
+            self.unregister(path)
+
+        if to_remove:
+            logger.info(f"{len(to_remove)} eski model temizlendi")
+
+        return to_remove
+
+    def remove_all(self, symbol: str = None) -> int:
+        """Kayıtlı tüm model dosyalarını (veya bir hissenin modellerini) siler"""
+        return len(self.garbage_collect(keep_latest=0, symbol=symbol))
+
+    def rebuild(self) -> int:
+        """
+        Model klasörünü tarayıp indeksi yeniden oluşturur
+
+        Kayıt defteri dışından kopyalanan/silinen dosyalar için kullanılır.
+
+        Returns:
+            Kayıtlı model sayısı
+        """
+        if not os.path.exists(self.model_dir):
+            return 0
+
+        files = [f for f in os.listdir(self.model_dir) if f.endswith((LEGACY_SUFFIX, MANIFEST_SUFFIX))]
+
+        with self._connect() as conn:
+            conn.execute("DELETE FROM models")
+            for filename in files:
+                path = os.path.normpath(os.path.join(self.model_dir, filename))
+                parsed = parse_model_filename(filename)
+                created_at = parsed['created_at'] or datetime.fromtimestamp(os.path.getmtime(path)).isoformat()
+                interval, watermark, metrics = None, None, None
+
+                # Native artefaktta meta veri manifest'ten okunur (model yüklenmez)
+                if is_native_artifact(path):
+                    try:
+                        manifest = read_manifest(path)
+                        model_config = manifest.get('model_config', {})
+                        interval = model_config.get('interval')
+                        parsed['horizon'] = parsed['horizon'] or model_config.get('investment_horizon')
+                        watermark = manifest.get('data_watermark')
+                        metrics = json.dumps(manifest.get('metrics', {}))
+                        created_at = manifest.get('timestamp') or created_at
+                    except Exception as e:
+                        logger.warning(f"Manifest okunamadı: {path} - {str(e)}")
+
+                conn.execute(
+                    "INSERT OR REPLACE INTO models (path, symbol, horizon, interval, created_at, data_watermark, metrics) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (path, parsed['symbol'], parsed['horizon'], interval, created_at, watermark, metrics)
+                )
+
+        logger.info(f"Model kayıt defteri yeniden oluşturuldu: {len(files)} model")
+        return len(files)
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+def get_model_registry(model_dir: str = MODEL_DIR) -> ModelRegistry:
+    """Model klasörü başına süreç içinde tek bir ModelRegistry döndürür"""
+    key = os.path.abspath(model_dir)
+    with _registries_lock:
+        if key not in _registries:
+            _registries[key] = ModelRegistry(model_dir)
+        return _registries[key]
@@ -12,19 +12,174 @@ import joblib
 import logging
 from typing import Dict, List, Tuple, Optional
 import os
+import copy
+import time
+import concurrent.futures
 from datetime import datetime
 
+from feature_engineering import get_prediction_horizon
+from model_registry import get_model_registry
+from model_cache import get_model_cache
+from model_artifact import save_native
+from pooled_training import SYMBOL_FEATURE, encode_symbol
+from model_explain import build_explanations
+
 logger = logging.getLogger(__name__)
 
+VALID_TREE_METHODS = ('hist', 'approx', 'exact', 'auto')
+
+def get_training_resources(config: Dict, parallel_jobs: Optional[int] = None) -> Dict:
+    """
+    Eğitim için CPU/thread bütçesini çözer
+    
+    Toplam çekirdek bütçesi (cpu_budget), aynı anda eğitilen hisse sayısına
+    (parallel_symbols) bölünür; böylece paralel eğitimde thread'ler birbirini ezmez.
+    
+    Args:
+        config: Sistem konfigürasyonu (TRAINING_RESOURCES bölümü)
+        parallel_jobs: Aynı anda çalışacak eğitim sayısı (verilmezse config'den)
+        
+    Returns:
+        cpu_budget, parallel_symbols, n_jobs, tree_method, max_bin içeren dict
+    """
+    resources = config.get('TRAINING_RESOURCES', {}) or {}
+    cpu_count = os.cpu_count() or 1
+    
+    # Toplam çekirdek bütçesi (0 = tüm çekirdekler)
+    cpu_budget = int(resources.get('cpu_budget', 0) or 0)
+    if cpu_budget <= 0 or cpu_budget > cpu_count:
+        cpu_budget = cpu_count
+    
+    # Paralel hisse eğitimi sayısı bütçeyi aşamaz
+    if parallel_jobs is None:
+        parallel_jobs = int(resources.get('parallel_symbols', 1) or 1)
+    parallel_jobs = max(1, min(int(parallel_jobs), cpu_budget))
+    
+    # Model başına thread sayısı (0 = bütçeden otomatik pay)
+    threads_per_job = max(1, cpu_budget // parallel_jobs)
+    n_jobs = int(resources.get('n_jobs', 0) or 0)
+    n_jobs = threads_per_job if n_jobs <= 0 else min(n_jobs, threads_per_job)
+    
+    tree_method = resources.get('tree_method', 'hist')
+    if tree_method not in VALID_TREE_METHODS:
+        logger.warning(f"Geçersiz tree_method: {tree_method}, 'hist' kullanılıyor")
+        tree_method = 'hist'
+    
+    return {
+        'cpu_budget': cpu_budget,
+        'parallel_symbols': parallel_jobs,
+        'n_jobs': n_jobs,
+        'tree_method': tree_method,
+        'max_bin': int(resources.get('max_bin', 256))
+    }
+
+def walk_forward_splits(n_samples: int, n_splits: int = 5, mode: str = 'expanding',
+                        window: Optional[int] = None, test_size: Optional[int] = None,
+                        gap: int = 0) -> List[Tuple[slice, slice]]:
+    """
+    Zaman sıralı walk-forward katlarını slice olarak üretir
+    
+    Slice kullanıldığı için katlar ortak dizinin görünümleri (view) olur, kopya oluşmaz.
+    
+    Args:
+        n_samples: Toplam satır sayısı
+        n_splits: Kat sayısı
+        mode: 'expanding' (genişleyen) veya 'rolling' (sabit pencere)
+        window: Rolling modda eğitim penceresi (bar)
+        test_size: Her katın test uzunluğu (None = otomatik)
+        gap: Eğitim sonu ile test başı arasındaki arındırma (purge) boşluğu
+        
+    Returns:
+        (train_slice, test_slice) listesi
+    """
+    if mode not in ('expanding', 'rolling'):
+        raise ValueError(f"Geçersiz walk-forward modu: {mode}")
+    
+    max_train_size = window if mode == 'rolling' else None
+    splitter = TimeSeriesSplit(n_splits=n_splits, max_train_size=max_train_size,
+                               test_size=test_size, gap=gap)
+    
+    splits = []
+    for train_idx, test_idx in splitter.split(np.empty((n_samples, 1))):
+        # TimeSeriesSplit indeksleri ardışık - slice'a çevir
+        splits.append((slice(int(train_idx[0]), int(train_idx[-1]) + 1),
+                       slice(int(test_idx[0]), int(test_idx[-1]) + 1)))
+    return splits
+
+def walk_forward_segments(n_samples: int, retrain_every: int, min_train: int, mode: str = 'expanding',
+                          window: Optional[int] = None, gap: int = 0) -> List[Tuple[slice, slice]]:
+    """
+    Periyodik yeniden eğitim için ardışık walk-forward segmentleri
+    
+    Her kesim noktasında (min_train, min_train + retrain_every, ...) model kesimden önceki
+    verilerle eğitilir ve sonraki retrain_every barı örneklem dışı tahmin eder. Test
+    segmentleri örtüşmez ve kesimden sona kadar tüm barları kapsar.
+    
+    Args:
+        n_samples: Toplam satır sayısı
+        retrain_every: Yeniden eğitim sıklığı (bar) - test segmenti uzunluğu
+        min_train: İlk kesimden önceki en az eğitim barı
+        mode: 'expanding' (genişleyen) veya 'rolling' (sabit pencere)
+        window: Rolling modda eğitim penceresi (bar)
+        gap: Eğitim sonu ile kesim arasındaki arındırma boşluğu (hedef ufku)
+        
+    Returns:
+        (train_slice, test_slice) listesi
+    """
+    if mode not in ('expanding', 'rolling'):
+        raise ValueError(f"Geçersiz walk-forward modu: {mode}")
+    if retrain_every <= 0:
+        raise ValueError(f"Geçersiz yeniden eğitim sıklığı: {retrain_every}")
+    
+    segments = []
+    for cutoff in range(min_train, n_samples, retrain_every):
+        train_stop = cutoff - gap
+        train_start = max(0, train_stop - window) if mode == 'rolling' and window else 0
+        if train_stop <= train_start:
+            continue
+        segments.append((slice(train_start, train_stop), slice(cutoff, min(cutoff + retrain_every, n_samples))))
+    return segments
+
 class StockDirectionPredictor:
-    def __init__(self, config: Dict):
+    def __init__(self, config: Dict, n_jobs: Optional[int] = None):
         self.config = config
-        self.model = None
+        self._model = None
+        self._artifact = None  # Booster'ı henüz yüklenmemiş (tembel) artefakt
         self.scaler = StandardScaler()
         self.feature_columns = None
+        self.tuned_params = None  # Hiperparametre aramasının kazanan parametreleri
+        self.data_watermark = None  # Eğitimde kullanılan son (etiketli) barın zamanı
+        self.update_history = []  # Artımlı güncelleme kayıtları
+        self.metrics = {}  # Son eğitimin test metrikleri (model kayıt defterine yazılır)
+        self.symbol_categories = None  # Havuzlu modelde hisse kimliği kategorileri
+        self.explanations = None  # Eğitimde hesaplanan özellik önemi / katkı özetleri
         self.model_dir = "src/models"
         os.makedirs(self.model_dir, exist_ok=True)
         
+        # Eğitim kaynakları (thread bütçesi, tree_method, max_bin)
+        self.resources = get_training_resources(config)
+        if n_jobs is not None:
+            # Paralel toplu eğitimde scheduler thread payını kendisi belirler
+            self.resources['n_jobs'] = max(1, int(n_jobs))
+    
+    @property
+    def model(self) -> Optional[xgb.XGBClassifier]:
+        """XGBoost modeli (native artefaktta booster ilk erişimde yüklenir)"""
+        if self._model is None and self._artifact is not None:
+            self._model = self._artifact.get_model()
+            self._artifact = None
+        return self._model
+    
+    @model.setter
+    def model(self, value: Optional[xgb.XGBClassifier]):
+        self._model = value
+        self._artifact = None
+    
+    @property
+    def has_model(self) -> bool:
+        """Model eğitilmiş veya yüklenmiş mi (booster'ı yüklemeden kontrol eder)"""
+        return self._model is not None or self._artifact is not None
+        
     def prepare_data(self, features_df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.Series]:
         """
         Model için veriyi hazırlar
@@ -38,9 +193,16 @@ class StockDirectionPredictor:
         # Hedef değişkeni seç
         target_col = 'direction_binary'  # Binary classification
         
+        # Havuzlu model: hisse kimliği 'symbol' kolonundan kodlanır (bilinmeyen hisse eksik değer)
+        symbol_codes = None
+        if self.symbol_categories and SYMBOL_FEATURE in self.feature_columns:
+            symbols = features_df['symbol'] if 'symbol' in features_df.columns else pd.Series(None, index=features_df.index)
+            symbol_codes = symbols.map(lambda symbol: encode_symbol(symbol, self.symbol_categories)).astype(float)
+            features_df[SYMBOL_FEATURE] = symbol_codes
+        
         # Eğer model yüklüyse ve feature_columns zaten varsa, onları kullan
         # Bu, modelin beklediği feature columns ile eşleşmeyi garanti eder
-        if self.feature_columns is not None and hasattr(self, 'model') and self.model is not None:
+        if self.feature_columns is not None and self.has_model:
             # Model yüklüyse, sadece modelin beklediği feature columns'ı kullan
             # Yeni feature'ları (modelin beklediği listede olmayanları) filtrele
             available_features = [col for col in self.feature_columns if col in features_df.columns]
@@ -77,6 +239,10 @@ class StockDirectionPredictor:
         X = X.fillna(X.median())
         
         mask = ~(X.isnull().any(axis=1) | y.isnull())
+        if symbol_codes is not None:
+            # Kategorik kod medyanla doldurulmaz; eksik kalması satırı düşürmez
+            X[SYMBOL_FEATURE] = symbol_codes
+            mask = ~(X.drop(columns=SYMBOL_FEATURE).isnull().any(axis=1) | y.isnull())
         X = X[mask]
         y = y[mask]
         
@@ -115,6 +281,24 @@ class StockDirectionPredictor:
         volatility = returns.std() * np.sqrt(252)
         return volatility
     
+    def get_volatility_bucket(self, volatility: float) -> str:
+        """
+        Volatiliteye göre konfigürasyon grubunun adını döndürür
+        
+        Args:
+            volatility: Yıllık volatilite
+            
+        Returns:
+            LOW_VOLATILITY, MEDIUM_VOLATILITY, HIGH_VOLATILITY veya VERY_HIGH_VOLATILITY
+        """
+        if volatility <= 0.25:
+            return 'LOW_VOLATILITY'
+        elif volatility <= 0.40:
+            return 'MEDIUM_VOLATILITY'
+        elif volatility <= 0.60:
+            return 'HIGH_VOLATILITY'
+        return 'VERY_HIGH_VOLATILITY'
+    
     def get_volatility_config(self, volatility: float) -> Dict:
         """
         Volatiliteye göre model konfigürasyonu döndürür
@@ -128,22 +312,30 @@ class StockDirectionPredictor:
         model_config = self.config.get('MODEL_CONFIG', {})
         volatility_configs = model_config.get('VOLATILITY_CONFIGS', {})
         
-        if volatility <= 0.25:
-            config_name = 'LOW_VOLATILITY'
+        config_name = self.get_volatility_bucket(volatility)
+        if config_name == 'LOW_VOLATILITY':
             logger.info(f"Volatilite: %{volatility*100:.1f} - Düşük volatilite konfigürasyonu")
-        elif volatility <= 0.40:
-            config_name = 'MEDIUM_VOLATILITY'
+        elif config_name == 'MEDIUM_VOLATILITY':
             logger.info(f"Volatilite: %{volatility*100:.1f} - Orta volatilite konfigürasyonu")
-        elif volatility <= 0.60:
-            config_name = 'HIGH_VOLATILITY'
+        elif config_name == 'HIGH_VOLATILITY':
             logger.info(f"Volatilite: %{volatility*100:.1f} - Yüksek volatilite konfigürasyonu")
         else:
-            config_name = 'VERY_HIGH_VOLATILITY'
             logger.info(f"Volatilite: %{volatility*100:.1f} - Çok yüksek volatilite konfigürasyonu")
         
-        return volatility_configs.get(config_name, volatility_configs.get('MEDIUM_VOLATILITY', {}))
+        bucket_config = dict(volatility_configs.get(config_name, volatility_configs.get('MEDIUM_VOLATILITY', {})))
+        
+        # Hiperparametre aramasından gelen grup bazlı değerler varsa onları kullan
+        if model_config.get('HYPERPARAM_SEARCH', {}).get('use_tuned_buckets', False):
+            from hyperparam_search import load_bucket_params
+            tuned = load_bucket_params().get(config_name)
+            if tuned:
+                logger.info(f"{config_name} için ayarlanmış parametreler kullanılıyor")
+                bucket_config.update(tuned)
+        
+        return bucket_config
 
-    def train_model(self, X: pd.DataFrame, y: pd.Series, test_size: float = 0.2) -> Dict:
+    def train_model(self, X: pd.DataFrame, y: pd.Series, test_size: float = 0.2,
+                    tune: bool = False) -> Dict:
         """
         XGBoost modelini eğitir
         
@@ -151,6 +343,7 @@ class StockDirectionPredictor:
             X: Özellik matrisi
             y: Hedef değişken
             test_size: Test seti oranı
+            tune: True ise eğitim setinde hiperparametre araması yapılır
             
         Returns:
             Eğitim metrikleri
@@ -166,7 +359,8 @@ class StockDirectionPredictor:
         X_train, X_test = X.iloc[:split_idx], X.iloc[split_idx:]
         y_train, y_test = y.iloc[:split_idx], y.iloc[split_idx:]
         
-        # Özellikleri ölçeklendir
+        # Özellikleri ölçeklendir (yeni scaler: yüklenmiş modelin scaler'ı yerinde değiştirilmez)
+        self.scaler = StandardScaler()
         X_train_scaled = self.scaler.fit_transform(X_train)
         X_test_scaled = self.scaler.transform(X_test)
         
@@ -179,27 +373,30 @@ class StockDirectionPredictor:
             scale_pos_weight = 1.0
         
         # XGBoost parametreleri (volatilite bazlı)
-        xgb_params = {
-            'objective': 'binary:logistic',
-            'eval_metric': 'logloss',
-            'max_depth': volatility_config.get('max_depth', 4),
-            'learning_rate': volatility_config.get('learning_rate', 0.05),
-            'n_estimators': volatility_config.get('n_estimators', 200),
-            'subsample': volatility_config.get('subsample', 0.7),
-            'colsample_bytree': volatility_config.get('colsample_bytree', 0.7),
-            'min_child_weight': volatility_config.get('min_child_weight', 5),
-            'reg_alpha': volatility_config.get('reg_alpha', 0.1),
-            'reg_lambda': volatility_config.get('reg_lambda', 0.1),
-            'scale_pos_weight': scale_pos_weight,  # Class imbalance için
-            'random_state': 42,
-            'n_jobs': 1  # Optimizasyon: Ücretsiz sunucular için tek thread (kaynak sınırlaması)
-        }
+        xgb_params = self._build_xgb_params(volatility_config, scale_pos_weight)
+        
+        # Hiperparametre araması (sadece eğitim seti - test seti aramaya sızmaz)
+        tuning = None
+        if tune:
+            tuning = self.tune_hyperparameters(X_train_scaled, y_train, xgb_params)
+            xgb_params.update(tuning['best_params'])
         
         logger.info(f"Volatilite bazlı parametreler: {xgb_params}")
         
         # Model oluştur ve eğit
         self.model = xgb.XGBClassifier(**xgb_params)
+        fit_start = time.perf_counter()
         self.model.fit(X_train_scaled, y_train)
+        training_time = time.perf_counter() - fit_start
+        
+        # Veri filigranı: artımlı güncellemede yeni barlar buna göre belirlenir
+        self.data_watermark = self._get_watermark(X)
+        self.update_history = []
+        self.symbol_categories = None
+        
+        logger.info(f"Eğitim süresi: {training_time:.2f} sn "
+                   f"(n_jobs={xgb_params['n_jobs']}, tree_method={xgb_params['tree_method']}, "
+                   f"max_bin={xgb_params['max_bin']}, satır={len(X_train)})")
         
         # Tahminler
         y_pred_train = self.model.predict(X_train_scaled)
@@ -208,21 +405,360 @@ class StockDirectionPredictor:
         # Metrikleri hesapla
         train_metrics = self._calculate_metrics(y_train, y_pred_train, "Train")
         test_metrics = self._calculate_metrics(y_test, y_pred_test, "Test")
+        self.metrics = test_metrics
+        
+        # Açıklamalar (özellik önemi + referans örneklemde ortalama katkı) bir kez hesaplanır
+        self.explanations = self.compute_explanations(X_train_scaled)
         
         # Feature importance
         feature_importance = self._get_feature_importance()
+        logger.info("En önemli 10 özellik:")
+        for _, row in feature_importance.head(10).iterrows():
+            logger.info(f"  {row['feature']}: {row['importance']:.4f}")
         
         # Sonuçları birleştir
         results = {
             'train_metrics': train_metrics,
             'test_metrics': test_metrics,
             'feature_importance': feature_importance,
-            'model_params': xgb_params
+            'model_params': xgb_params,
+            'training_time': training_time,
+            'resources': dict(self.resources),
+            'tuning': tuning
         }
         
         logger.info("Model eğitimi tamamlandı")
         return results
     
+    def fit_window(self, X: pd.DataFrame, y: pd.Series) -> None:
+        """
+        Modeli verilen pencerenin tamamıyla eğitir (walk-forward segmentleri için)
+        
+        train_model'den farklı olarak doğrulama için son barlar ayrılmaz; kesime en yakın
+        barlar da eğitime girer. Metrik ve açıklama hesaplanmaz.
+        
+        Args:
+            X: Özellik matrisi (kesime kadar)
+            y: Hedef değişken
+        """
+        volatility_config = self.get_volatility_config(self.calculate_volatility(X))
+        
+        self.scaler = StandardScaler()
+        X_scaled = self.scaler.fit_transform(X)
+        
+        y_counts = y.value_counts()
+        scale_pos_weight = y_counts[0] / y_counts[1] if len(y_counts) == 2 else 1.0
+        
+        self.model = xgb.XGBClassifier(**self._build_xgb_params(volatility_config, scale_pos_weight))
+        self.model.fit(X_scaled, y)
+        self.feature_columns = list(X.columns)
+        self.data_watermark = self._get_watermark(X)
+    
+    def _get_watermark(self, X: pd.DataFrame) -> Optional[pd.Timestamp]:
+        """Veri setindeki son barın zamanını döndürür (zaman indeksi yoksa None)"""
+        if len(X) == 0 or not isinstance(X.index, pd.DatetimeIndex):
+            return None
+        return X.index.max()
+    
+    def calculate_drift(self, X: pd.DataFrame) -> float:
+        """
+        Yeni verinin eğitim dağılımından sapmasını ölçer
+        
+        Eğitimde fit edilen scaler ile standartlaştırılmış özelliklerin mutlak
+        ortalama kaymalarının medyanı (z-skor cinsinden) döndürülür; 0 = sapma yok.
+        Medyan, trendli fiyat seviyesi özelliklerinin sonucu domine etmesini önler.
+        
+        Args:
+            X: Yeni özellik matrisi
+            
+        Returns:
+            Medyan mutlak z-kayması
+        """
+        if len(X) == 0:
+            return 0.0
+        z_scores = self.scaler.transform(X)
+        return float(np.nanmedian(np.abs(np.nanmean(z_scores, axis=0))))
+    
+    def update_model(self, X: pd.DataFrame, y: pd.Series, window: int = None,
+                     n_rounds: int = None, drift_threshold: float = None,
+                     allow_refit: bool = True) -> Dict:
+        """
+        Yeni barlar için artımlı (warm-start) güncelleme yapar
+        
+        Önceki booster yüklenir ve son pencere üzerinde ek boosting turları eğitilir.
+        Scaler değiştirilmez (mevcut ağaçların eşikleri geçerli kalır). Sapma eşiği
+        aşılırsa veya güncelleme sayısı sınırı dolarsa tam yeniden eğitime geçilir.
+        
+        Args:
+            X: Özellik matrisi (prepare_data çıktısı, modelin kolonlarıyla)
+            y: Hedef değişken
+            window: Ek turların eğitileceği son bar sayısı (None = config)
+            n_rounds: Eklenecek boosting turu (None = config)
+            drift_threshold: Tam yeniden eğitim için sapma eşiği (None = config)
+            allow_refit: False ise tam yeniden eğitim yapılmaz, 'refit_required' döner
+                (X sadece son barları içeriyorsa çağıran taraf tüm veriyle eğitir)
+            
+        Returns:
+            mode ('skipped', 'incremental', 'refit', 'refit_required'), yeni bar sayısı, sapma ve metrikler
+        """
+        if self.model is None:
+            raise ValueError("Model henüz eğitilmemiş!")
+        
+        inc_config = self.config.get('MODEL_CONFIG', {}).get('INCREMENTAL', {}) or {}
+        window = window or inc_config.get('window', 120)
+        n_rounds = n_rounds or inc_config.get('rounds', 20)
+        if drift_threshold is None:
+            drift_threshold = inc_config.get('drift_threshold', 0.5)
+        max_updates = inc_config.get('max_updates', 10)
+        
+        # Filigrandan sonraki barlar
+        if self.data_watermark is not None and isinstance(X.index, pd.DatetimeIndex):
+            new_mask = X.index > self.data_watermark
+        else:
+            logger.warning("Model dosyasında veri filigranı yok, tam yeniden eğitim yapılacak")
+            new_mask = np.ones(len(X), dtype=bool)
+        
+        n_new = int(new_mask.sum())
+        if n_new == 0:
+            logger.info("Filigrandan sonra yeni bar yok, güncelleme atlandı")
+            return {'mode': 'skipped', 'new_rows': 0, 'watermark': self.data_watermark}
+        
+        X_new, y_new = X[new_mask], y[new_mask]
+        drift = self.calculate_drift(X_new)
+        
+        # Eski modelin yeni barlardaki (örneklem dışı) başarısı
+        pre_update_accuracy = float(accuracy_score(y_new, self.model.predict(self.scaler.transform(X_new))))
+        
+        if self.data_watermark is None or drift > drift_threshold or len(self.update_history) >= max_updates:
+            reason = ('filigran yok' if self.data_watermark is None
+                      else f'sapma {drift:.3f} > {drift_threshold}' if drift > drift_threshold
+                      else f'{max_updates} artımlı güncelleme sınırı')
+            logger.info(f"Tam yeniden eğitim: {reason}")
+            if not allow_refit:
+                return {
+                    'mode': 'refit_required',
+                    'reason': reason,
+                    'new_rows': n_new,
+                    'drift': drift,
+                    'pre_update_accuracy': pre_update_accuracy,
+                    'watermark': self.data_watermark
+                }
+            results = self.train_model(X, y)
+            return {
+                'mode': 'refit',
+                'reason': reason,
+                'new_rows': n_new,
+                'drift': drift,
+                'pre_update_accuracy': pre_update_accuracy,
+                'training_time': results['training_time'],
+                'test_metrics': results['test_metrics'],
+                'watermark': self.data_watermark
+            }
+        
+        # Son pencere: yeni barlar + bağlam için önceki barlar
+        X_recent = X.iloc[-max(window, n_new):]
+        y_recent = y.iloc[-max(window, n_new):]
+        X_recent_scaled = self.scaler.transform(X_recent)
+        
+        params = self.model.get_params()
+        params['n_estimators'] = n_rounds
+        params['n_jobs'] = self.resources['n_jobs']
+        rounds_before = self.model.get_booster().num_boosted_rounds()
+        
+        fit_start = time.perf_counter()
+        updated_model = xgb.XGBClassifier(**params)
+        updated_model.fit(X_recent_scaled, y_recent, xgb_model=self.model.get_booster())
+        training_time = time.perf_counter() - fit_start
+        
+        self.model = updated_model
+        self.data_watermark = self._get_watermark(X)
+        self.explanations = self.compute_explanations(X_recent_scaled)
+        
+        record = {
+            'updated_at': datetime.now().isoformat(),
+            'new_rows': n_new,
+            'window_rows': len(X_recent),
+            'rounds_added': n_rounds,
+            'total_rounds': rounds_before + n_rounds,
+            'drift': drift,
+            'pre_update_accuracy': pre_update_accuracy,
+            'watermark': str(self.data_watermark)
+        }
+        self.update_history.append(record)
+        
+        logger.info(f"Artımlı güncelleme: {n_new} yeni bar, +{n_rounds} tur "
+                   f"(toplam {record['total_rounds']}), sapma {drift:.3f}, süre {training_time:.2f} sn")
+        
+        return {
+            'mode': 'incremental',
+            'new_rows': n_new,
+            'drift': drift,
+            'pre_update_accuracy': pre_update_accuracy,
+            'rounds_added': n_rounds,
+            'total_rounds': record['total_rounds'],
+            'training_time': training_time,
+            'watermark': self.data_watermark
+        }
+    
+    def tune_hyperparameters(self, X_train: np.ndarray, y_train, base_params: Dict) -> Dict:
+        """
+        Eğitim seti üzerinde hiperparametre araması yapar ve sonucu modele iliştirir
+        
+        Args:
+            X_train: Ölçeklenmiş eğitim özellikleri (zaman sıralı)
+            y_train: Eğitim hedefi
+            base_params: Temel XGBoost parametreleri (ilk deneme = mevcut ayarlar)
+            
+        Returns:
+            Arama sonucu (best_params, best_score, trials ...)
+        """
+        from hyperparam_search import HyperparameterSearch
+        
+        search = HyperparameterSearch(self.config)
+        result = search.search(X_train, y_train, base_params, gap=get_prediction_horizon(self.config))
+        
+        # Model dosyasına kaydedilecek özet (deneme listesi hariç)
+        self.tuned_params = {
+            'params': result['best_params'],
+            'val_logloss': result['best_score'],
+            'val_accuracy': result['best_accuracy'],
+            'baseline_logloss': result['baseline_score'],
+            'n_trials': result['n_trials'],
+            'n_pruned': result['n_pruned'],
+            'tuned_at': datetime.now().isoformat()
+        }
+        
+        return result
+    
+    def _build_xgb_params(self, volatility_config: Dict, scale_pos_weight: float = 1.0) -> Dict:
+        """
+        Volatilite konfigürasyonu ve eğitim kaynaklarından XGBoost parametrelerini oluşturur
+        
+        Args:
+            volatility_config: get_volatility_config çıktısı
+            scale_pos_weight: Sınıf dengesizliği ağırlığı
+            
+        Returns:
+            XGBClassifier parametreleri
+        """
+        return {
+            'objective': 'binary:logistic',
+            'eval_metric': 'logloss',
+            'max_depth': volatility_config.get('max_depth', 4),
+            'learning_rate': volatility_config.get('learning_rate', 0.05),
+            'n_estimators': volatility_config.get('n_estimators', 200),
+            'subsample': volatility_config.get('subsample', 0.7),
+            'colsample_bytree': volatility_config.get('colsample_bytree', 0.7),
+            'min_child_weight': volatility_config.get('min_child_weight', 5),
+            'reg_alpha': volatility_config.get('reg_alpha', 0.1),
+            'reg_lambda': volatility_config.get('reg_lambda', 0.1),
+            'scale_pos_weight': scale_pos_weight,  # Class imbalance için
+            'random_state': 42,
+            # Kaynak ayarları: TRAINING_RESOURCES bölümünden (thread bütçesi paylaşılır)
+            'n_jobs': self.resources['n_jobs'],
+            'tree_method': self.resources['tree_method'],
+            'max_bin': self.resources['max_bin']
+        }
+    
+    def walk_forward_evaluate(self, X: pd.DataFrame, y: pd.Series, n_splits: int = None,
+                              mode: str = None, window: int = None, test_size: int = None,
+                              gap: int = None, max_workers: int = None) -> Dict:
+        """
+        Walk-forward (ileriye kayan) çapraz doğrulama yapar
+        
+        Özellikler bir kez ölçeklenip float32 ortak diziye çevrilir; katlar bu dizinin
+        slice görünümleri üzerinde paralel eğitilir. Eğitilen modeller saklanmaz,
+        self.model değişmez.
+        
+        Args:
+            X: Özellik matrisi
+            y: Hedef değişken
+            n_splits: Kat sayısı (None = config)
+            mode: 'expanding' veya 'rolling' (None = config)
+            window: Rolling modda eğitim penceresi (bar)
+            test_size: Kat başına test uzunluğu (bar)
+            gap: Arındırma boşluğu (None = tahmin ufku)
+            max_workers: Paralel kat sayısı (None = thread bütçesine göre)
+            
+        Returns:
+            Kat bazlı ve özet metrikler
+        """
+        wf_config = self.config.get('MODEL_CONFIG', {}).get('WALK_FORWARD', {}) or {}
+        n_splits = n_splits or wf_config.get('n_splits', 5)
+        mode = mode or wf_config.get('mode', 'expanding')
+        window = window or wf_config.get('window')
+        test_size = test_size or wf_config.get('test_size')
+        if gap is None:
+            # Hedef prediction_horizon bar ileriye baktığı için aynı kadar boşluk bırak
+            gap = get_prediction_horizon(self.config)
+        
+        start = time.perf_counter()
+        splits = walk_forward_splits(len(X), n_splits, mode, window, test_size, gap)
+        
+        # Parametreler tüm veri için tek sefer belirlenir (katlar arası karşılaştırılabilir)
+        volatility_config = self.get_volatility_config(self.calculate_volatility(X))
+        
+        # Tek ortak ölçeklenmiş dizi - ağaç modelleri monoton ölçeklemeden etkilenmez
+        X_shared = np.ascontiguousarray(StandardScaler().fit_transform(X), dtype=np.float32)
+        y_shared = np.asarray(y, dtype=np.int32)
+        
+        if max_workers is None:
+            max_workers = min(len(splits), self.resources['n_jobs'])
+        max_workers = max(1, max_workers)
+        fold_threads = max(1, self.resources['n_jobs'] // max_workers)
+        
+        def _run_fold(fold_no: int, train_slice: slice, test_slice: slice) -> Dict:
+            y_train = y_shared[train_slice]
+            positives = int(y_train.sum())
+            negatives = len(y_train) - positives
+            scale_pos_weight = negatives / positives if positives > 0 and negatives > 0 else 1.0
+            
+            params = self._build_xgb_params(volatility_config, scale_pos_weight)
+            params['n_jobs'] = fold_threads
+            
+            model = xgb.XGBClassifier(**params)
+            model.fit(X_shared[train_slice], y_train)
+            
+            y_test = y_shared[test_slice]
+            y_pred = model.predict(X_shared[test_slice])
+            metrics = self._calculate_metrics(y_test, y_pred, f"Walk-forward kat {fold_no}")
+            
+            return {
+                'fold': fold_no,
+                'train_start': X.index[train_slice.start],
+                'train_end': X.index[train_slice.stop - 1],
+                'test_start': X.index[test_slice.start],
+                'test_end': X.index[test_slice.stop - 1],
+                'train_size': train_slice.stop - train_slice.start,
+                'test_size': test_slice.stop - test_slice.start,
+                'up_ratio': float(y_test.mean()) if len(y_test) > 0 else 0.0,
+                **metrics
+            }
+        
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(_run_fold, i + 1, train_slice, test_slice)
+                       for i, (train_slice, test_slice) in enumerate(splits)]
+            folds = sorted((f.result() for f in futures), key=lambda fold: fold['fold'])
+        
+        folds_df = pd.DataFrame(folds)
+        metric_names = ['accuracy', 'precision', 'recall', 'f1']
+        summary = {f'{m}_mean': float(folds_df[m].mean()) for m in metric_names}
+        summary.update({f'{m}_std': float(folds_df[m].std(ddof=0)) for m in metric_names})
+        
+        elapsed = time.perf_counter() - start
+        logger.info(f"Walk-forward ({mode}, {len(folds)} kat, gap={gap}): "
+                   f"accuracy {summary['accuracy_mean']:.4f} ± {summary['accuracy_std']:.4f}, "
+                   f"süre {elapsed:.2f} sn")
+        
+        return {
+            'folds': folds,
+            'summary': summary,
+            'mode': mode,
+            'gap': gap,
+            'n_splits': len(folds),
+            'elapsed': elapsed
+        }
+    
     def _calculate_metrics(self, y_true: pd.Series, y_pred: np.ndarray, set_name: str) -> Dict:
         """Metrikleri hesaplar"""
         metrics = {
@@ -238,8 +774,38 @@ class StockDirectionPredictor:
             
         return metrics
     
+    def compute_explanations(self, X_scaled: np.ndarray) -> Optional[Dict]:
+        """
+        Modelin global açıklamalarını hesaplar (eğitim/güncelleme sonunda bir kez)
+        
+        Referans örneklem olarak verilen matrisin son satırları kullanılır.
+        
+        Args:
+            X_scaled: Ölçeklenmiş özellik matrisi (zaman sıralı)
+            
+        Returns:
+            model_explain.build_explanations çıktısı (hata olursa None)
+        """
+        explain_config = self.config.get('MODEL_CONFIG', {}).get('EXPLANATIONS', {}) or {}
+        reference_rows = explain_config.get('reference_rows', 200)
+        
+        try:
+            return build_explanations(self.model, self.feature_columns, np.asarray(X_scaled)[-reference_rows:])
+        except Exception as e:
+            logger.warning(f"Model açıklamaları hesaplanamadı: {str(e)}")
+            return None
+    
     def _get_feature_importance(self) -> pd.DataFrame:
-        """Özellik önemini döndürür"""
+        """Özellik önemini döndürür (varsa eğitimde hesaplanan açıklamalardan)"""
+        if self.explanations:
+            importance = self.explanations['feature_importance']
+            mean_abs = self.explanations.get('mean_abs_contribution', {})
+            return pd.DataFrame({
+                'feature': list(importance),
+                'importance': list(importance.values()),
+                'mean_abs_contribution': [mean_abs.get(feature, 0.0) for feature in importance]
+            }).sort_values('importance', ascending=False)
+        
         if self.model is None:
             return pd.DataFrame()
         
@@ -247,16 +813,10 @@ class StockDirectionPredictor:
         feature_names = self.feature_columns[:len(self.model.feature_importances_)]
         importances = self.model.feature_importances_[:len(self.feature_columns)]
             
-        importance_df = pd.DataFrame({
+        return pd.DataFrame({
             'feature': feature_names,
             'importance': importances
         }).sort_values('importance', ascending=False)
-        
-        logger.info("En önemli 10 özellik:")
-        for _, row in importance_df.head(10).iterrows():
-            logger.info(f"  {row['feature']}: {row['importance']:.4f}")
-            
-        return importance_df
     
     def predict(self, X: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
         """
@@ -277,12 +837,17 @@ class StockDirectionPredictor:
         
         return predictions, probabilities
     
-    def save_model(self, filename: str = None) -> str:
+    def save_model(self, filename: str = None, artifact_format: str = None) -> str:
         """
         Modeli kaydeder
         
+        Native formatta booster XGBoost UBJ, scaler NumPy sidecar'ı olarak yazılır ve
+        dosya yolu olarak manifest (.manifest.json) döndürülür. .joblib uzantılı dosya
+        adları native formatta otomatik çevrilir.
+        
         Args:
             filename: Dosya adı (opsiyonel)
+            artifact_format: "native" veya "joblib" (None = MODEL_CONFIG.artifact_format)
             
         Returns:
             Kaydedilen dosya yolu
@@ -295,17 +860,54 @@ class StockDirectionPredictor:
             filename = f"stock_predictor_{timestamp}.joblib"
             
         filepath = os.path.join(self.model_dir, filename)
+        model_config = self.config.get('MODEL_CONFIG', {})
+        artifact_format = artifact_format or model_config.get('artifact_format', 'native')
+        timestamp = datetime.now()
         
-        # Model, scaler ve feature columns'ı kaydet
-        model_data = {
-            'model': self.model,
-            'scaler': self.scaler,
-            'feature_columns': self.feature_columns,
-            'config': self.config,
-            'timestamp': datetime.now()
-        }
+        if artifact_format == 'native':
+            filepath = save_native(filepath, self.model, self.scaler, self.feature_columns, {
+                'tuned_params': self.tuned_params,
+                'data_watermark': self.data_watermark,
+                'update_history': self.update_history,
+                'metrics': self.metrics,
+                'symbol_categories': self.symbol_categories,
+                'explanations': self.explanations,
+                'timestamp': timestamp,
+                'model_config': model_config
+            })
+        else:
+            # Model, scaler ve feature columns'ı kaydet
+            model_data = {
+                'model': self.model,
+                'scaler': self.scaler,
+                'feature_columns': self.feature_columns,
+                'config': self.config,
+                'tuned_params': self.tuned_params,
+                'data_watermark': self.data_watermark,
+                'update_history': self.update_history,
+                'metrics': self.metrics,
+                'symbol_categories': self.symbol_categories,
+                'explanations': self.explanations,
+                'timestamp': timestamp
+            }
+            
+            # Yarım yazılmış dosya okunmasın: önce geçici dosyaya yaz, sonra yer değiştir
+            tmp_path = f"{filepath}.tmp"
+            joblib.dump(model_data, tmp_path)
+            os.replace(tmp_path, filepath)
+        
+        try:
+            get_model_registry(self.model_dir).register(
+                filepath,
+                horizon=model_config.get('investment_horizon'),
+                interval=model_config.get('interval'),
+                created_at=timestamp.isoformat(),
+                data_watermark=self.data_watermark,
+                metrics=self.metrics
+            )
+        except Exception as e:
+            logger.warning(f"Model kayıt defterine eklenemedi: {str(e)}")
         
-        joblib.dump(model_data, filepath)
         logger.info(f"Model kaydedildi: {filepath}")
         
         return filepath
@@ -314,6 +916,9 @@ class StockDirectionPredictor:
         """
         Modeli yükler
         
+        Native artefaktta (.manifest.json) booster ilk tahminde yüklenir; eski
+        .joblib dosyaları da okunur.
+        
         Args:
             filepath: Model dosya yolu
             
@@ -321,11 +926,24 @@ class StockDirectionPredictor:
             Yükleme başarılı mı
         """
         try:
-            model_data = joblib.load(filepath)
+            # Süreç genelindeki önbellekten (aynı dosya tekrar diskten okunmaz)
+            artifact = get_model_cache(self.config).get(filepath)
             
-            self.model = model_data['model']
-            self.scaler = model_data['scaler']
-            self.feature_columns = model_data['feature_columns']
+            if artifact.is_model_loaded:
+                self.model = artifact.get_model()
+            else:
+                self._model = None
+                self._artifact = artifact
+            # Scaler kopyalanır: yeniden eğitim önbellekteki artefaktın scaler'ını bozmasın
+            self.scaler = copy.deepcopy(artifact.scaler)
+            self.feature_columns = artifact.feature_columns
+            self.tuned_params = artifact.metadata.get('tuned_params')
+            self.data_watermark = artifact.metadata.get('data_watermark')
+            # Önbellekteki nesneler paylaşılır; değiştirilen listeler kopyalanır
+            self.update_history = list(artifact.metadata.get('update_history', []))
+            self.metrics = dict(artifact.metadata.get('metrics', {}))
+            self.symbol_categories = artifact.metadata.get('symbol_categories')
+            self.explanations = artifact.metadata.get('explanations')
             
             logger.info(f"Model yüklendi: {filepath}")
             return True
@@ -0,0 +1,303 @@
+"""
+Backtest Parametre Taraması
+Stop loss, take profit, güven eşiği ve pozisyon büyüklüğü kombinasyonlarını backtest çekirdeğinde paralel dener
+"""
+
+import os
+import itertools
+import logging
+import concurrent.futures
+from datetime import datetime
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from backtest import Backtester
+from backtest_kernel import run_kernel, trade_arrays, prediction_codes, day_numbers, ACTION_BUY, ACTION_SELL
+from performance_metrics import (TRADE_DTYPE, equity_metrics, trade_metrics, pair_round_trips,
+                                 infer_periods_per_year, epoch_ns)
+
+logger = logging.getLogger(__name__)
+
+# Taranabilen strateji parametreleri
+SWEEP_PARAMETERS = ['stop_loss_pct', 'take_profit_pct', 'confidence_threshold',
+                    'max_position_size', 'max_daily_trades']
+
+# Sıralama tablosu kolonları
+METRIC_COLUMNS = ['total_return', 'sharpe_ratio', 'sortino_ratio', 'max_drawdown',
+                  'total_trades', 'win_rate', 'profit_factor']
+
+def parse_grid_args(values: List[str]) -> Dict[str, List]:
+    """
+    CLI grid argümanlarını çözer: "stop_loss_pct=0.03,0.05,0.08"
+
+    Returns:
+        Parametre -> değer listesi
+    """
+    grid = {}
+    for value in values or []:
+        name, _, items = value.partition('=')
+        if name not in SWEEP_PARAMETERS or not items:
+            raise ValueError(f"Geçersiz grid parametresi: {value}")
+        grid[name] = [_parse_number(item) for item in items.split(',')]
+    return grid
+
+def parse_random_args(values: List[str]) -> Dict[str, List]:
+    """
+    CLI rastgele aralık argümanlarını çözer: "take_profit_pct=0.05:0.20" veya "...=0.01:0.1:log"
+
+    Returns:
+        Parametre -> [alt, üst] veya [alt, üst, "log"]
+    """
+    ranges = {}
+    for value in values or []:
+        name, _, bounds = value.partition('=')
+        parts = bounds.split(':')
+        if name not in SWEEP_PARAMETERS or len(parts) not in (2, 3):
+            raise ValueError(f"Geçersiz aralık parametresi: {value}")
+        ranges[name] = [_parse_number(parts[0]), _parse_number(parts[1])] + parts[2:]
+    return ranges
+
+def _parse_number(text: str):
+    text = text.strip()
+    return int(text) if text.lstrip('-').isdigit() else float(text)
+
+def summarize_kernel_result(result: Dict[str, np.ndarray], prices: np.ndarray, times: np.ndarray,
+                            initial_capital: float, max_position_size: float, commission_rate: float,
+                            slippage_rate: float, periods_per_year: float) -> Dict:
+    """
+    Çekirdek çıktısından Backtester ile aynı tanımlı özet metrikler
+
+    Gerçekleşen olaylar TRADE_DTYPE dizisine çevrilip ortak metrik modülünden geçirilir.
+    Açık kalan pozisyon Backtester'daki gibi son fiyattan 0.5 güvenle kapatılır.
+    """
+    capital = result['capital'][-1]
+
+    executed = (result['event_action'] == ACTION_BUY) | (result['event_action'] == ACTION_SELL)
+    bars = result['event_bar'][executed]
+    close_open = result['position'][-1] > 0
+
+    trades = np.zeros(len(bars) + int(close_open), dtype=TRADE_DTYPE)
+    trades['time'][:len(bars)] = times[bars]
+    trades['action'][:len(bars)] = result['event_action'][executed] == ACTION_BUY
+    trades['price'][:len(bars)] = prices[bars]
+    trades['quantity'][:len(bars)] = result['quantity'][bars]
+    trades['costs'][:len(bars)] = result['costs'][bars]
+
+    if close_open:
+        _, quantity, costs = trade_arrays(prices[-1:], np.array([0.5]), initial_capital * max_position_size,
+                                          commission_rate, slippage_rate)
+        capital = capital + (quantity[0] * prices[-1]) - costs[0]
+        trades[-1] = (times[-1], 0, 0, prices[-1], quantity[0], 0.0, costs[0], 0.5, capital)
+
+    metrics = equity_metrics(result['equity'], initial_capital, periods_per_year, result['position_value'])
+    metrics.update(trade_metrics(trades, pair_round_trips(trades, times)))
+
+    row = {name: float(metrics[name]) for name in METRIC_COLUMNS}
+    row['total_return'] = (capital - initial_capital) / initial_capital
+    row['total_trades'] = int(metrics['total_trades'])
+    row['final_capital'] = float(capital)
+    return row
+
+def _evaluate_combinations(inputs: Dict[str, np.ndarray], base_params: Dict, combinations: List[Dict]) -> List[Dict]:
+    """Worker: bir hissenin girdileri üzerinde kombinasyon grubunu çalıştırır"""
+    rows = []
+    for combination in combinations:
+        params = {**base_params, **combination}
+        result = run_kernel(inputs['close'], inputs['prediction'], inputs['confidence'], inputs['day'],
+                            params['initial_capital'], params['max_position_size'], params['stop_loss_pct'],
+                            params['take_profit_pct'], params['commission_rate'], params['slippage_rate'],
+                            params['confidence_threshold'], params['max_daily_trades'])
+        metrics = summarize_kernel_result(result, inputs['close'], inputs['time'], params['initial_capital'],
+                                          params['max_position_size'], params['commission_rate'],
+                                          params['slippage_rate'], inputs['periods_per_year'])
+        rows.append({**{name: params[name] for name in SWEEP_PARAMETERS}, **metrics})
+    return rows
+
+class ParameterSweep:
+    def __init__(self, config: Dict):
+        """
+        Backtest parametre taraması
+
+        Args:
+            config: Sistem konfigürasyonu (BACKTEST_SWEEP bölümü)
+        """
+        self.config = config
+        sweep_config = config.get('BACKTEST_SWEEP', {}) or {}
+
+        self.grid = sweep_config.get('grid', {}) or {}
+        self.random_ranges = sweep_config.get('random', {}) or {}
+        self.n_samples = sweep_config.get('n_samples', 0)
+        self.seed = sweep_config.get('seed', 42)
+        self.max_workers = sweep_config.get('max_workers', 0) or os.cpu_count() or 1
+        self.executor_type = sweep_config.get('executor', 'process')
+        self.rank_by = sweep_config.get('rank_by', 'sharpe_ratio')
+        self.output_dir = sweep_config.get('output_dir', 'logs/sweeps')
+
+        if self.rank_by not in METRIC_COLUMNS:
+            raise ValueError(f"Geçersiz sıralama metriği: {self.rank_by}")
+
+        # Hisse bazlı çekirdek girdileri ve temel (volatilite grubu) parametreleri
+        self.inputs = {}
+        self.base_params = {}
+        self.swept_parameters = []
+
+    def build_combinations(self, grid: Dict[str, List] = None, random_ranges: Dict[str, List] = None,
+                           n_samples: int = None) -> List[Dict]:
+        """
+        Grid kartezyen çarpımı ve/veya rastgele örneklenmiş kombinasyonlar
+
+        Rastgele örnekler grid kombinasyonlarının her birine eklenir; ikisi de boşsa
+        temel parametrelerle tek bir kombinasyon döner.
+        """
+        grid = self.grid if grid is None else grid
+        random_ranges = self.random_ranges if random_ranges is None else random_ranges
+        n_samples = self.n_samples if n_samples is None else n_samples
+
+        names = list(grid.keys())
+        grid_combinations = [dict(zip(names, values)) for values in itertools.product(*grid.values())]
+
+        if not random_ranges or n_samples <= 0:
+            return grid_combinations
+
+        rng = np.random.default_rng(self.seed)
+        combinations = []
+        for _ in range(n_samples):
+            sample = {}
+            for name, bounds in random_ranges.items():
+                low, high = bounds[0], bounds[1]
+                if len(bounds) > 2 and bounds[2] == 'log':
+                    sample[name] = float(np.exp(rng.uniform(np.log(low), np.log(high))))
+                elif isinstance(low, int) and isinstance(high, int):
+                    sample[name] = int(rng.integers(low, high + 1))
+                else:
+                    sample[name] = float(rng.uniform(low, high))
+            combinations.extend({**combination, **sample} for combination in grid_combinations)
+
+        return combinations
+
+    def add_symbol(self, features_df: pd.DataFrame, predictions: np.ndarray,
+                   probabilities: np.ndarray, symbol: str) -> None:
+        """
+        Hissenin tahminlerini taramaya ekler (tahminler hisse başına bir kez hesaplanır)
+
+        Temel parametreler Backtester.run_backtest ile aynı şekilde volatilite grubundan alınır;
+        kombinasyonda verilmeyen parametreler bunlarla doldurulur.
+        """
+        backtester = Backtester(self.config)
+        returns = features_df['close'].pct_change().dropna()
+        volatility = returns.std() * np.sqrt(252)  # Yıllık volatilite
+        confidence_threshold = backtester.calculate_dynamic_confidence_threshold(symbol, volatility)
+
+        n = len(features_df)
+        self.inputs[symbol] = {
+            'close': features_df['close'].to_numpy(dtype=np.float64),
+            'prediction': prediction_codes(predictions[:n]),
+            'confidence': np.max(probabilities, axis=1)[:n].astype(np.float64),
+            'day': day_numbers(features_df.index),
+            'time': epoch_ns(features_df.index),
+            'periods_per_year': infer_periods_per_year(features_df.index)
+        }
+        self.base_params[symbol] = {
+            'initial_capital': backtester.initial_capital,
+            'commission_rate': backtester.commission_rate,
+            'slippage_rate': backtester.slippage_rate,
+            'stop_loss_pct': backtester.stop_loss_pct,
+            'take_profit_pct': backtester.take_profit_pct,
+            'confidence_threshold': confidence_threshold,
+            'max_position_size': backtester.max_position_size,
+            'max_daily_trades': backtester.max_daily_trades
+        }
+
+    def _create_executor(self, max_workers: int) -> concurrent.futures.Executor:
+        if self.executor_type == 'thread' or max_workers == 1:
+            return concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+        return concurrent.futures.ProcessPoolExecutor(max_workers=max_workers)
+
+    def run(self, combinations: List[Dict] = None) -> pd.DataFrame:
+        """
+        Tüm hisse x kombinasyonları worker havuzunda çalıştırır
+
+        Returns:
+            Hisse bazında rank_by metriğine göre sıralı sonuç tablosu (rank kolonu hisse içi sıradır)
+        """
+        if not self.inputs:
+            logger.warning("Taranacak hisse yok")
+            return pd.DataFrame()
+
+        if combinations is None:
+            combinations = self.build_combinations()
+        if not combinations:
+            combinations = [{}]
+
+        swept = set()
+        for combination in combinations:
+            unknown = set(combination) - set(SWEEP_PARAMETERS)
+            if unknown:
+                raise ValueError(f"Bilinmeyen tarama parametresi: {sorted(unknown)}")
+            swept.update(combination)
+        self.swept_parameters = [name for name in SWEEP_PARAMETERS if name in swept]
+
+        # Kombinasyonlar worker başına birkaç gruba bölünür (girdiler grup başına bir kez gönderilir)
+        total_tasks = len(self.inputs) * len(combinations)
+        max_workers = max(1, min(self.max_workers, total_tasks))
+        chunk_size = max(1, int(np.ceil(len(combinations) * len(self.inputs) / (max_workers * 4))))
+
+        logger.info(f"Parametre taraması: {len(self.inputs)} hisse x {len(combinations)} kombinasyon, "
+                    f"{max_workers} worker")
+
+        rows = []
+        with self._create_executor(max_workers) as executor:
+            futures = {}
+            for symbol, inputs in self.inputs.items():
+                for start in range(0, len(combinations), chunk_size):
+                    chunk = combinations[start:start + chunk_size]
+                    future = executor.submit(_evaluate_combinations, inputs, self.base_params[symbol], chunk)
+                    futures[future] = (symbol, start)
+
+            for future in concurrent.futures.as_completed(futures):
+                symbol, start = futures[future]
+                for offset, row in enumerate(future.result()):
+                    rows.append({'symbol': symbol, 'combination_id': start + offset, **row})
+
+        results = pd.DataFrame(rows)
+        results = results.sort_values(['symbol', self.rank_by, 'combination_id'],
+                                      ascending=[True, False, True]).reset_index(drop=True)
+        results['rank'] = results.groupby('symbol').cumcount() + 1
+        return results
+
+    def summarize(self, results: pd.DataFrame) -> pd.DataFrame:
+        """
+        Kombinasyon bazında hisseler arası ortalama metrikler (rank_by'a göre sıralı)
+
+        Yalnızca taranan parametreler yer alır; diğerleri hisseden hisseye (volatilite grubu) değişir.
+        """
+        if results.empty:
+            return results
+        summary = results.groupby('combination_id').agg(
+            {**{name: 'first' for name in self.swept_parameters}, **{name: 'mean' for name in METRIC_COLUMNS}}
+        )
+        summary['n_symbols'] = results.groupby('combination_id').size()
+        return summary.sort_values(self.rank_by, ascending=False).reset_index()
+
+    def save_results(self, results: pd.DataFrame, path: str = None) -> str:
+        """
+        Sonuç tablosunu kolonlu formatta yazar (parquet; pyarrow yoksa csv)
+
+        Returns:
+            Yazılan dosya yolu
+        """
+        if path is None:
+            os.makedirs(self.output_dir, exist_ok=True)
+            path = os.path.join(self.output_dir, f"sweep_{datetime.now().strftime('%Y%m%d_%H%M%S')}.parquet")
+
+        try:
+            results.to_parquet(path, index=False)
+        except ImportError:
+            path = os.path.splitext(path)[0] + '.csv'
+            results.to_csv(path, index=False)
+            logger.warning(f"Parquet desteği yok, csv yazıldı: {path}")
+
+        logger.info(f"Tarama sonuçları kaydedildi: {path}")
+        return path
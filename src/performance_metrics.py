@@ -0,0 +1,316 @@
+"""
+Performans Metrikleri
+Equity ve işlem bazlı metriklerin tek geçişte vektörel hesabı (backtest, tarama ve portföy raporları ortak kullanır)
+"""
+
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+TRADING_DAYS_PER_YEAR = 252
+
+# İşlem kayıtlarının yapılandırılmış dizi tipi
+TRADE_DTYPE = np.dtype([
+    ('time', 'i8'),        # İşlem zamanı (epoch ns)
+    ('symbol', 'i4'),      # Hisse kodu (symbols listesindeki sıra)
+    ('action', 'i1'),      # 1 = alış, 0 = satış
+    ('price', 'f8'),
+    ('quantity', 'f8'),
+    ('position_size', 'f8'),
+    ('costs', 'f8'),
+    ('confidence', 'f8'),
+    ('capital_after', 'f8')
+])
+
+# Tamamlanmış alış-satış çiftlerinin (round trip) tipi
+ROUND_TRIP_DTYPE = np.dtype([
+    ('symbol', 'i4'),
+    ('entry_time', 'i8'),
+    ('exit_time', 'i8'),
+    ('entry_price', 'f8'),
+    ('exit_price', 'f8'),
+    ('quantity', 'f8'),
+    ('pnl', 'f8'),         # Alış miktarı x fiyat farkı - iki bacağın maliyeti
+    ('return', 'f8'),      # Fiyat getirisi (çıkış / giriş - 1)
+    ('holding_bars', 'i8')
+])
+
+def epoch_ns(dates) -> np.ndarray:
+    """Tarihleri epoch nanosaniyeye çevirir (indeks çözünürlüğü ms/us olabilir)"""
+    return pd.DatetimeIndex(dates).as_unit('ns').asi8
+
+def infer_periods_per_year(dates: pd.DatetimeIndex) -> float:
+    """
+    Bar aralığından yıllık periyot sayısı
+
+    Gün içi verilerde işlem günü başına medyan bar sayısı x 252; günlük veride 252,
+    haftalık veride 52.
+    """
+    if len(dates) < 2:
+        return float(TRADING_DAYS_PER_YEAR)
+
+    spacing = np.median(np.diff(epoch_ns(dates))) / 1e9 / 86400
+    _, bars_per_day = np.unique(epoch_ns(dates.normalize()), return_counts=True)
+    return periods_per_year_from_spacing(spacing, bars_per_day)
+
+def periods_per_year_from_spacing(spacing_days: float, bars_per_day: np.ndarray) -> float:
+    """Medyan bar aralığı (gün) ve gün başına bar sayılarından yıllık periyot sayısı"""
+    if spacing_days >= 5:
+        return 52.0
+    if spacing_days >= 1:
+        return float(TRADING_DAYS_PER_YEAR)
+    return float(TRADING_DAYS_PER_YEAR * np.median(bars_per_day))
+
+def trades_to_array(trades: List[Dict], symbols: Optional[List[str]] = None) -> np.ndarray:
+    """
+    İşlem dict listesini TRADE_DTYPE yapılandırılmış diziye çevirir
+
+    Args:
+        trades: Backtester / PortfolioBacktester işlem kayıtları
+        symbols: Hisse sırası (None = işlemlerde görülme sırası)
+    """
+    array = np.zeros(len(trades), dtype=TRADE_DTYPE)
+    if not trades:
+        return array
+
+    frame = pd.DataFrame(trades)
+    codes, uniques = pd.factorize(frame['symbol'])
+    if symbols is not None:
+        positions = {symbol: i for i, symbol in enumerate(symbols)}
+        codes = np.array([positions[symbol] for symbol in uniques])[codes]
+
+    array['time'] = epoch_ns(frame['date'])
+    array['symbol'] = codes
+    array['action'] = (frame['action'] == 'buy').to_numpy()
+    for name in ('price', 'quantity', 'position_size', 'costs', 'confidence', 'capital_after'):
+        if name in frame.columns:
+            array[name] = frame[name].to_numpy(dtype=np.float64)
+    return array
+
+def pair_round_trips(trades: np.ndarray, bar_times: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Alışları aynı hissenin bir sonraki satışıyla eşler (vektörel)
+
+    Args:
+        trades: TRADE_DTYPE dizisi (zaman sıralı)
+        bar_times: Equity eğrisinin bar zamanları (epoch ns) - tutma süresi bar cinsinden
+
+    Returns:
+        ROUND_TRIP_DTYPE dizisi (çıkış sırasıyla)
+    """
+    if len(trades) < 2:
+        return np.zeros(0, dtype=ROUND_TRIP_DTYPE)
+
+    # Hisse içinde zaman sırası korunarak gruplanır; ardışık alış -> satış bir çifttir
+    order = np.lexsort((np.arange(len(trades)), trades['symbol']))
+    ordered = trades[order]
+    is_pair = ((ordered['action'][:-1] == 1) & (ordered['action'][1:] == 0)
+               & (ordered['symbol'][:-1] == ordered['symbol'][1:]))
+    entries = ordered[:-1][is_pair]
+    exits = ordered[1:][is_pair]
+
+    trips = np.zeros(len(entries), dtype=ROUND_TRIP_DTYPE)
+    trips['symbol'] = entries['symbol']
+    trips['entry_time'] = entries['time']
+    trips['exit_time'] = exits['time']
+    trips['entry_price'] = entries['price']
+    trips['exit_price'] = exits['price']
+    trips['quantity'] = entries['quantity']
+    trips['pnl'] = entries['quantity'] * (exits['price'] - entries['price']) - entries['costs'] - exits['costs']
+    trips['return'] = exits['price'] / entries['price'] - 1
+    if bar_times is not None:
+        trips['holding_bars'] = (np.searchsorted(bar_times, exits['time'])
+                                 - np.searchsorted(bar_times, entries['time']))
+
+    return trips[np.argsort(trips['exit_time'], kind='stable')]
+
+def drawdown_series(equity: np.ndarray) -> np.ndarray:
+    """Equity eğrisinin zirveden düşüş oranı (0 veya negatif)"""
+    equity = np.asarray(equity, dtype=np.float64)
+    running_max = np.maximum.accumulate(equity)
+    return (equity - running_max) / running_max
+
+def equity_metrics(equity: np.ndarray, initial_capital: float, periods_per_year: float,
+                   position_value: Optional[np.ndarray] = None) -> Dict:
+    """
+    Equity eğrisi metrikleri
+
+    Returns:
+        total_return, annualized_return (CAGR), sharpe_ratio, sortino_ratio, max_drawdown,
+        max_drawdown_duration (bar), volatility, exposure
+    """
+    equity = np.asarray(equity, dtype=np.float64)
+    n = len(equity)
+    total_return = (equity[-1] - initial_capital) / initial_capital if n else 0.0
+
+    returns = equity[1:] / equity[:-1] - 1 if n > 1 else np.zeros(0)
+    returns = returns[~np.isnan(returns)]
+    std = returns.std(ddof=1) if len(returns) > 1 else 0.0
+    sharpe_ratio = returns.mean() / std * np.sqrt(periods_per_year) if std > 0 else 0
+
+    # Sortino: yalnızca negatif getirilerin karesel ortalaması (hedef 0)
+    downside = np.sqrt(np.mean(np.minimum(returns, 0) ** 2)) if len(returns) else 0.0
+    sortino_ratio = returns.mean() / downside * np.sqrt(periods_per_year) if downside > 0 else 0
+
+    drawdown = drawdown_series(equity) if n else np.zeros(0)
+    max_drawdown = drawdown.min() if n else 0.0
+
+    # En uzun zirve altı süre (bar): her barın son zirveden uzaklığı
+    if n:
+        at_peak = drawdown >= 0
+        last_peak = np.maximum.accumulate(np.where(at_peak, np.arange(n), 0))
+        max_drawdown_duration = int((np.arange(n) - last_peak).max())
+    else:
+        max_drawdown_duration = 0
+
+    exposure = 0.0
+    if position_value is not None and n:
+        exposure = float(np.mean(np.asarray(position_value) > 0))
+
+    return {
+        'total_return': total_return,
+        'annualized_return': (1 + total_return) ** (periods_per_year / n) - 1 if n else 0.0,
+        'sharpe_ratio': sharpe_ratio,
+        'sortino_ratio': sortino_ratio,
+        'max_drawdown': max_drawdown,
+        'max_drawdown_duration': max_drawdown_duration,
+        'volatility': std * np.sqrt(periods_per_year),
+        'exposure': exposure,
+        'periods_per_year': periods_per_year
+    }
+
+class EquityMetricsAccumulator:
+    def __init__(self):
+        """
+        equity_metrics'in parça parça hesabı (akış backtest'i için)
+
+        Getiri ortalama/varyansı parçalar arasında birleştirilir; zirve, drawdown süresi ve
+        son equity taşınır. Bellek kullanımı parça boyutuyla sınırlıdır.
+        """
+        self.n = 0
+        self.last_equity = None
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.downside_sq = 0.0
+        self.peak = -np.inf
+        self.peak_index = 0
+        self.max_drawdown = 0.0
+        self.max_drawdown_duration = 0
+        self.invested = 0
+
+    def update(self, equity: np.ndarray, position_value: Optional[np.ndarray] = None) -> None:
+        equity = np.asarray(equity, dtype=np.float64)
+        size = len(equity)
+        if size == 0:
+            return
+
+        previous = equity if self.last_equity is None else np.concatenate([[self.last_equity], equity])
+        returns = previous[1:] / previous[:-1] - 1
+        returns = returns[~np.isnan(returns)]
+        if len(returns):
+            # Paralel varyans birleştirme (Chan): parça ortalaması ve karesel sapma toplamı
+            chunk_mean = returns.mean()
+            chunk_m2 = ((returns - chunk_mean) ** 2).sum()
+            total = self.count + len(returns)
+            delta = chunk_mean - self.mean
+            self.mean += delta * len(returns) / total
+            self.m2 += chunk_m2 + delta ** 2 * self.count * len(returns) / total
+            self.count = total
+            self.downside_sq += (np.minimum(returns, 0) ** 2).sum()
+
+        running_max = np.maximum.accumulate(np.concatenate([[self.peak], equity]))[1:]
+        drawdown = (equity - running_max) / running_max
+        self.max_drawdown = min(self.max_drawdown, drawdown.min())
+
+        index = self.n + np.arange(size)
+        last_peak = np.maximum(np.maximum.accumulate(np.where(drawdown >= 0, index, 0)), self.peak_index)
+        self.max_drawdown_duration = max(self.max_drawdown_duration, int((index - last_peak).max()))
+        self.peak_index = int(last_peak[-1])
+        self.peak = running_max[-1]
+
+        if position_value is not None:
+            self.invested += int((np.asarray(position_value) > 0).sum())
+        self.n += size
+        self.last_equity = equity[-1]
+
+    def result(self, initial_capital: float, periods_per_year: float) -> Dict:
+        """equity_metrics ile aynı anahtarlar"""
+        n = self.n
+        total_return = (self.last_equity - initial_capital) / initial_capital if n else 0.0
+        std = np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+        downside = np.sqrt(self.downside_sq / self.count) if self.count else 0.0
+
+        return {
+            'total_return': total_return,
+            'annualized_return': (1 + total_return) ** (periods_per_year / n) - 1 if n else 0.0,
+            'sharpe_ratio': self.mean / std * np.sqrt(periods_per_year) if std > 0 else 0,
+            'sortino_ratio': self.mean / downside * np.sqrt(periods_per_year) if downside > 0 else 0,
+            'max_drawdown': self.max_drawdown,
+            'max_drawdown_duration': self.max_drawdown_duration,
+            'volatility': std * np.sqrt(periods_per_year),
+            'exposure': self.invested / n if n else 0.0,
+            'periods_per_year': periods_per_year
+        }
+
+def trade_metrics(trades: np.ndarray, round_trips: np.ndarray) -> Dict:
+    """
+    İşlem bazlı metrikler
+
+    Returns:
+        win_rate (çıkış fiyatı girişten yüksek çiftler / satışlar), total_trades, round_trips,
+        profit_factor, avg_trade_pnl, avg_trade_duration (gün), avg_holding_bars
+    """
+    total_sells = int((trades['action'] == 0).sum())
+    wins = int((round_trips['exit_price'] > round_trips['entry_price']).sum())
+
+    gross_profit = round_trips['pnl'][round_trips['pnl'] > 0].sum()
+    gross_loss = -round_trips['pnl'][round_trips['pnl'] < 0].sum()
+    if gross_loss > 0:
+        profit_factor = gross_profit / gross_loss
+    else:
+        profit_factor = float('inf') if gross_profit > 0 else 0.0
+
+    has_trips = len(round_trips) > 0
+    durations = (round_trips['exit_time'] - round_trips['entry_time']) // 86_400_000_000_000
+
+    return {
+        'win_rate': wins / total_sells if total_sells > 0 else 0,
+        'total_trades': len(trades),
+        'round_trips': len(round_trips),
+        'profit_factor': float(profit_factor),
+        'avg_trade_pnl': float(round_trips['pnl'].mean()) if has_trips else 0.0,
+        'avg_trade_duration': float(durations.mean()) if has_trips else 0,
+        'avg_holding_bars': float(round_trips['holding_bars'].mean()) if has_trips else 0.0
+    }
+
+def compute_metrics(equity_df: pd.DataFrame, trades, initial_capital: float,
+                    periods_per_year: Optional[float] = None) -> Tuple[Dict, np.ndarray]:
+    """
+    Backtest sonucunun tüm performans metrikleri (tek geçiş)
+
+    Args:
+        equity_df: equity (ve varsa position_value) kolonlu, tarih indeksli DataFrame
+        trades: İşlem dict listesi veya TRADE_DTYPE dizisi
+        initial_capital: Başlangıç sermayesi
+        periods_per_year: Yıllıklandırma (None = bar aralığından)
+
+    Returns:
+        (metrik dict'i, ROUND_TRIP_DTYPE dizisi)
+    """
+    if periods_per_year is None:
+        periods_per_year = infer_periods_per_year(equity_df.index)
+
+    if not isinstance(trades, np.ndarray):
+        trades = trades_to_array(trades)
+
+    position_value = equity_df['position_value'].to_numpy() if 'position_value' in equity_df.columns else None
+    round_trips = pair_round_trips(trades, epoch_ns(equity_df.index))
+
+    metrics = equity_metrics(equity_df['equity'].to_numpy(), initial_capital, periods_per_year, position_value)
+    metrics.update(trade_metrics(trades, round_trips))
+    return metrics, round_trips
@@ -0,0 +1,344 @@
+"""
+Havuzlu (Pooled) Model Eğitimi
+Hisse başına özellik parçalarını diske yazar ve XGBoost'a iterator ile akıtarak tek model eğitir
+"""
+
+import os
+import time
+import shutil
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+logger = logging.getLogger(__name__)
+
+SYMBOL_FEATURE = 'symbol_id'
+
+# Bellek bütçesinin bir batch'in ham + ölçeklenmiş kopyasına ayrılan payı
+BATCH_BUDGET_SHARE = 0.25
+# Histogram indeksinin (quantile matris) bellekte tutulabileceği bütçe payı
+INDEX_BUDGET_SHARE = 0.5
+
+def normalize_symbol(symbol: str) -> str:
+    return symbol.replace('.IS', '')
+
+def encode_symbol(symbol: Optional[str], categories: List[str]) -> float:
+    """Hisse sembolünün kategorik kodu (listede yoksa NaN - XGBoost eksik değer yönüne gider)"""
+    if symbol is None:
+        return np.nan
+    symbol = normalize_symbol(symbol)
+    return float(categories.index(symbol)) if symbol in categories else np.nan
+
+class FeatureShardStore:
+    def __init__(self, shard_dir: str):
+        """
+        Hisse başına özellik parçaları (.npy, memory-map ile okunur)
+
+        Args:
+            shard_dir: Parçaların yazılacağı klasör
+        """
+        self.shard_dir = shard_dir
+        self.rows = {}  # sembol -> satır sayısı
+        os.makedirs(shard_dir, exist_ok=True)
+
+    def _path(self, symbol: str, part: str) -> str:
+        return os.path.join(self.shard_dir, f"{normalize_symbol(symbol)}_{part}.npy")
+
+    def write(self, symbol: str, X: np.ndarray, y: np.ndarray, index: np.ndarray) -> None:
+        np.save(self._path(symbol, 'X'), np.ascontiguousarray(X, dtype=np.float32))
+        np.save(self._path(symbol, 'y'), np.asarray(y, dtype=np.int8))
+        np.save(self._path(symbol, 'index'), np.asarray(index, dtype=np.int64))
+        self.rows[symbol] = len(X)
+
+    def read(self, symbol: str, start: int, stop: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Parçanın [start, stop) satırlarını okur (sadece bu satırlar belleğe alınır)"""
+        X = np.load(self._path(symbol, 'X'), mmap_mode='r')[start:stop]
+        y = np.load(self._path(symbol, 'y'), mmap_mode='r')[start:stop]
+        return np.array(X), np.array(y)
+
+    def read_batch(self, parts: List[Tuple[str, int, int]]) -> Tuple[np.ndarray, np.ndarray]:
+        blocks = [self.read(symbol, start, stop) for symbol, start, stop in parts]
+        return np.vstack([X for X, _ in blocks]), np.concatenate([y for _, y in blocks])
+
+    def cleanup(self) -> None:
+        shutil.rmtree(self.shard_dir, ignore_errors=True)
+
+def plan_batches(ranges: List[Tuple[str, int, int]], batch_rows: int) -> List[List[Tuple[str, int, int]]]:
+    """
+    Hisse aralıklarını en fazla batch_rows satırlık batch'lere böler
+
+    Küçük parçalar aynı batch'te birleştirilir, büyükler bölünür.
+    """
+    batches, current, current_rows = [], [], 0
+    for symbol, start, stop in ranges:
+        while start < stop:
+            take = min(stop - start, batch_rows - current_rows)
+            current.append((symbol, start, start + take))
+            current_rows += take
+            start += take
+            if current_rows == batch_rows:
+                batches.append(current)
+                current, current_rows = [], 0
+    if current:
+        batches.append(current)
+    return batches
+
+class ShardIterator(xgb.DataIter):
+    def __init__(self, store: FeatureShardStore, batches: List, mean: np.ndarray, scale: np.ndarray,
+                 feature_types: List[str], cache_prefix: Optional[str] = None):
+        """
+        Parçaları batch batch ölçekleyip XGBoost'a veren iterator
+
+        Args:
+            store: Özellik parçaları
+            batches: plan_batches çıktısı
+            mean, scale: StandardScaler parametreleri
+            feature_types: XGBoost özellik tipleri ('q' sayısal, 'c' kategorik)
+            cache_prefix: Harici bellek (external memory) önbellek yolu
+        """
+        self._store = store
+        self._batches = batches
+        self._mean = mean
+        self._scale = scale
+        self._feature_types = feature_types
+        self._position = 0
+        super().__init__(cache_prefix=cache_prefix, release_data=True)
+
+    def next(self, input_data) -> bool:
+        if self._position == len(self._batches):
+            return False
+        X, y = self._store.read_batch(self._batches[self._position])
+        X_scaled = ((X - self._mean) / self._scale).astype(np.float32)
+        input_data(data=X_scaled, label=y, feature_types=self._feature_types)
+        self._position += 1
+        return True
+
+    def reset(self) -> None:
+        self._position = 0
+
+class PooledTrainer:
+    def __init__(self, config: Dict, predictor, shard_dir: str = None):
+        """
+        Havuzlu eğitim: tüm hisselerin verisi belleğe alınmadan tek model
+
+        Hisseler add_symbol ile tek tek eklenir; her hissenin özellikleri diske yazılır,
+        scaler ve sınıf dağılımı akış halinde güncellenir. train() parçaları bellek
+        bütçesine göre boyutlanan batch'lerle XGBoost'a akıtır.
+
+        Args:
+            config: Sistem konfigürasyonu (POOLED_TRAINING bölümü)
+            predictor: StockDirectionPredictor (model, scaler ve metrikler buna yazılır)
+            shard_dir: Parça klasörü (None = config)
+        """
+        self.config = config
+        self.predictor = predictor
+        pooled_config = config.get('POOLED_TRAINING', {}) or {}
+
+        self.memory_budget_mb = pooled_config.get('memory_budget_mb', 1024)
+        self.symbol_feature = pooled_config.get('symbol_feature', True)
+        self.external_memory = pooled_config.get('external_memory', 'auto')
+        self.keep_shards = pooled_config.get('keep_shards', False)
+
+        run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        base_dir = shard_dir or pooled_config.get('shard_dir', 'data/shards')
+        self.store = FeatureShardStore(os.path.join(base_dir, f"run_{run_id}_{os.getpid()}"))
+
+        self.feature_columns = None
+        self.symbol_categories = []
+        self.test_size = 0.2
+        self._scaler = None
+        self._class_counts = np.zeros(2, dtype=np.int64)
+        self._returns_stats = np.zeros(3)  # n, toplam, kareler toplamı
+        self._watermark = None
+
+    def add_symbol(self, symbol: str, features_df: pd.DataFrame, test_size: float = 0.2) -> int:
+        """
+        Hissenin özelliklerini hazırlayıp diske yazar
+
+        Args:
+            symbol: Hisse sembolü
+            features_df: create_all_features çıktısı
+            test_size: Hisse başına test oranı (son barlar)
+
+        Returns:
+            Yazılan satır sayısı
+        """
+        from sklearn.preprocessing import StandardScaler
+
+        X, y = self.predictor.prepare_data(features_df)
+        if X.empty:
+            logger.warning(f"Havuza eklenecek veri yok: {symbol}")
+            return 0
+
+        # Kolon seti ilk hisseden belirlenir, diğerleri ona hizalanır
+        if self.feature_columns is None:
+            self.feature_columns = list(X.columns)
+            if self.symbol_feature:
+                self.feature_columns.append(SYMBOL_FEATURE)
+        X = X.reindex(columns=[col for col in self.feature_columns if col != SYMBOL_FEATURE], fill_value=0)
+
+        if self.symbol_feature:
+            self.symbol_categories.append(normalize_symbol(symbol))
+            X[SYMBOL_FEATURE] = float(len(self.symbol_categories) - 1)
+
+        X = X.astype(np.float32)
+        split_idx = int(len(X) * (1 - test_size))
+        self.test_size = test_size
+
+        # Akış halinde istatistikler (sadece eğitim kısmından)
+        if self._scaler is None:
+            self._scaler = StandardScaler()
+        self._scaler.partial_fit(X.iloc[:split_idx])
+        self._class_counts += np.bincount(y.iloc[:split_idx].astype(int), minlength=2)[:2]
+
+        if 'returns' in X.columns:
+            returns = X['returns'].iloc[:split_idx].dropna().to_numpy()
+            self._returns_stats += [len(returns), returns.sum(), np.square(returns).sum()]
+
+        watermark = self.predictor._get_watermark(X)
+        if watermark is not None and (self._watermark is None or watermark > self._watermark):
+            self._watermark = watermark
+
+        index = X.index.asi8 if isinstance(X.index, pd.DatetimeIndex) else np.arange(len(X))
+        self.store.write(symbol, X.to_numpy(), y.to_numpy(), index)
+        return len(X)
+
+    def _pooled_volatility(self) -> float:
+        n, total, total_sq = self._returns_stats
+        if n < 2:
+            return 0.3  # Varsayılan orta volatilite (calculate_volatility ile aynı)
+        variance = (total_sq - total * total / n) / (n - 1)
+        return float(np.sqrt(max(variance, 0.0)) * np.sqrt(252))
+
+    def _split_ranges(self) -> Tuple[List, List]:
+        train_ranges, test_ranges = [], []
+        for symbol, n_rows in self.store.rows.items():
+            split_idx = int(n_rows * (1 - self.test_size))
+            train_ranges.append((symbol, 0, split_idx))
+            test_ranges.append((symbol, split_idx, n_rows))
+        return train_ranges, test_ranges
+
+    def _use_external_memory(self, n_rows: int, max_bin: int) -> bool:
+        if self.external_memory != 'auto':
+            return bool(self.external_memory)
+        # Quantile matrisi satır x özellik başına 1 bayt (max_bin <= 256) tutar
+        index_bytes = n_rows * len(self.feature_columns) * (1 if max_bin <= 256 else 2)
+        return index_bytes > self.memory_budget_mb * 1024 * 1024 * INDEX_BUDGET_SHARE
+
+    def _reference_sample(self, ranges: List) -> np.ndarray:
+        """Açıklamalar için referans örneklem: her hissenin eğitim kısmının son satırları"""
+        explain_config = self.config.get('MODEL_CONFIG', {}).get('EXPLANATIONS', {}) or {}
+        per_symbol = max(1, explain_config.get('reference_rows', 200) // max(1, len(ranges)))
+        parts = [(symbol, max(start, stop - per_symbol), stop) for symbol, start, stop in ranges if stop > start]
+        X, _ = self.store.read_batch(parts)
+        return (X - self._scaler.mean_) / self._scaler.scale_
+
+    def _predict_ranges(self, model: xgb.XGBClassifier, ranges: List, batch_rows: int) -> Tuple[np.ndarray, np.ndarray]:
+        y_true, y_pred = [], []
+        for batch in plan_batches(ranges, batch_rows):
+            X, y = self.store.read_batch(batch)
+            y_true.append(y)
+            y_pred.append(model.predict((X - self._scaler.mean_) / self._scaler.scale_))
+        return np.concatenate(y_true), np.concatenate(y_pred)
+
+    def train(self) -> Optional[Dict]:
+        """
+        Parçalardan tek model eğitir
+
+        Returns:
+            StockDirectionPredictor.train_model ile aynı yapıda sonuçlar (+ 'pooled' bilgileri)
+        """
+        if not self.store.rows:
+            logger.error("Havuzlu eğitim için veri yok!")
+            return None
+
+        predictor = self.predictor
+        n_features = len(self.feature_columns)
+
+        # Hisse kimliği ölçeklenmez (kod değerleri korunur)
+        if self.symbol_feature:
+            self._scaler.mean_[-1], self._scaler.var_[-1], self._scaler.scale_[-1] = 0.0, 1.0, 1.0
+
+        volatility_config = predictor.get_volatility_config(self._pooled_volatility())
+        scale_pos_weight = self._class_counts[0] / self._class_counts[1] if self._class_counts[1] else 1.0
+        xgb_params = predictor._build_xgb_params(volatility_config, scale_pos_weight)
+        if self.symbol_feature:
+            xgb_params['enable_categorical'] = True
+
+        # Batch boyutu: ham (float32) + ölçeklenmiş kopya bütçe payına sığmalı
+        bytes_per_row = n_features * 8
+        batch_rows = max(256, int(self.memory_budget_mb * 1024 * 1024 * BATCH_BUDGET_SHARE / bytes_per_row))
+
+        train_ranges, test_ranges = self._split_ranges()
+        n_train = sum(stop - start for _, start, stop in train_ranges)
+        batches = plan_batches(train_ranges, batch_rows)
+        external = self._use_external_memory(n_train, xgb_params['max_bin'])
+        if external and not hasattr(xgb, 'ExtMemQuantileDMatrix'):
+            # ExtMemQuantileDMatrix XGBoost 3.0 ile geldi; 2.x'te histogram indeksi bellekte kurulur
+            logger.warning(f"XGBoost {xgb.__version__} harici bellek desteklemiyor (>= 3.0 gerekli), "
+                           f"histogram indeksi bellekte tutulacak")
+            external = False
+
+        feature_types = ['q'] * n_features
+        if self.symbol_feature:
+            feature_types[-1] = 'c'
+
+        logger.info(f"Havuzlu eğitim: {len(self.store.rows)} hisse, {n_train} satır, {len(batches)} batch "
+                   f"(batch başına {batch_rows} satır), harici bellek: {external}")
+
+        iterator = ShardIterator(self.store, batches, self._scaler.mean_, self._scaler.scale_, feature_types,
+                                 cache_prefix=os.path.join(self.store.shard_dir, 'xgb_cache') if external else None)
+        matrix_class = xgb.ExtMemQuantileDMatrix if external else xgb.QuantileDMatrix
+        dtrain = matrix_class(iterator, max_bin=xgb_params['max_bin'],
+                              enable_categorical=self.symbol_feature, nthread=xgb_params['n_jobs'])
+
+        model = xgb.XGBClassifier(**xgb_params)
+        fit_start = time.perf_counter()
+        booster = xgb.train(model.get_xgb_params(), dtrain, num_boost_round=model.n_estimators)
+        training_time = time.perf_counter() - fit_start
+        del dtrain
+
+        model.load_model(bytearray(booster.save_raw(raw_format='ubj')))
+
+        predictor.model = model
+        predictor.scaler = self._scaler
+        predictor.feature_columns = list(self.feature_columns)
+        predictor.symbol_categories = list(self.symbol_categories) if self.symbol_feature else None
+        predictor.data_watermark = self._watermark
+        predictor.update_history = []
+
+        logger.info(f"Eğitim süresi: {training_time:.2f} sn (n_jobs={xgb_params['n_jobs']}, "
+                   f"tree_method={xgb_params['tree_method']}, max_bin={xgb_params['max_bin']}, satır={n_train})")
+
+        y_train, y_pred_train = self._predict_ranges(model, train_ranges, batch_rows)
+        y_test, y_pred_test = self._predict_ranges(model, test_ranges, batch_rows)
+        train_metrics = predictor._calculate_metrics(pd.Series(y_train), y_pred_train, "Train")
+        test_metrics = predictor._calculate_metrics(pd.Series(y_test), y_pred_test, "Test")
+        predictor.metrics = test_metrics
+        predictor.explanations = predictor.compute_explanations(self._reference_sample(train_ranges))
+
+        return {
+            'train_metrics': train_metrics,
+            'test_metrics': test_metrics,
+            'feature_importance': predictor._get_feature_importance(),
+            'model_params': xgb_params,
+            'training_time': training_time,
+            'resources': dict(predictor.resources),
+            'tuning': None,
+            'pooled': {
+                'symbols': list(self.store.rows),
+                'rows': n_train,
+                'batches': len(batches),
+                'batch_rows': batch_rows,
+                'external_memory': external
+            }
+        }
+
+    def cleanup(self) -> None:
+        """Parça klasörünü siler (keep_shards kapalıysa)"""
+        if not self.keep_shards:
+            self.store.cleanup()
@@ -0,0 +1,316 @@
+"""
+Portföy Backtest
+Birden fazla hisseyi ortak sermaye, pozisyon sınırları ve hizalanmış takvim üzerinde birlikte test eder
+"""
+
+import logging
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backtest import Backtester
+from backtest_kernel import prediction_codes, day_numbers, EXIT_STOP_LOSS, EXIT_TAKE_PROFIT, EXIT_SIGNAL
+from performance_metrics import compute_metrics, trades_to_array
+
+logger = logging.getLogger(__name__)
+
+# Son bardaki açık pozisyonların kapanış nedeni
+EXIT_END_OF_DATA = 4
+
+EXIT_REASONS = {
+    EXIT_STOP_LOSS: 'stop_loss',
+    EXIT_TAKE_PROFIT: 'take_profit',
+    EXIT_SIGNAL: 'signal',
+    EXIT_END_OF_DATA: 'end_of_data'
+}
+
+class PortfolioBacktester:
+    def __init__(self, config: Dict):
+        """
+        Ortak sermayeli çoklu hisse backtest
+
+        Args:
+            config: Sistem konfigürasyonu (BACKTEST_CONFIG, RISK_MANAGEMENT, PORTFOLIO_BACKTEST bölümleri)
+        """
+        self.config = config
+        self.backtest_config = config.get('BACKTEST_CONFIG', {})
+        self.risk_config = config.get('RISK_MANAGEMENT', {})
+        portfolio_config = config.get('PORTFOLIO_BACKTEST', {}) or {}
+
+        self.initial_capital = self.backtest_config.get('initial_capital', 100000)
+        self.commission_rate = self.backtest_config.get('commission_rate', 0.0015)
+        self.slippage_rate = self.backtest_config.get('slippage_rate', 0.0005)
+
+        # Portföy geneli günlük işlem sınırı (0 = RISK_MANAGEMENT.max_daily_trades)
+        self.max_daily_trades = (portfolio_config.get('max_daily_trades', 0)
+                                 or self.risk_config.get('max_daily_trades', 5))
+        # Hisse bazlı risk parametreleri volatilite grubundan mı gelsin
+        self.use_volatility_buckets = portfolio_config.get('use_volatility_buckets', True)
+
+        self.symbols = []
+        self.panel = None
+        self.symbol_params = None
+        self.results = None
+
+    def build_panel(self, symbol_data: Dict[str, Tuple[pd.DataFrame, np.ndarray, np.ndarray]]) -> Dict:
+        """
+        Hisseleri ortak tarih eksenine hizalar
+
+        Args:
+            symbol_data: symbol -> (features_df, predictions, probabilities)
+
+        Returns:
+            dates, close (işlem fiyatı, bar yoksa NaN), valuation (ileri doldurulmuş fiyat),
+            prediction, confidence matrisleri ([bar, hisse]) ve day dizisi
+        """
+        closes, codes, confidences = {}, {}, {}
+        for symbol, (features_df, predictions, probabilities) in symbol_data.items():
+            n = len(features_df)
+            index = features_df.index
+            if getattr(index, 'tz', None) is not None:
+                index = index.tz_localize(None)
+            closes[symbol] = pd.Series(features_df['close'].to_numpy(dtype=np.float64), index=index)
+            codes[symbol] = pd.Series(prediction_codes(predictions[:n]), index=index)
+            confidences[symbol] = pd.Series(np.max(probabilities, axis=1)[:n], index=index)
+
+        close = pd.DataFrame(closes).sort_index()
+        self.symbols = list(close.columns)
+
+        self.panel = {
+            'dates': close.index,
+            'close': close.to_numpy(),
+            'valuation': close.ffill().fillna(0.0).to_numpy(),
+            'prediction': pd.DataFrame(codes).reindex(close.index).fillna(-1).to_numpy(dtype=np.int64),
+            'confidence': pd.DataFrame(confidences).reindex(close.index).fillna(0.0).to_numpy(),
+            'day': day_numbers(close.index)
+        }
+        return self.panel
+
+    def resolve_symbol_params(self, symbol_data: Dict[str, Tuple[pd.DataFrame, np.ndarray, np.ndarray]]) -> Dict:
+        """Hisse bazlı güven eşiği, stop loss, take profit ve pozisyon büyüklüğü dizileri"""
+        params = {name: np.empty(len(self.symbols)) for name in
+                  ('confidence_threshold', 'stop_loss_pct', 'take_profit_pct', 'max_position_size')}
+
+        for i, symbol in enumerate(self.symbols):
+            backtester = Backtester(self.config)
+            if self.use_volatility_buckets:
+                returns = symbol_data[symbol][0]['close'].pct_change().dropna()
+                volatility = returns.std() * np.sqrt(252)  # Yıllık volatilite
+                params['confidence_threshold'][i] = backtester.calculate_dynamic_confidence_threshold(symbol, volatility)
+            else:
+                params['confidence_threshold'][i] = 0.50
+            params['stop_loss_pct'][i] = backtester.stop_loss_pct
+            params['take_profit_pct'][i] = backtester.take_profit_pct
+            params['max_position_size'][i] = backtester.max_position_size
+
+        self.symbol_params = params
+        return params
+
+    def run_backtest(self, symbol_data: Dict[str, Tuple[pd.DataFrame, np.ndarray, np.ndarray]]) -> Dict:
+        """
+        Portföy backtest'i çalıştırır
+
+        Her barda önce tüm hisselerin çıkışları (stop loss, take profit, düşüş sinyali),
+        sonra güven skoruna göre sıralı girişler vektörel işlenir. Pozisyon büyüklüğü o anki
+        portföy değerinin max_position_size kadarıdır; girişler nakit ve günlük işlem
+        sınırıyla kısıtlanır.
+
+        Args:
+            symbol_data: symbol -> (features_df, predictions, probabilities)
+
+        Returns:
+            equity_curve, trades, symbol_summary, performance_metrics, final_capital, total_return
+        """
+        if not symbol_data:
+            logger.warning("Portföy backtest için hisse yok")
+            return None
+
+        panel = self.build_panel(symbol_data)
+        params = self.resolve_symbol_params(symbol_data)
+        logger.info(f"Portföy backtest başlıyor: {len(self.symbols)} hisse, {len(panel['dates'])} bar")
+
+        close = panel['close']
+        valuation = panel['valuation']
+        prediction = panel['prediction']
+        confidence = panel['confidence']
+        day = panel['day']
+        n_bars, n_symbols = close.shape
+
+        threshold = params['confidence_threshold']
+        stop_level = 1 - params['stop_loss_pct']
+        profit_level = 1 + params['take_profit_pct']
+        cost_rate = self.commission_rate + self.slippage_rate
+
+        capital = float(self.initial_capital)
+        position = np.zeros(n_symbols)
+        entry_price = np.zeros(n_symbols)
+        daily_trades = 0
+        last_day = -1
+
+        equity = np.empty(n_bars)
+        capital_curve = np.empty(n_bars)
+        position_value = np.empty(n_bars)
+        open_positions = np.empty(n_bars, dtype=np.int64)
+        events = []
+
+        for t in range(n_bars):
+            if day[t] != last_day:
+                daily_trades = 0
+                last_day = day[t]
+
+            price = close[t]
+            tradable = ~np.isnan(price)
+
+            # Çıkışlar (günlük işlem sınırı çıkışları engellemez)
+            held = (position > 0) & tradable
+            if held.any():
+                stop = held & (price <= entry_price * stop_level)
+                profit = held & ~stop & (price >= entry_price * profit_level)
+                signal = held & ~stop & ~profit & (prediction[t] == 0) & (confidence[t] > threshold)
+                exits = stop | profit | signal
+                if exits.any():
+                    idx = np.flatnonzero(exits)
+                    reason = np.where(stop[idx], EXIT_STOP_LOSS, np.where(profit[idx], EXIT_TAKE_PROFIT, EXIT_SIGNAL))
+                    proceeds = position[idx] * price[idx]
+                    costs = proceeds * cost_rate
+                    capital_after = capital + np.cumsum(proceeds - costs)
+                    events.append((t, idx, -1, price[idx], position[idx], proceeds, costs,
+                                   confidence[t, idx], capital_after, reason, entry_price[idx]))
+                    capital = capital_after[-1]
+                    position[idx] = 0.0
+                    daily_trades += len(idx)
+                    tradable = tradable & ~exits  # Aynı barda yeniden giriş yok
+
+            # Girişler: güven skoruna göre sıralı, günlük sınır ve nakit ile kısıtlı
+            remaining = self.max_daily_trades - daily_trades
+            if remaining > 0:
+                candidates = (position == 0) & tradable & (prediction[t] == 1) & (confidence[t] > threshold)
+                if candidates.any():
+                    idx = np.flatnonzero(candidates)
+                    idx = idx[np.argsort(-confidence[t, idx], kind='stable')][:remaining]
+
+                    portfolio_value = capital + np.dot(position, valuation[t])
+                    size = portfolio_value * params['max_position_size'][idx] * np.minimum(confidence[t, idx] * 2, 1.0)
+                    costs = size * cost_rate
+                    affordable = np.cumsum(size + costs) <= capital
+                    if not affordable.all():
+                        logger.debug(f"Yetersiz sermaye: {(~affordable).sum()} giriş atlandı - {panel['dates'][t]}")
+                    idx, size, costs = idx[affordable], size[affordable], costs[affordable]
+
+                    if len(idx):
+                        quantity = size / price[idx]
+                        capital_after = capital - np.cumsum(size + costs)
+                        events.append((t, idx, 1, price[idx], quantity, size, costs,
+                                       confidence[t, idx], capital_after, np.zeros(len(idx), dtype=np.int64),
+                                       price[idx]))
+                        capital = capital_after[-1]
+                        position[idx] = quantity
+                        entry_price[idx] = price[idx]
+                        daily_trades += len(idx)
+
+            capital_curve[t] = capital
+            position_value[t] = np.dot(position, valuation[t])
+            equity[t] = capital + position_value[t]
+            open_positions[t] = np.count_nonzero(position)
+
+        # Açık pozisyonları son bilinen fiyattan kapat
+        if position.any():
+            idx = np.flatnonzero(position > 0)
+            last_price = valuation[-1, idx]
+            proceeds = position[idx] * last_price
+            costs = proceeds * cost_rate
+            capital_after = capital + np.cumsum(proceeds - costs)
+            events.append((n_bars - 1, idx, -1, last_price, position[idx], proceeds, costs,
+                           np.full(len(idx), 0.5), capital_after,
+                           np.full(len(idx), EXIT_END_OF_DATA), entry_price[idx]))
+            capital = capital_after[-1]
+
+        equity_df = pd.DataFrame({
+            'equity': equity,
+            'capital': capital_curve,
+            'position_value': position_value,
+            'open_positions': open_positions
+        }, index=panel['dates'])
+        equity_df.index.name = 'date'
+
+        trades_df = self._build_trades(events)
+        symbol_summary = self._summarize_symbols(trades_df)
+        performance_metrics, round_trips = self._calculate_performance_metrics(equity_df, trades_df)
+
+        self.results = {
+            'symbols': self.symbols,
+            'equity_curve': equity_df,
+            'trades': trades_df.to_dict('records'),
+            'round_trips': round_trips,
+            'symbol_summary': symbol_summary,
+            'performance_metrics': performance_metrics,
+            'final_capital': capital,
+            'total_return': (capital - self.initial_capital) / self.initial_capital
+        }
+
+        logger.info("Portföy backtest tamamlandı")
+        logger.info(f"Toplam getiri: {self.results['total_return']:.2%}")
+        logger.info(f"Toplam işlem sayısı: {len(trades_df)}")
+
+        return self.results
+
+    def _build_trades(self, events: List[Tuple]) -> pd.DataFrame:
+        """Bar bazlı olay dizilerini işlem tablosuna çevirir"""
+        columns = ['date', 'symbol', 'action', 'price', 'quantity', 'position_size', 'costs',
+                   'confidence', 'capital_after', 'exit_reason', 'pnl']
+        if not events:
+            return pd.DataFrame(columns=columns)
+
+        bars = np.concatenate([np.full(len(e[1]), e[0]) for e in events])
+        symbol_idx = np.concatenate([e[1] for e in events])
+        is_buy = np.concatenate([np.full(len(e[1]), e[2] == 1) for e in events])
+        price = np.concatenate([e[3] for e in events])
+        quantity = np.concatenate([e[4] for e in events])
+        position_size = np.concatenate([e[5] for e in events])
+        costs = np.concatenate([e[6] for e in events])
+        entry_price = np.concatenate([e[10] for e in events])
+
+        # Satış kârı: (çıkış - giriş) x miktar - çıkış maliyeti (giriş maliyeti alış kaydında)
+        pnl = np.where(is_buy, np.nan, (price - entry_price) * quantity - costs)
+        reasons = np.concatenate([e[9] for e in events])
+
+        return pd.DataFrame({
+            'date': self.panel['dates'][bars],
+            'symbol': np.array(self.symbols, dtype=object)[symbol_idx],
+            'action': np.where(is_buy, 'buy', 'sell'),
+            'price': price,
+            'quantity': quantity,
+            'position_size': position_size,
+            'costs': costs,
+            'confidence': np.concatenate([e[7] for e in events]),
+            'capital_after': np.concatenate([e[8] for e in events]),
+            'exit_reason': [EXIT_REASONS.get(reason) for reason in reasons],
+            'pnl': pnl
+        }, columns=columns)
+
+    def _summarize_symbols(self, trades_df: pd.DataFrame) -> pd.DataFrame:
+        """Hisse bazında işlem sayısı, gerçekleşen kâr ve kazanma oranı"""
+        sells = trades_df[trades_df['action'] == 'sell']
+        if sells.empty:
+            return pd.DataFrame(columns=['symbol', 'trades', 'realized_pnl', 'win_rate'])
+
+        grouped = sells.groupby('symbol')
+        summary = pd.DataFrame({
+            'trades': grouped.size(),
+            'realized_pnl': grouped['pnl'].sum(),
+            'win_rate': grouped['pnl'].apply(lambda pnl: (pnl > 0).mean())
+        })
+        return summary.sort_values('realized_pnl', ascending=False).reset_index()
+
+    def _calculate_performance_metrics(self, equity_df: pd.DataFrame, trades_df: pd.DataFrame) -> Tuple[Dict, np.ndarray]:
+        """Portföy performans metrikleri (ortak metrik modülü + portföy doluluk metrikleri)"""
+        trades = trades_to_array(trades_df.to_dict('records'), self.symbols)
+        metrics, round_trips = compute_metrics(equity_df, trades, self.initial_capital)
+
+        metrics.update({
+            'avg_open_positions': equity_df['open_positions'].mean(),
+            'max_open_positions': int(equity_df['open_positions'].max()),
+            'capital_utilization': (equity_df['position_value'] / equity_df['equity']).mean()
+        })
+        return metrics, round_trips
@@ -0,0 +1,228 @@
+"""
+Fiyat Yolu Simülasyonu
+GBM veya geçmiş getiri bootstrap'ı ile binlerce fiyat yolu (tek NumPy matrisi) - hedefe stop'tan önce ulaşma olasılığı ve süre yüzdelikleri
+"""
+
+import logging
+from statistics import NormalDist
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+METHODS = ('gbm', 'bootstrap')
+
+# Simülasyon matrisinin tek seferde tutulacak en fazla eleman sayısı (~8 MB float32; grupta ~3 matris)
+MAX_MATRIX_ELEMENTS = 2_000_000
+
+def direction_probability(prediction: int, confidence: float) -> float:
+    """
+    Model tahmini ve güven skorundan yükseliş olasılığı
+
+    Güven skoru 0.5 ve üzerindeyse tahmin yönünün olasılığıdır; kararsız bölgede
+    stabilize_prediction |p - 0.5| x 2 döndürdüğünden 0.5 + güven / 2 kullanılır.
+    """
+    confidence = float(np.clip(confidence, 0.0, 1.0))
+    probability = confidence if confidence >= 0.5 else 0.5 + confidence / 2
+    return probability if prediction == 1 else 1.0 - probability
+
+def first_passage_times(paths: np.ndarray, levels: Dict[str, float],
+                        out: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """
+    Her seviyenin yol başına ilk ulaşıldığı bar (ulaşılmayan yollarda horizon)
+
+    Yolların birikimli maksimumu (yukarı seviyeler) ve minimumu (aşağı seviyeler) bir kez
+    hesaplanır; bu azalmayan dizilerde seviyeler yalnızca ufuk içinde ulaşan yollarda
+    ikili aramayla bulunur (seviye başına matris taraması yapılmaz).
+
+    Args:
+        paths: (horizon, yol) log fiyat matrisi
+        levels: {ad: log seviye} - >= 0 yukarı, < 0 aşağı
+        out: Birikimli uç değerler için paths boyutunda float32 tampon (gruplar arasında yeniden kullanılır)
+    """
+    horizon, n_paths = paths.shape
+    running = np.empty_like(paths) if out is None else out
+
+    first = {}
+    for sign in (1, -1):
+        names = [name for name, level in levels.items() if (level >= 0) == (sign == 1)]
+        if not names:
+            continue
+        # Aşağı seviyeler işaret çevrilerek aynı "birikimli maksimum >= seviye" aramasına döner
+        if sign == 1:
+            running[0] = paths[0]
+            for t in range(1, horizon):
+                np.maximum(running[t - 1], paths[t], out=running[t])
+        else:
+            running[0] = paths[0]
+            for t in range(1, horizon):
+                np.minimum(running[t - 1], paths[t], out=running[t])
+            np.negative(running, out=running)
+
+        for name in names:
+            target = sign * levels[name]
+            passage = np.full(n_paths, horizon, dtype=np.int32)
+            reached = np.flatnonzero(running[-1] >= target)
+            if len(reached):
+                passage[reached] = _lower_bound(running, reached, target)
+            first[name] = passage
+    return first
+
+def _lower_bound(running: np.ndarray, columns: np.ndarray, target: float) -> np.ndarray:
+    # Ufuk içinde ulaşan yollarda vektörel ikili arama: running[t] >= hedef olan ilk t
+    horizon, n_paths = running.shape
+    flat = running.ravel()
+    low = np.zeros(len(columns), dtype=np.int64)
+    high = np.full(len(columns), horizon - 1, dtype=np.int64)
+    for _ in range(int(np.ceil(np.log2(horizon)))):
+        mid = (low + high) >> 1
+        below = flat[mid * n_paths + columns] < target
+        low = np.where(below, mid + 1, low)
+        high = np.where(below, high, mid)
+    return low
+
+def log_returns(close) -> np.ndarray:
+    """Kapanış serisinin sonlu log getirileri"""
+    close = np.asarray(close, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = np.diff(np.log(close))
+    return returns[np.isfinite(returns)]
+
+class PricePathSimulator:
+    def __init__(self, config: Dict):
+        """
+        Monte Carlo fiyat yolu simülasyonu
+
+        Yolların sürüklenmesi, drift_horizon bar sonunda fiyatın başlangıcın üstünde
+        olma olasılığı modelin yükseliş olasılığına eşit olacak şekilde seçilir.
+        Rastgele çekilişler tüm hisseler için ortaktır (hisse başına yalnızca ölçekleme).
+
+        Args:
+            config: Sistem konfigürasyonu (PRICE_SIMULATION bölümü)
+        """
+        simulation_config = config.get('PRICE_SIMULATION', {}) or {}
+
+        self.enabled = simulation_config.get('enabled', True)
+        self.method = simulation_config.get('method', 'bootstrap')
+        self.n_paths = simulation_config.get('n_paths', 20000)
+        self.horizon = simulation_config.get('horizon', 120)
+        self.drift_horizon = simulation_config.get('drift_horizon', 20)
+        self.history = simulation_config.get('history', 500)
+        self.min_history = simulation_config.get('min_history', 60)
+        self.percentiles = simulation_config.get('percentiles', [25, 50, 75])
+        self.seed = simulation_config.get('seed', 42)
+
+        if self.method not in METHODS:
+            raise ValueError(f"Bilinmeyen simülasyon yöntemi: {self.method}")
+
+    def _chunks(self):
+        """Bellek sınırına göre yol grupları (her grup tek matris işlemi)"""
+        chunk = max(1, min(self.n_paths, MAX_MATRIX_ELEMENTS // max(self.horizon, 1)))
+        for start in range(0, self.n_paths, chunk):
+            yield start, min(chunk, self.n_paths - start)
+
+    def _drift(self, sigma: float, prob_up: float) -> float:
+        # drift_horizon bar toplam log getirisi N(h·μ, h·σ²): P(> 0) = Φ(μ·√h / σ) = prob_up
+        z = NormalDist().inv_cdf(float(np.clip(prob_up, 0.01, 0.99)))
+        return sigma * z / np.sqrt(self.drift_horizon)
+
+    def simulate(self, inputs: Dict[str, Dict]) -> Dict[str, Optional[Dict]]:
+        """
+        Birden fazla hisse için hedef olasılıkları ve süre dağılımları
+
+        Args:
+            inputs: {sembol: {close, current_price, prob_up, targets: {ad: fiyat}, stop_loss}}
+
+        Returns:
+            {sembol: {prob_up, stop_probability, targets: {ad: {price, probability,
+            eta_periods}}}}; yetersiz geçmişte None
+        """
+        prepared = {}
+        for symbol, item in inputs.items():
+            returns = log_returns(item['close'])[-self.history:]
+            if len(returns) < self.min_history:
+                logger.warning(f"{symbol}: Simülasyon için yetersiz geçmiş ({len(returns)} bar)")
+                continue
+
+            sigma = float(returns.std(ddof=1))
+            drift = self._drift(sigma, item['prob_up'])
+            # Bootstrap getirileri ortalamadan arındırılır; yön bilgisi yalnızca sürüklenmeden gelir
+            prepared[symbol] = {
+                'steps': (returns - returns.mean() + drift).astype(np.float32),
+                'sigma': sigma,
+                'drift': drift,
+                'levels': {name: np.log(price / item['current_price'])
+                           for name, price in {**item['targets'], 'stop_loss': item['stop_loss']}.items()},
+                'first': {name: np.empty(self.n_paths, dtype=np.int32)
+                          for name in [*item['targets'], 'stop_loss']}
+            }
+
+        rng = np.random.default_rng(self.seed)
+        for start, size in self._chunks():
+            # Zaman x yol düzeni: bar bar birikim ardışık satırlar üzerinde vektörel
+            if self.method == 'gbm':
+                shocks = rng.standard_normal((self.horizon, size), dtype=np.float32)
+            else:
+                shocks = rng.random((self.horizon, size), dtype=np.float32)
+            indices = {}  # Getiri sayısı -> bootstrap indeksleri (aynı uzunluktaki hisselerde ortak)
+            running = np.empty((self.horizon, size), dtype=np.float32)
+
+            for state in prepared.values():
+                if self.method == 'gbm':
+                    paths = shocks * np.float32(state['sigma'])
+                    paths += np.float32(state['drift'])
+                else:
+                    n_returns = len(state['steps'])
+                    if n_returns not in indices:
+                        indices[n_returns] = np.minimum((shocks * n_returns).astype(np.int32), n_returns - 1)
+                    paths = state['steps'][indices[n_returns]]
+
+                # Yolların log fiyatı (yerinde birikimli toplam)
+                for t in range(1, self.horizon):
+                    np.add(paths[t - 1], paths[t], out=paths[t])
+
+                for name, first in first_passage_times(paths, state['levels'], out=running).items():
+                    state['first'][name][start:start + size] = first
+
+        return {symbol: self._summarize(prepared[symbol], inputs[symbol]) if symbol in prepared else None
+                for symbol in inputs}
+
+    def _summarize(self, state: Dict, item: Dict) -> Dict:
+        # first == horizon: seviyeye ufuk içinde ulaşılmadı
+        stop_first = state['first']['stop_loss']
+        targets = {}
+        for name, price in item['targets'].items():
+            first = state['first'][name]
+            before_stop = first < np.minimum(stop_first, self.horizon)
+            eta = None
+            if before_stop.any():
+                eta = {int(q): float(value) for q, value in
+                       zip(self.percentiles, np.percentile(first[before_stop] + 1, self.percentiles))}
+            targets[name] = {
+                'price': float(price),
+                'probability': float(before_stop.mean()),
+                'eta_periods': eta
+            }
+
+        return {
+            'method': self.method,
+            'n_paths': self.n_paths,
+            'horizon': self.horizon,
+            'prob_up': float(item['prob_up']),
+            'stop_probability': float((stop_first < self.horizon).mean()),
+            'targets': targets
+        }
+
+    def simulate_targets(self, data: pd.DataFrame, current_price: float, prediction: int,
+                         confidence: float, targets: Dict[str, float], stop_loss: float) -> Optional[Dict]:
+        """Tek hisse için simülasyon (calculate_price_targets hedefleriyle)"""
+        inputs = {'symbol': {
+            'close': data['close'].to_numpy(),
+            'current_price': current_price,
+            'prob_up': direction_probability(prediction, confidence),
+            'targets': targets,
+            'stop_loss': stop_loss
+        }}
+        return self.simulate(inputs)['symbol']
@@ -8,15 +8,23 @@ from typing import Dict, Tuple, Optional
 import logging
 from datetime import datetime, timedelta
 
+from first_passage import first_passage_periods
+from hit_time_table import (get_hit_time_cache, hit_time_quantiles,
+                            HIT_HORIZON, HIT_TOLERANCE, HIT_END_MARGIN)
+from price_path_simulator import PricePathSimulator, direction_probability
+
 logger = logging.getLogger(__name__)
 
 class PriceTargetPredictor:
     def __init__(self, config: Dict):
         self.config = config
+        self.simulator = PricePathSimulator(config)
         
     def calculate_price_targets(self, current_price: float, prediction: int, 
                               confidence: float, volatility: float, 
-                              data: pd.DataFrame, model_data: Dict = None) -> Dict:
+                              data: pd.DataFrame, model_data: Dict = None,
+                              symbol: str = None, chart_analysis: Dict = None,
+                              simulate: bool = False) -> Dict:
         """
         Hedef fiyatları ve tahmini süreleri hesaplar
         
@@ -26,6 +34,10 @@ class PriceTargetPredictor:
             confidence: Model güven skoru
             volatility: Yıllık volatilite
             data: Geçmiş fiyat verisi
+            model_data: Model metrikleri
+            symbol: Hisse sembolü (verilirse süreler önbellekteki hedef süre tablosundan)
+            chart_analysis: Önceden hesaplanmış grafik analizi (toplu hesapta)
+            simulate: Monte Carlo simülasyonu yapılsın mı (varsayılan kapalı; toplu hesapta tek seferde eklenir)
             
         Returns:
             Hedef fiyatlar ve süreler
@@ -61,7 +73,7 @@ class PriceTargetPredictor:
             # Tahmini süreler - Model ve grafik analizi ile
             time_targets = self._calculate_realistic_time_targets(
                 data, current_price, [conservative_target, moderate_target, aggressive_target], 
-                volatility, confidence, prediction, model_data
+                volatility, confidence, prediction, model_data, symbol, chart_analysis
             )
             
         else:  # Aşağı tahmin
@@ -76,7 +88,20 @@ class PriceTargetPredictor:
             # Tahmini süreler - Model ve grafik analizi ile
             time_targets = self._calculate_realistic_time_targets(
                 data, current_price, [conservative_target, moderate_target, aggressive_target], 
-                volatility, confidence, prediction, model_data
+                volatility, confidence, prediction, model_data, symbol, chart_analysis
+            )
+        
+        targets = {
+            'conservative': conservative_target,
+            'moderate': moderate_target,
+            'aggressive': aggressive_target
+        }
+        
+        # Monte Carlo: hedefe stop'tan önce ulaşma olasılığı ve süre yüzdelikleri
+        simulation = None
+        if simulate and self.simulator.enabled:
+            simulation = self.simulator.simulate_targets(
+                data, current_price, prediction, confidence, targets, stop_loss_price
             )
         
         return {
@@ -84,18 +109,69 @@ class PriceTargetPredictor:
             'prediction': prediction,
             'confidence': confidence,
             'volatility': volatility,
-            'targets': {
-                'conservative': conservative_target,
-                'moderate': moderate_target,
-                'aggressive': aggressive_target
-            },
+            'targets': targets,
             'stop_loss': stop_loss_price,
             'time_targets': time_targets,
+            'simulation': simulation,
             'risk_reward_ratio': self._calculate_risk_reward_ratio(
                 current_price, moderate_target, stop_loss_price, prediction
             )
         }
     
+    def calculate_price_targets_batch(self, panel: Dict[str, pd.DataFrame], predictions,
+                                      confidences, volatilities=None, model_data: Dict = None) -> Dict[str, Dict]:
+        """
+        Tarama sonuçları için toplu hedef fiyat hesabı
+        
+        Toplu yapılan iki adım vardır: grafik analizi tüm hisselerin son barlarından oluşan
+        tek matris üzerinde, Monte Carlo simülasyonu tüm hisseler için tek çağrıda (ortak
+        rastgele çekilişler) yapılır. Hedef/stop fiyatları ve süreler hisse başına
+        calculate_price_targets ile hesaplanır (süreler önbellekteki hedef süre tablolarından);
+        simülasyon dışındaki çıktı hisse bazlı çağrıyla (simulate=False) aynıdır.
+        
+        Args:
+            panel: {sembol: OHLCV verisi}
+            predictions: Hisse başına model tahmini (panel sırasıyla)
+            confidences: Hisse başına güven skoru (panel sırasıyla)
+            volatilities: Hisse başına yıllık volatilite (None = kapanışlardan)
+            model_data: Model metrikleri (tüm hisseler için ortak)
+            
+        Returns:
+            {sembol: calculate_price_targets çıktısı}
+        """
+        symbols = list(panel)
+        predictions = np.asarray(predictions)
+        confidences = np.asarray(confidences, dtype=np.float64)
+        if volatilities is None:
+            volatilities = [panel[symbol]['close'].pct_change().std() * np.sqrt(252) for symbol in symbols]
+        volatilities = np.asarray(volatilities, dtype=np.float64)
+        
+        chart_analyses = self.analyze_chart_patterns_batch(panel)
+        
+        results = {}
+        for i, symbol in enumerate(symbols):
+            data = panel[symbol]
+            results[symbol] = self.calculate_price_targets(
+                data['close'].iloc[-1], int(predictions[i]), float(confidences[i]), float(volatilities[i]),
+                data, model_data, symbol=symbol, chart_analysis=chart_analyses[symbol], simulate=False
+            )
+        
+        if self.simulator.enabled and results:
+            simulations = self.simulator.simulate({
+                symbol: {
+                    'close': panel[symbol]['close'].to_numpy(),
+                    'current_price': result['current_price'],
+                    'prob_up': direction_probability(result['prediction'], result['confidence']),
+                    'targets': result['targets'],
+                    'stop_loss': result['stop_loss']
+                }
+                for symbol, result in results.items()
+            })
+            for symbol, simulation in simulations.items():
+                results[symbol]['simulation'] = simulation
+        
+        return results
+    
     def _calculate_time_targets(self, data: pd.DataFrame, current_price: float, 
                               targets: list, volatility: float, confidence: float) -> Dict:
         """
@@ -172,7 +248,8 @@ class PriceTargetPredictor:
     
     def _calculate_realistic_time_targets(self, data: pd.DataFrame, current_price: float, 
                                         targets: list, volatility: float, confidence: float,
-                                        prediction: int, model_data: Dict = None) -> Dict:
+                                        prediction: int, model_data: Dict = None,
+                                        symbol: str = None, chart_analysis: Dict = None) -> Dict:
         """
         ML tabanlı gerçek veri analizi ile süre tahmini
         
@@ -182,10 +259,11 @@ class PriceTargetPredictor:
         interval = self.config.get('MODEL_CONFIG', {}).get('interval', '1d')
         
         # Grafik analizi
-        chart_analysis = self._analyze_chart_patterns(data)
+        if chart_analysis is None:
+            chart_analysis = self._analyze_chart_patterns(data)
         
         # ML Tabanlı Geçmiş Hareket Analizi - VERİDEN ÖĞRENİYOR
-        historical_analysis = self._analyze_historical_movements_ml(data, targets, current_price, interval, prediction)
+        historical_analysis = self._analyze_historical_movements_ml(data, targets, current_price, interval, prediction, symbol)
         
         # Model performans
         model_analysis = self._analyze_model_performance(model_data, confidence) if model_data else {}
@@ -231,11 +309,14 @@ class PriceTargetPredictor:
         
         return time_targets
     
-    def _analyze_historical_movements_ml(self, data: pd.DataFrame, targets: list, current_price: float, interval: str, prediction: int = None) -> Dict:
+    def _analyze_historical_movements_ml(self, data: pd.DataFrame, targets: list, current_price: float, interval: str,
+                                         prediction: int = None, symbol: str = None) -> Dict:
         """
         ML TABANLI Geçmiş hareket analizi - VERİDEN ÖĞRENİYOR
         
-        Hardcoded tahminler yerine gerçek geçmiş verilerdeki kalıpları bulur
+        Hardcoded tahminler yerine gerçek geçmiş verilerdeki kalıpları bulur.
+        Sembol verilirse süreler hissenin hedef süre tablosundan okunur (ızgara
+        komşuları arasında interpolasyon); tabloda karşılığı olmayan hedefler taranır.
         """
         if len(data) < 50:
             return {'insufficient_data': True}
@@ -247,40 +328,32 @@ class PriceTargetPredictor:
             'max_periods': {}
         }
         
+        target_changes = [abs(target - current_price) / current_price for target in targets]
+        quantiles = [None] * len(targets)
+        
+        if symbol is not None:
+            table = get_hit_time_cache(self.config).get(symbol, interval, data)
+            quantiles = [table.lookup(target_change, prediction) for target_change in target_changes]
+        
+        # Tabloda olmayan hedefler: yön uyumlu ve büyüklük benzeri hareketler (tolerans: %30)
+        missing = [i for i, values in enumerate(quantiles) if values is None]
+        if missing:
+            first_passage = first_passage_periods(
+                data['close'].to_numpy(), [target_changes[i] for i in missing], horizon=HIT_HORIZON,
+                tolerance=HIT_TOLERANCE, direction=prediction, stop=len(data) - HIT_END_MARGIN
+            )
+            for i, periods in zip(missing, first_passage):
+                quantiles[i] = hit_time_quantiles(periods)
+        
         for i, target in enumerate(targets):
             target_names = ['conservative', 'moderate', 'aggressive']
             target_name = target_names[i]
-            target_change = abs(target - current_price) / current_price
-            
-            # Gerçek veride benzer hareketleri bul
-            similar_movements = []
             
-            for j in range(len(data) - 10):
-                start_price = data['close'].iloc[j]
-                
-                # İleriye doğru bakarak benzer hareketleri bul
-                for k in range(j + 1, min(j + 100, len(data))):
-                    end_price = data['close'].iloc[k]
-                    actual_change = abs(end_price - start_price) / start_price
-                    actual_direction = 1 if end_price > start_price else 0
-                    
-                    # Yön uyumlu ve büyüklük benzeri hareketler (tolerans: %20)
-                    if (prediction is None or actual_direction == prediction) and \
-                       abs(actual_change - target_change) < target_change * 0.3:
-                        similar_movements.append({
-                            'periods': k - j,
-                            'change_pct': actual_change,
-                            'start_price': start_price,
-                            'end_price': end_price
-                        })
-                        break  # İlk benzer hareketi bulduk, devam etme
-            
-            # ML TABANLI TAHMİN: Gerçek hareketlerden öğren
-            if len(similar_movements) >= 3:
-                periods = [m['periods'] for m in similar_movements]
-                result['estimated_periods'][target_name] = int(np.percentile(periods, 50))  # Median
-                result['min_periods'][target_name] = int(np.percentile(periods, 25))
-                result['max_periods'][target_name] = int(np.percentile(periods, 75))
+            # ML TABANLI TAHMİN: Gerçek hareketlerden öğren (25/50/75. yüzdelikler)
+            if quantiles[i] is not None:
+                result['estimated_periods'][target_name] = int(quantiles[i][1])  # Median
+                result['min_periods'][target_name] = int(quantiles[i][0])
+                result['max_periods'][target_name] = int(quantiles[i][2])
             else:
                 # Yeterli veri yok - basit varsayılan
                 result['estimated_periods'][target_name] = 2
@@ -315,33 +388,25 @@ class PriceTargetPredictor:
         # Farklı büyüklükteki hareketlerin sürelerini analiz et
         movement_analysis = {}
         
-        for target in targets:
-            target_change = abs(target - current_price) / current_price
-            
-            # Bu büyüklükteki hareketlerin geçmişte ne kadar sürdüğünü bul
-            durations = []
-            
-            for i in range(20, len(recent_data) - 10):  # En az 20 gün önce başla
-                start_price = recent_data['close'].iloc[i]
-                
-                # Bu fiyattan başlayarak target_change kadar hareket eden süreleri bul
-                for j in range(i + 1, min(i + 50, len(recent_data))):  # Max 50 gün ara
-                    end_price = recent_data['close'].iloc[j]
-                    actual_change = abs(end_price - start_price) / start_price
-                    
-                    # %10 toleransla benzer hareketleri bul
-                    if abs(actual_change - target_change) < target_change * 0.1:
-                        durations.append(j - i)
-                        break
+        # Bu büyüklükteki hareketlerin geçmişte ne kadar sürdüğünü bul
+        # (en az 20 gün önce başla, max 49 gün ara, %10 tolerans)
+        target_changes = [abs(target - current_price) / current_price for target in targets]
+        first_passage = first_passage_periods(
+            recent_data['close'].to_numpy(), target_changes, horizon=49, tolerance=0.1,
+            start=20, stop=len(recent_data) - 10
+        )
+        
+        for target_change, target_periods in zip(target_changes, first_passage):
+            durations = target_periods[target_periods > 0]
             
-            if durations:
+            if len(durations):
                 avg_duration = np.mean(durations)
                 std_duration = np.std(durations)
                 movement_analysis[f'{target_change:.3f}'] = {
                     'avg_days': avg_duration,
                     'std_days': std_duration,
-                    'min_days': min(durations),
-                    'max_days': max(durations),
+                    'min_days': int(durations.min()),
+                    'max_days': int(durations.max()),
                     'sample_count': len(durations)
                 }
         
@@ -488,6 +553,74 @@ class PriceTargetPredictor:
             'trend_strength_value': trend_strength
         }
     
+    def analyze_chart_patterns_batch(self, panel: Dict[str, pd.DataFrame]) -> Dict[str, Dict]:
+        """
+        Birden fazla hisse için grafik kalıpları (_analyze_chart_patterns ile aynı kurallar)
+        
+        Analiz yalnızca son 50 bara bakar: hisselerin son 50 barı (hisse, bar) matrisine
+        dizilir, hareketli ortalama/maks/min ve hacim ortalamaları satır bazlı tek işlemdir.
+        """
+        window = 50
+        results = {}
+        long_enough = [symbol for symbol, data in panel.items() if len(data) >= window]
+        for symbol in panel:
+            if symbol not in long_enough:
+                results[symbol] = self._analyze_chart_patterns(panel[symbol])
+        if not long_enough:
+            return results
+        
+        def tail_matrix(column: str) -> np.ndarray:
+            return np.vstack([panel[symbol][column].to_numpy(dtype=np.float64)[-window:] for symbol in long_enough])
+        
+        close, high, low, volume = (tail_matrix(column) for column in ('close', 'high', 'low', 'volume'))
+        current_price = close[:, -1]
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Trend gücü (SMA 20 / SMA 50)
+            sma_20 = close[:, -20:].mean(axis=1)
+            sma_50 = close.mean(axis=1)
+            trend_strength = np.abs(sma_20 - sma_50) / sma_50
+            trend_text = np.select([trend_strength > 0.1, trend_strength > 0.05], ['Strong', 'Medium'], 'Weak')
+            
+            # Destek/direnç (son 20 bar)
+            recent_high = high[:, -20:].max(axis=1)
+            recent_low = low[:, -20:].min(axis=1)
+            near_support = np.abs(current_price - recent_low) / current_price < 0.03
+            near_resistance = np.abs(current_price - recent_high) / current_price < 0.03
+            
+            # Hacim (son 5 bar ortalaması / 20 bar ortalaması)
+            avg_volume = volume[:, -20:].mean(axis=1)
+            recent_volume = np.nanmean(volume[:, -5:], axis=1)
+            volume_trend = np.select([recent_volume > avg_volume * 1.2, recent_volume < avg_volume * 0.8],
+                                     ['Increasing', 'Decreasing'], 'Stable')
+            
+            # Kalıp (son 20 bar fiyat değişimi ve getiri oynaklığı)
+            recent_close = close[:, -20:]
+            price_change = (recent_close[:, -1] - recent_close[:, 0]) / recent_close[:, 0]
+            returns = recent_close[:, 1:] / recent_close[:, :-1] - 1
+            valid = np.isfinite(returns).sum(axis=1)
+            volatility = np.full(len(long_enough), np.nan)
+            volatility[valid > 1] = np.nanstd(returns[valid > 1], axis=1, ddof=1)
+        
+        pattern = np.select([
+            (price_change > 0.05) & (volatility < 0.02),
+            (price_change < -0.05) & (volatility < 0.02),
+            (np.abs(price_change) < 0.02) & (volatility < 0.015),
+            volatility > 0.03
+        ], ['Strong Uptrend', 'Strong Downtrend', 'Sideways/Consolidation', 'High Volatility'], 'Mixed Signals')
+        
+        for i, symbol in enumerate(long_enough):
+            results[symbol] = {
+                'trend_strength': str(trend_text[i]),
+                'near_support_resistance': bool(near_support[i] or near_resistance[i]),
+                'volume_trend': str(volume_trend[i]),
+                'pattern': str(pattern[i]),
+                'support_level': recent_low[i],
+                'resistance_level': recent_high[i],
+                'trend_strength_value': trend_strength[i]
+            }
+        return {symbol: results[symbol] for symbol in panel}
+    
     def _get_chart_time_factor(self, chart_analysis: Dict) -> float:
         """
         Grafik analizine göre zaman faktörü döndürür
@@ -586,4 +719,16 @@ class PriceTargetPredictor:
 📊 **Risk/Getiri Oranı:** {prediction_result['risk_reward_ratio']:.2f}
         """
         
+        simulation = prediction_result.get('simulation')
+        if simulation:
+            interval = self.config.get('MODEL_CONFIG', {}).get('interval', '1d')
+            names = {'conservative': 'Konservatif', 'moderate': 'Orta', 'aggressive': 'Agresif'}
+            summary += f"\n🎲 **Simülasyon ({simulation['n_paths']} yol, stop olasılığı %{simulation['stop_probability'] * 100:.0f}):**\n"
+            for name, target in simulation['targets'].items():
+                line = f"   {names.get(name, name)}: stop'tan önce ulaşma %{target['probability'] * 100:.0f}"
+                if target['eta_periods']:
+                    median_days = self._periods_to_days(target['eta_periods'].get(50, 0), interval)
+                    line += f", medyan süre {median_days:.1f} gün"
+                summary += line + "\n"
+        
         return summary
@@ -0,0 +1,223 @@
+"""
+Backtest Sağlamlık Analizi
+Blok bootstrap ve işlem sırası karıştırma ile getiri, drawdown ve Sharpe güven aralıkları (Monte Carlo)
+"""
+
+import logging
+from typing import Dict
+
+import numpy as np
+
+from performance_metrics import TRADING_DAYS_PER_YEAR, pair_round_trips, trades_to_array, infer_periods_per_year
+
+logger = logging.getLogger(__name__)
+
+METHODS = ('block_bootstrap', 'trade_shuffle', 'trade_bootstrap')
+
+# Simülasyon matrisinin tek seferde tutulacak en fazla eleman sayısı (~64 MB float64)
+MAX_MATRIX_ELEMENTS = 8_000_000
+
+def trade_pnl(results: Dict) -> np.ndarray:
+    """
+    Backtest sonucundan gerçekleşen kâr/zarar dizisi (kapanış sırasıyla)
+
+    Alış-satış çiftleri ortak metrik modülünden gelir: alış miktarı x fiyat farkı -
+    iki bacağın maliyeti.
+    """
+    round_trips = results.get('round_trips')
+    if round_trips is None:
+        round_trips = pair_round_trips(trades_to_array(results['trades']))
+    return round_trips['pnl'].astype(np.float64)
+
+def path_metrics(paths: np.ndarray, periods_per_year: float) -> Dict[str, np.ndarray]:
+    """
+    Equity yollarının ([simülasyon, adım], başlangıç = 1) metrikleri
+
+    Returns:
+        total_return, max_drawdown, sharpe_ratio dizileri (simülasyon başına)
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        previous = np.concatenate([np.ones((len(paths), 1)), paths[:, :-1]], axis=1)
+        returns = np.diff(paths, axis=1, prepend=1.0) / previous
+        std = returns.std(axis=1, ddof=1) if paths.shape[1] > 1 else np.zeros(len(paths))
+        sharpe = np.where(std > 0, returns.mean(axis=1) / std * np.sqrt(periods_per_year), 0.0)
+
+    running_max = np.maximum(np.maximum.accumulate(paths, axis=1), 1.0)
+    drawdown = (paths / running_max - 1).min(axis=1)
+
+    return {
+        'total_return': paths[:, -1] - 1,
+        'max_drawdown': np.minimum(drawdown, 0.0),
+        'sharpe_ratio': sharpe
+    }
+
+class MonteCarloAnalyzer:
+    def __init__(self, config: Dict):
+        """
+        Monte Carlo sağlamlık analizi
+
+        Args:
+            config: Sistem konfigürasyonu (ROBUSTNESS bölümü)
+        """
+        robustness_config = config.get('ROBUSTNESS', {}) or {}
+
+        self.enabled = robustness_config.get('enabled', False)
+        self.methods = robustness_config.get('methods', ['block_bootstrap', 'trade_shuffle'])
+        self.n_simulations = robustness_config.get('n_simulations', 2000)
+        self.block_size = robustness_config.get('block_size', 10)
+        self.confidence_level = robustness_config.get('confidence_level', 0.95)
+        self.periods_per_year = robustness_config.get('periods_per_year')  # None = bar aralığından
+        self.seed = robustness_config.get('seed', 42)
+
+        unknown = set(self.methods) - set(METHODS)
+        if unknown:
+            raise ValueError(f"Bilinmeyen sağlamlık yöntemi: {sorted(unknown)}")
+
+    def _chunks(self, n_steps: int):
+        """Bellek sınırına göre simülasyon grupları (her grup tek matris işlemi)"""
+        chunk = max(1, min(self.n_simulations, MAX_MATRIX_ELEMENTS // max(n_steps, 1)))
+        for start in range(0, self.n_simulations, chunk):
+            yield min(chunk, self.n_simulations - start)
+
+    def _summarize(self, simulated: Dict[str, np.ndarray], observed: Dict[str, float], method: str) -> Dict:
+        alpha = 1 - self.confidence_level
+        intervals = {}
+        for name, values in simulated.items():
+            lower, median, upper = np.quantile(values, [alpha / 2, 0.5, 1 - alpha / 2])
+            intervals[name] = {
+                'lower': float(lower),
+                'median': float(median),
+                'upper': float(upper),
+                'mean': float(values.mean())
+            }
+
+        return {
+            'method': method,
+            'n_simulations': int(len(simulated['total_return'])),
+            'confidence_level': self.confidence_level,
+            'observed': observed,
+            'intervals': intervals,
+            'probability_of_loss': float((simulated['total_return'] < 0).mean())
+        }
+
+    def block_bootstrap(self, returns: np.ndarray, rng: np.random.Generator = None,
+                        periods_per_year: float = None) -> Dict:
+        """
+        Bar getirilerinin hareketli blok bootstrap'ı (oynaklık kümelenmesi blok içinde korunur)
+
+        Args:
+            returns: Equity eğrisinin bar getirileri
+            periods_per_year: Sharpe yıllıklandırması (None = konfigürasyon veya 252)
+        """
+        rng = rng or np.random.default_rng(self.seed)
+        periods_per_year = periods_per_year or self.periods_per_year or TRADING_DAYS_PER_YEAR
+        returns = np.asarray(returns, dtype=np.float64)
+        returns = returns[np.isfinite(returns)]
+        n = len(returns)
+        if n < 2:
+            return None
+
+        block = int(max(1, min(self.block_size, n)))
+        n_blocks = int(np.ceil(n / block))
+        offsets = np.arange(block)
+
+        simulated = {'total_return': [], 'max_drawdown': [], 'sharpe_ratio': []}
+        for size in self._chunks(n):
+            starts = rng.integers(0, n - block + 1, size=(size, n_blocks))
+            index = (starts[:, :, None] + offsets).reshape(size, -1)[:, :n]
+            paths = np.cumprod(1 + returns[index], axis=1)
+            for name, values in path_metrics(paths, periods_per_year).items():
+                simulated[name].append(values)
+
+        observed = path_metrics(np.cumprod(1 + returns)[None, :], periods_per_year)
+        return self._summarize({name: np.concatenate(values) for name, values in simulated.items()},
+                               {name: float(values[0]) for name, values in observed.items()},
+                               'block_bootstrap')
+
+    def trade_resample(self, pnl: np.ndarray, initial_capital: float, replace: bool = False,
+                       trades_per_year: float = None, rng: np.random.Generator = None) -> Dict:
+        """
+        İşlem kâr/zararlarının sırası karıştırılır (replace=False) veya yerine koyarak çekilir
+
+        Karıştırmada toplam getiri sabittir, drawdown ve Sharpe dağılımı sıralama şansını ölçer;
+        bootstrap'ta getiri dağılımı da oluşur.
+
+        Args:
+            pnl: İşlem başına gerçekleşen kâr/zarar (TL)
+            initial_capital: Başlangıç sermayesi
+            trades_per_year: Sharpe yıllıklandırması için yıllık işlem sayısı
+        """
+        rng = rng or np.random.default_rng(self.seed)
+        pnl = np.asarray(pnl, dtype=np.float64) / initial_capital
+        n = len(pnl)
+        if n < 2:
+            return None
+
+        periods = trades_per_year or self.periods_per_year or TRADING_DAYS_PER_YEAR
+        simulated = {'total_return': [], 'max_drawdown': [], 'sharpe_ratio': [], 'win_rate': []}
+        for size in self._chunks(n):
+            if replace:
+                samples = pnl[rng.integers(0, n, size=(size, n))]
+            else:
+                samples = rng.permuted(np.broadcast_to(pnl, (size, n)), axis=1)
+            paths = 1 + np.cumsum(samples, axis=1)
+            for name, values in path_metrics(paths, periods).items():
+                simulated[name].append(values)
+            simulated['win_rate'].append((samples > 0).mean(axis=1))
+
+        observed = path_metrics((1 + np.cumsum(pnl))[None, :], periods)
+        observed = {name: float(values[0]) for name, values in observed.items()}
+        observed['win_rate'] = float((pnl > 0).mean())
+        return self._summarize({name: np.concatenate(values) for name, values in simulated.items()},
+                               observed, 'trade_bootstrap' if replace else 'trade_shuffle')
+
+    def analyze(self, results: Dict, initial_capital: float) -> Dict:
+        """
+        Backtest sonucunun (Backtester veya PortfolioBacktester) sağlamlık analizi
+
+        Args:
+            results: equity_curve ve trades içeren backtest sonucu
+            initial_capital: Başlangıç sermayesi
+
+        Returns:
+            Yöntem -> özet (observed, intervals, probability_of_loss)
+        """
+        rng = np.random.default_rng(self.seed)
+        equity_df = results['equity_curve']
+        periods_per_year = self.periods_per_year or infer_periods_per_year(equity_df.index)
+        analysis = {}
+
+        if 'block_bootstrap' in self.methods:
+            returns = equity_df['equity'].pct_change().dropna().to_numpy()
+            summary = self.block_bootstrap(returns, rng, periods_per_year)
+            if summary:
+                analysis['block_bootstrap'] = summary
+
+        trade_methods = [method for method in self.methods if method != 'block_bootstrap']
+        if trade_methods:
+            pnl = trade_pnl(results)
+            trades_per_year = None
+            if len(equity_df) > 1 and len(pnl):
+                years = len(equity_df) / periods_per_year
+                trades_per_year = len(pnl) / years
+
+            for method in trade_methods:
+                summary = self.trade_resample(pnl, initial_capital, replace=(method == 'trade_bootstrap'),
+                                              trades_per_year=trades_per_year, rng=rng)
+                if summary:
+                    analysis[method] = summary
+
+        return analysis
+
+    def format_report(self, analysis: Dict) -> str:
+        """Güven aralıklarını metin raporuna çevirir"""
+        lines = []
+        for method, summary in analysis.items():
+            level = summary['confidence_level']
+            lines.append(f"{method} ({summary['n_simulations']} simülasyon, %{level*100:.0f} aralık, "
+                         f"zarar olasılığı %{summary['probability_of_loss']*100:.1f})")
+            for name, interval in summary['intervals'].items():
+                observed = summary['observed'].get(name, float('nan'))
+                lines.append(f"  {name:14}: gözlenen {observed:8.4f}  "
+                             f"[{interval['lower']:8.4f}, {interval['upper']:8.4f}]  medyan {interval['median']:8.4f}")
+        return "\n".join(lines)
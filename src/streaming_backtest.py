@@ -0,0 +1,340 @@
+"""
+Akış (Streaming) Backtest
+Barları diskten parça parça okuyan olay güdümlü gün içi backtest - stop loss / take profit bar içi high/low ile
+"""
+
+import os
+import time
+import logging
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backtest import Backtester
+from backtest_log import EQUITY_DTYPE, EquityLogWriter, write_trade_log
+from data_loader import DataLoader
+from feature_engineering import FeatureEngineer
+from performance_metrics import (EquityMetricsAccumulator, epoch_ns, trades_to_array, pair_round_trips,
+                                 trade_metrics, periods_per_year_from_spacing)
+
+logger = logging.getLogger(__name__)
+
+# Parça -> (tahmin üretilen barların indeksi, tahminler, olasılıklar)
+SignalFunc = Callable[[pd.DataFrame], Tuple[pd.Index, np.ndarray, np.ndarray]]
+
+EXIT_REASONS = ('stop_loss', 'take_profit', 'signal')
+
+def stream_bars(path: str, chunk_size: int = 5000, start=None, end=None) -> Iterator[pd.DataFrame]:
+    """
+    Cache CSV dosyasını parça parça okur
+
+    Args:
+        path: data/raw/<SEMBOL>_<interval>_cache.csv
+        chunk_size: Parça başına bar sayısı
+        start: Başlangıç tarihi (opsiyonel)
+        end: Bitiş tarihi (opsiyonel)
+    """
+    for chunk in pd.read_csv(path, index_col=0, chunksize=chunk_size):
+        chunk.index = pd.to_datetime(chunk.index)
+        chunk.columns = [column.lower() for column in chunk.columns]
+        if start is not None:
+            chunk = chunk[chunk.index >= pd.Timestamp(start, tz=chunk.index.tz)]
+        if end is not None:
+            chunk = chunk[chunk.index <= pd.Timestamp(end, tz=chunk.index.tz)]
+        if not chunk.empty:
+            yield chunk
+
+def with_signals(chunks: Iterator[pd.DataFrame], signal_func: SignalFunc, warmup: int = 250) -> Iterator[pd.DataFrame]:
+    """
+    Parçalara 'prediction' ve 'confidence' kolonlarını ekler
+
+    Pencereli özellikler için önceki parçaların son `warmup` barı parçanın önüne eklenir;
+    tahmin üretilemeyen barlarda sinyal yoktur (tahmin -1, güven 0).
+    """
+    tail = None
+    for chunk in chunks:
+        frame = chunk if tail is None else pd.concat([tail, chunk])
+        index, predictions, probabilities = signal_func(frame)
+
+        signals = pd.DataFrame({
+            'prediction': np.asarray(predictions, dtype=np.float64),
+            'confidence': np.max(probabilities, axis=1) if len(index) else np.zeros(0)
+        }, index=index)
+        signals = signals[~signals.index.duplicated(keep='last')].reindex(chunk.index)
+
+        output = chunk[['open', 'high', 'low', 'close']].copy()
+        output['prediction'] = signals['prediction'].fillna(-1).to_numpy(dtype=np.int64)
+        output['confidence'] = signals['confidence'].fillna(0.0).to_numpy()
+
+        tail = frame.iloc[-warmup:] if warmup > 0 else None
+        yield output
+
+def model_signals(config: Dict, predictor, symbol: str, index_data: Optional[pd.DataFrame] = None) -> SignalFunc:
+    """
+    Yüklü modelden sinyal fonksiyonu
+
+    Özellikler hedef değişken olmadan oluşturulur (gelecek barlara bakılmaz); pencereleri
+    dolmamış barlar atlanır.
+    """
+    engineer = FeatureEngineer(config)
+
+    def signals(frame: pd.DataFrame):
+        features = engineer.create_technical_features(frame)
+        features = engineer.create_momentum_features(features)
+        if index_data is not None:
+            features = engineer.create_index_features(features, index_data)
+        features = engineer.create_time_features(features)
+        features = features.replace([np.inf, -np.inf], np.nan).dropna()
+        if features.empty:
+            return features.index, np.zeros(0, dtype=np.int64), np.zeros((0, 2))
+
+        features['direction_binary'] = 0  # prepare_data hedef kolonu bekler, tahminde kullanılmaz
+        features['symbol'] = symbol
+        X, _ = predictor.prepare_data(features)
+        predictions, probabilities = predictor.predict(X)
+        return X.index, predictions, probabilities
+
+    return signals
+
+class StreamingBacktester:
+    def __init__(self, config: Dict):
+        """
+        Olay güdümlü akış backtest'i
+
+        Pozisyon büyüklüğü, maliyetler ve volatilite grubu risk parametreleri Backtester ile
+        aynıdır. Bellekte yalnızca bir parça, taşınan durum ve işlem listesi tutulur; equity
+        eğrisi istenirse parça parça diske yazılır.
+
+        Args:
+            config: Sistem konfigürasyonu (STREAMING_BACKTEST bölümü)
+        """
+        self.config = config
+        streaming_config = config.get('STREAMING_BACKTEST', {}) or {}
+
+        self.chunk_size = streaming_config.get('chunk_size', 5000)
+        self.warmup = streaming_config.get('warmup', 250)
+        self.intrabar_exits = streaming_config.get('intrabar_exits', True)
+        self.interval = streaming_config.get('interval') or config.get('MODEL_CONFIG', {}).get('interval', '1h')
+        self.output_dir = streaming_config.get('output_dir', 'logs/streaming_backtests')
+
+    def _exit_price(self, open_price: float, high: float, low: float, close: float,
+                    entry_price: float, stop_loss_pct: float, take_profit_pct: float) -> Tuple[Optional[float], Optional[str]]:
+        """Stop loss / take profit çıkış fiyatı ve nedeni (tetiklenmediyse None)"""
+        stop_price = entry_price * (1 - stop_loss_pct)
+        target_price = entry_price * (1 + take_profit_pct)
+
+        if not self.intrabar_exits:
+            if close <= stop_price:
+                return close, 'stop_loss'
+            if close >= target_price:
+                return close, 'take_profit'
+            return None, None
+
+        # Bar içinde ikisi de görüldüyse sıralama bilinmez: muhafazakâr olarak stop önce.
+        # Boşlukla seviyenin ötesinde açılışta işlem açılış fiyatından gerçekleşir.
+        if low <= stop_price:
+            return min(open_price, stop_price), 'stop_loss'
+        if high >= target_price:
+            return max(open_price, target_price), 'take_profit'
+        return None, None
+
+    def run_symbol(self, symbol: str, chunks: Iterator[pd.DataFrame], volatility: Optional[float] = None,
+                   output_dir: Optional[str] = None) -> Optional[Dict]:
+        """
+        Tek hissenin sinyalli bar akışını backtest eder
+
+        Args:
+            symbol: Hisse sembolü
+            chunks: with_signals çıktısı (open, high, low, close, prediction, confidence)
+            volatility: Yıllık volatilite (None = ilk parçadan, risk grubu ve güven eşiği için)
+            output_dir: Equity/işlem kayıt dizini (None = yazılmaz)
+
+        Returns:
+            Backtester sonuç alanları (equity_curve hariç - kayıt dizininden okunur) veya veri yoksa None
+        """
+        backtester = Backtester(self.config)
+        capital = backtester.initial_capital
+        position = 0.0
+        entry_price = 0.0
+        entry_bar = 0
+        daily_trades = 0
+        last_day = None
+
+        trades = []
+        holding_bars = []
+        exit_counts = {reason: 0 for reason in EXIT_REASONS}
+        accumulator = EquityMetricsAccumulator()
+        writer = EquityLogWriter(output_dir) if output_dir else None
+
+        confidence_threshold = None
+        spacing = None
+        day_counts = []  # Gün başına bar sayısı (yıllıklandırma için, gün başına tek sayı)
+        tz = None
+        n = 0
+        last_date, last_close = None, None
+
+        for chunk in chunks:
+            if confidence_threshold is None:
+                if volatility is None:
+                    volatility = chunk['close'].pct_change().dropna().std() * np.sqrt(252)
+                confidence_threshold = backtester.calculate_dynamic_confidence_threshold(symbol, volatility)
+                spacing = np.median(np.diff(epoch_ns(chunk.index))) / 1e9 / 86400 if len(chunk) > 1 else 1.0
+                tz = str(chunk.index.tz) if chunk.index.tz is not None else None
+
+            dates = chunk.index
+            day_numbers = epoch_ns(dates.normalize())
+            days = day_numbers.tolist()
+
+            # Parça sınırındaki gün önceki parçanın son gününe eklenir
+            chunk_days, counts = np.unique(day_numbers, return_counts=True)
+            counts = counts.tolist()
+            if day_counts and chunk_days[0] == last_day:
+                day_counts[-1] += counts.pop(0)
+            day_counts.extend(counts)
+            bars = zip(chunk['open'].tolist(), chunk['high'].tolist(), chunk['low'].tolist(),
+                       chunk['close'].tolist(), chunk['prediction'].tolist(), chunk['confidence'].tolist())
+
+            equity_log = np.zeros(len(chunk), dtype=EQUITY_DTYPE)
+            equity_log['time'] = epoch_ns(dates)
+            equity = equity_log['equity']
+            capital_column = equity_log['capital']
+            position_value = equity_log['position_value']
+            position_column = equity_log['position']
+
+            for i, (open_price, high, low, close, prediction, confidence) in enumerate(bars):
+                # Günlük işlem sayısı kontrolü
+                if days[i] != last_day:
+                    daily_trades = 0
+                    last_day = days[i]
+
+                if position > 0:
+                    exit_price, reason = self._exit_price(open_price, high, low, close, entry_price,
+                                                          backtester.stop_loss_pct, backtester.take_profit_pct)
+                    if exit_price is None and prediction == 0 and confidence > confidence_threshold:
+                        exit_price, reason = close, 'signal'
+
+                    if exit_price is not None:
+                        trade = backtester.execute_trade(dates[i], symbol, 'sell', exit_price, confidence, capital)
+                        if trade:
+                            capital = capital + (position * exit_price) - trade['costs']
+                            position = 0.0
+                            trades.append(trade)
+                            holding_bars.append(n + i - entry_bar)
+                            exit_counts[reason] += 1
+                            daily_trades += 1
+
+                elif daily_trades < backtester.max_daily_trades and prediction == 1 and confidence > confidence_threshold:
+                    trade = backtester.execute_trade(dates[i], symbol, 'buy', close, confidence, capital)
+                    if trade:
+                        capital = trade['capital_after']
+                        position = trade['quantity']
+                        entry_price = close
+                        entry_bar = n + i
+                        trades.append(trade)
+                        daily_trades += 1
+
+                equity[i] = capital + position * close if position > 0 else capital
+                capital_column[i] = capital
+                position_value[i] = position * close if position > 0 else 0
+                position_column[i] = position
+
+            accumulator.update(equity, position_value)
+            if writer:
+                writer.append(equity_log)
+            n += len(chunk)
+            last_date, last_close = dates[-1], chunk['close'].iloc[-1]
+
+        if n == 0:
+            logger.warning(f"Akış backtest için veri yok: {symbol}")
+            if writer:
+                writer.close()
+            return None
+
+        # Son pozisyonu kapat (Backtester ile aynı: son fiyat, 0.5 güven)
+        if position > 0:
+            trade = backtester.execute_trade(last_date, symbol, 'sell', last_close, 0.5, capital)
+            if trade:
+                capital = trade['capital_after']
+                trades.append(trade)
+                holding_bars.append(n - 1 - entry_bar)
+
+        trade_records = trades_to_array(trades, [symbol])
+        round_trips = pair_round_trips(trade_records)
+        round_trips['holding_bars'] = holding_bars[:len(round_trips)]
+
+        periods_per_year = periods_per_year_from_spacing(spacing, np.asarray(day_counts))
+        performance_metrics = accumulator.result(backtester.initial_capital, periods_per_year)
+        performance_metrics.update(trade_metrics(trade_records, round_trips))
+
+        results = {
+            'symbol': symbol,
+            'trades': trades,
+            'trade_records': trade_records,
+            'round_trips': round_trips,
+            'performance_metrics': performance_metrics,
+            'final_capital': capital,
+            'total_return': (capital - backtester.initial_capital) / backtester.initial_capital,
+            'bars': n,
+            'exit_counts': exit_counts,
+            'confidence_threshold': confidence_threshold
+        }
+
+        if writer:
+            writer.close()
+            write_trade_log(output_dir, trade_records, round_trips, [symbol], tz, results)
+            results['log_dir'] = output_dir
+
+        return results
+
+    def run_universe(self, symbols: List[str], signal_factory: Callable[[str], SignalFunc],
+                     interval: Optional[str] = None, save_logs: bool = True) -> Dict:
+        """
+        Hisse evrenini sırayla akış backtest'inden geçirir
+
+        Her hisse cache dosyasından parça parça okunur; bellekte aynı anda tek hissenin
+        tek parçası bulunur.
+
+        Args:
+            symbols: Hisse listesi
+            signal_factory: symbol -> SignalFunc
+            interval: Zaman dilimi (None = konfigürasyon)
+            save_logs: Equity/işlem kayıtları output_dir altına yazılsın mı
+
+        Returns:
+            'results' (hisse -> sonuç) ve 'summary' (hisse bazında metrik tablosu)
+        """
+        interval = interval or self.interval
+        data_loader = DataLoader(self.config)
+        start = time.perf_counter()
+
+        all_results = {}
+        for symbol in symbols:
+            path = data_loader.get_cache_path(symbol, interval)
+            if not os.path.exists(path):
+                logger.warning(f"Cache dosyası bulunamadı: {path}")
+                continue
+
+            chunks = with_signals(stream_bars(path, self.chunk_size), signal_factory(symbol), self.warmup)
+            output_dir = os.path.join(self.output_dir, f"{symbol.replace('.IS', '')}_{interval}") if save_logs else None
+            results = self.run_symbol(symbol, chunks, output_dir=output_dir)
+            if results:
+                all_results[symbol] = results
+
+        rows = []
+        for symbol, results in all_results.items():
+            metrics = results['performance_metrics']
+            rows.append({
+                'symbol': symbol,
+                'bars': results['bars'],
+                'total_return': results['total_return'],
+                'sharpe_ratio': metrics['sharpe_ratio'],
+                'max_drawdown': metrics['max_drawdown'],
+                'total_trades': metrics['total_trades'],
+                'win_rate': metrics['win_rate'],
+                **results['exit_counts']
+            })
+
+        logger.info(f"Akış backtest tamamlandı: {len(all_results)} hisse, "
+                    f"{sum(r['bars'] for r in all_results.values())} bar, {time.perf_counter() - start:.1f} sn")
+        return {'results': all_results, 'summary': pd.DataFrame(rows)}
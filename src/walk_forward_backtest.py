@@ -0,0 +1,153 @@
+"""
+Walk-Forward Backtest
+Model her kesimde o ana kadarki veriyle yeniden eğitilir, sonraki segment örneklem dışı tahmin edilip backtest edilir
+"""
+
+import os
+import time
+import logging
+import concurrent.futures
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score
+
+from backtest import Backtester
+from feature_engineering import get_prediction_horizon
+from model_train import StockDirectionPredictor, get_training_resources, walk_forward_segments
+
+logger = logging.getLogger(__name__)
+
+def _train_segment(config: Dict, X_train: pd.DataFrame, y_train: pd.Series, X_test: pd.DataFrame,
+                   n_jobs: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Worker: segment modelini kesime kadarki tüm barlarla eğitir ve test segmentini tahmin eder"""
+    predictor = StockDirectionPredictor(config, n_jobs=n_jobs)
+    predictor.fit_window(X_train, y_train)
+    return predictor.predict(X_test)
+
+class WalkForwardBacktester:
+    def __init__(self, config: Dict):
+        """
+        Periyodik yeniden eğitimli walk-forward backtest
+
+        Args:
+            config: Sistem konfigürasyonu (WALK_FORWARD_BACKTEST bölümü)
+        """
+        self.config = config
+        wf_config = config.get('WALK_FORWARD_BACKTEST', {}) or {}
+
+        self.retrain_every = wf_config.get('retrain_every', 21)
+        self.min_train = wf_config.get('min_train', 252)
+        self.mode = wf_config.get('mode', 'expanding')
+        self.window = wf_config.get('window', 500)
+        self.executor_type = wf_config.get('executor', 'process')
+        self.gap = get_prediction_horizon(config)
+
+        # Paralel segment sayısı thread bütçesini paylaşır (0 = tüm çekirdekler)
+        max_workers = wf_config.get('max_workers', 0) or os.cpu_count() or 1
+        self.resources = get_training_resources(config, parallel_jobs=max_workers)
+        self.max_workers = self.resources['parallel_symbols']
+
+    def _create_executor(self) -> concurrent.futures.Executor:
+        if self.executor_type == 'thread' or self.max_workers == 1:
+            return concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers)
+        return concurrent.futures.ProcessPoolExecutor(max_workers=self.max_workers)
+
+    def run(self, symbol_features: Dict[str, pd.DataFrame]) -> Dict[str, Dict]:
+        """
+        Walk-forward backtest çalıştırır
+
+        Özellikler hisse başına bir kez hesaplanmış olarak verilir ve tüm segmentlerde
+        aynı matrisin dilimleri kullanılır; tüm hisselerin segmentleri tek worker
+        havuzunda eğitilir.
+
+        Args:
+            symbol_features: symbol -> FeatureEngineer.create_all_features çıktısı
+
+        Returns:
+            symbol -> Backtester sonuçları + 'walk_forward' (segmentler, örneklem dışı isabet)
+        """
+        start = time.perf_counter()
+        prepared = {}
+        for symbol, features_df in symbol_features.items():
+            X, y = StockDirectionPredictor(self.config).prepare_data(features_df.copy())
+            segments = walk_forward_segments(len(X), self.retrain_every, self.min_train,
+                                             self.mode, self.window, self.gap)
+            if not segments:
+                logger.warning(f"{symbol}: walk-forward için yetersiz veri ({len(X)} bar, "
+                               f"en az {self.min_train + 1} gerekli)")
+                continue
+            prepared[symbol] = (X, y, segments)
+
+        if not prepared:
+            return {}
+
+        total_segments = sum(len(segments) for _, _, segments in prepared.values())
+        logger.info(f"Walk-forward backtest: {len(prepared)} hisse, {total_segments} segment, "
+                    f"{self.max_workers} worker ({self.mode}, her {self.retrain_every} barda yeniden eğitim)")
+
+        # Örneklem dışı tahminler (eğitilemeyen segmentte sinyal yok: tahmin -1, güven 0)
+        oos = {}
+        for symbol, (X, y, segments) in prepared.items():
+            n_oos = len(X) - segments[0][1].start
+            oos[symbol] = (np.full(n_oos, -1, dtype=np.int64), np.zeros((n_oos, 2)))
+
+        with self._create_executor() as executor:
+            futures = {}
+            for symbol, (X, y, segments) in prepared.items():
+                for number, (train_slice, test_slice) in enumerate(segments):
+                    future = executor.submit(_train_segment, self.config, X.iloc[train_slice], y.iloc[train_slice],
+                                             X.iloc[test_slice], self.resources['n_jobs'])
+                    futures[future] = (symbol, number)
+
+            for future in concurrent.futures.as_completed(futures):
+                symbol, number = futures[future]
+                X, y, segments = prepared[symbol]
+                test_slice = segments[number][1]
+                offset = segments[0][1].start
+                try:
+                    predictions, probabilities = future.result()
+                except Exception as e:
+                    logger.error(f"{symbol} segment {number + 1} eğitilemedi: {str(e)}")
+                    continue
+                oos[symbol][0][test_slice.start - offset:test_slice.stop - offset] = predictions
+                oos[symbol][1][test_slice.start - offset:test_slice.stop - offset] = probabilities
+
+        all_results = {}
+        for symbol, (X, y, segments) in prepared.items():
+            predictions, probabilities = oos[symbol]
+            oos_index = X.index[segments[0][1].start:]
+            y_oos = y.loc[oos_index].to_numpy()
+
+            segment_info = []
+            for train_slice, test_slice in segments:
+                offset = segments[0][1].start
+                segment_predictions = predictions[test_slice.start - offset:test_slice.stop - offset]
+                trained = bool((segment_predictions >= 0).all())
+                segment_info.append({
+                    'train_start': X.index[train_slice.start],
+                    'train_end': X.index[train_slice.stop - 1],
+                    'test_start': X.index[test_slice.start],
+                    'test_end': X.index[test_slice.stop - 1],
+                    'train_size': train_slice.stop - train_slice.start,
+                    'test_size': test_slice.stop - test_slice.start,
+                    'accuracy': accuracy_score(y.iloc[test_slice], segment_predictions) if trained else None
+                })
+
+            trained_mask = predictions >= 0
+            results = Backtester(self.config).run_backtest(symbol_features[symbol].loc[oos_index],
+                                                           predictions, probabilities, symbol)
+            results['walk_forward'] = {
+                'segments': segment_info,
+                'mode': self.mode,
+                'retrain_every': self.retrain_every,
+                'gap': self.gap,
+                'oos_start': oos_index[0],
+                'oos_accuracy': (float(accuracy_score(y_oos[trained_mask], predictions[trained_mask]))
+                                 if trained_mask.any() else None)
+            }
+            all_results[symbol] = results
+
+        logger.info(f"Walk-forward backtest tamamlandı: {time.perf_counter() - start:.1f} sn")
+        return all_results
@@ -0,0 +1,513 @@
+#!/usr/bin/env python3
+"""
+Backtest Motoru Testi
+Vektörel (NumPy durum makinesi) motorun satır satır motorla işlem/equity eşliğini ve hızını test eder
+(pytest ile veya betik olarak çalışır; önbellekte veri yoksa testler atlanır)
+"""
+
+import sys
+import os
+import copy
+import time
+import tempfile
+import yaml
+import logging
+
+import pytest
+import numpy as np
+import pandas as pd
+
+# Proje modüllerini import et
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from data_loader import DataLoader
+from feature_engineering import FeatureEngineer
+from model_train import StockDirectionPredictor, walk_forward_segments
+from backtest import Backtester
+from backtest_log import equity_frame, save_backtest_log, load_backtest_results
+from backtest_cache import BacktestCache
+from streaming_backtest import StreamingBacktester, stream_bars, with_signals
+from backtest_kernel import NUMBA_AVAILABLE
+from param_sweep import ParameterSweep, METRIC_COLUMNS
+from portfolio_backtest import PortfolioBacktester
+from robustness import MonteCarloAnalyzer, trade_pnl
+from first_passage import first_passage_periods
+from hit_time_table import HitTimeTable, hit_time_quantiles
+
+# Logging ayarları (yetersiz sermaye uyarıları stres testinde beklenir)
+logging.basicConfig(level=logging.ERROR)
+logging.getLogger('backtest').setLevel(logging.ERROR)
+logger = logging.getLogger(__name__)
+
+def load_config():
+    with open('config.yaml', 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f)
+
+def stress_config(config, max_position_size=0.5):
+    """Tüm çıkış türlerini (max_position_size≈1 ile yetersiz sermaye yolunu da) tetikleyen test config'i"""
+    config = copy.deepcopy(config)
+    config['BACKTEST_CONFIG']['commission_rate'] = 0.002
+    config['BACKTEST_CONFIG']['slippage_rate'] = 0.001
+    config['RISK_MANAGEMENT']['VOLATILITY_RISK_CONFIGS'] = {}
+    config['RISK_MANAGEMENT']['max_position_size'] = max_position_size
+    config['RISK_MANAGEMENT']['stop_loss_pct'] = 0.01
+    config['RISK_MANAGEMENT']['take_profit_pct'] = 0.015
+    config['RISK_MANAGEMENT']['max_daily_trades'] = 2
+    return config
+
+def random_signals(n, seed=42):
+    """Tekrarlanabilir rastgele tahmin ve olasılıklar"""
+    rng = np.random.default_rng(seed)
+    prob_up = rng.random(n)
+    probabilities = np.column_stack([1 - prob_up, prob_up])
+    predictions = (prob_up > 0.5).astype(int)
+    return predictions, probabilities
+
+def compare_results(loop_results, vector_results):
+    """İki motorun sonuçlarını karşılaştırır; fark varsa açıklama döndürür"""
+    loop_trades = loop_results['trades']
+    vector_trades = vector_results['trades']
+    if len(loop_trades) != len(vector_trades):
+        return f"işlem sayısı farklı ({len(loop_trades)} / {len(vector_trades)})"
+
+    for i, (a, b) in enumerate(zip(loop_trades, vector_trades)):
+        if a.keys() != b.keys():
+            return f"{i}. işlem alanları farklı"
+        for key in a:
+            if a[key] != b[key]:
+                return f"{i}. işlem '{key}' farklı: {a[key]} / {b[key]}"
+
+    try:
+        pd.testing.assert_frame_equal(loop_results['equity_curve'], vector_results['equity_curve'],
+                                      check_dtype=False, rtol=0, atol=0)
+    except AssertionError as e:
+        return f"equity eğrisi farklı: {str(e).splitlines()[0]}"
+
+    if loop_results['final_capital'] != vector_results['final_capital']:
+        return "son sermaye farklı"
+    if loop_results['performance_metrics'] != vector_results['performance_metrics']:
+        return "performans metrikleri farklı"
+    return None
+
+def run_both(config, data, predictions, probabilities, symbol):
+    loop_results = Backtester(config).run_backtest(data, predictions, probabilities, symbol, engine='loop')
+    vector_results = Backtester(config).run_backtest(data, predictions, probabilities, symbol, engine='vectorized')
+    return loop_results, vector_results
+
+def load_or_skip(config, symbol, interval="1d"):
+    """Önbellekteki veriyi yükler; veri yoksa testi atlar"""
+    data = DataLoader(config).load_cached_stock_data(symbol, "2y", interval=interval)
+    if data.empty:
+        pytest.skip(f"{symbol} ({interval}) verisi yüklenemedi")
+    return data
+
+def run_test(test_func):
+    """Testi betik olarak çalıştırır; assert hatası veya atlama başarısız sayılır"""
+    try:
+        test_func()
+        return True
+    except pytest.skip.Exception as e:
+        print(f"⏭️  Atlandı: {e}")
+    except AssertionError as e:
+        print(f"❌ {e}")
+    except Exception as e:
+        print(f"❌ Test hatası: {str(e)}")
+    return False
+
+def test_model_parity():
+    """Gerçek model tahminleriyle (günlük veri) eşlik testi"""
+    print("🔍 Model tahminleriyle eşlik testi...")
+
+    config = load_config()
+    config['BACKTEST_CONFIG']['commission_rate'] = 0.0015
+    config['BACKTEST_CONFIG']['slippage_rate'] = 0.0005
+
+    engineer = FeatureEngineer(config)
+    predictor = StockDirectionPredictor(config)
+
+    data = load_or_skip(config, "THYAO.IS")
+    features_df = engineer.create_all_features(data)
+    X, y = predictor.prepare_data(features_df)
+    predictor.train_model(X, y)
+    predictions, probabilities = predictor.predict(X)
+
+    loop_results, vector_results = run_both(config, features_df.loc[X.index], predictions,
+                                            probabilities, "THYAO.IS")
+    error = compare_results(loop_results, vector_results)
+    assert error is None, error
+
+    print(f"✅ {len(X)} bar, {len(loop_results['trades'])} işlem birebir aynı")
+
+def test_stress_parity():
+    """Saatlik veride stop-loss, take-profit, sinyal çıkışı, günlük limit ve yetersiz sermaye eşliği"""
+    print("\n🔍 Saatlik veri stres eşlik testi...")
+
+    base_config = load_config()
+    data = load_or_skip(base_config, "THYAO.IS", "1h")
+
+    for seed, max_position_size in [(1, 0.5), (2, 0.5), (3, 0.99)]:
+        config = stress_config(base_config, max_position_size)
+        predictions, probabilities = random_signals(len(data), seed)
+        loop_results, vector_results = run_both(config, data, predictions, probabilities, "THYAO.IS")
+        error = compare_results(loop_results, vector_results)
+        assert error is None, f"Seed {seed}: {error}"
+        print(f"   Seed {seed}, pozisyon %{max_position_size*100:.0f}: "
+              f"{len(loop_results['trades'])} işlem birebir aynı")
+
+    print(f"✅ {len(data)} bar, tüm senaryolarda eşlik sağlandı")
+
+def test_sweep_consistency():
+    """Parametre taraması satırlarının aynı parametrelerle Backtester sonuçlarıyla tutarlılığı"""
+    print("\n🔍 Parametre taraması tutarlılık testi...")
+
+    config = stress_config(load_config())
+    config['BACKTEST_SWEEP'] = {'max_workers': 2, 'rank_by': 'sharpe_ratio'}
+
+    sweep = ParameterSweep(config)
+    frames = {}
+    for symbol in ("THYAO.IS", "AKBNK.IS"):
+        data = load_or_skip(config, symbol, "1h")
+        predictions, probabilities = random_signals(len(data), seed=len(frames))
+        frames[symbol] = (data, predictions, probabilities)
+        sweep.add_symbol(data, predictions, probabilities, symbol)
+
+    grid = {'stop_loss_pct': [0.01, 0.03], 'take_profit_pct': [0.015, 0.05], 'confidence_threshold': [0.5, 0.7]}
+    combinations = sweep.build_combinations(grid, {'max_position_size': [0.1, 0.6]}, 3)
+    results = sweep.run(combinations)
+    assert len(results) == 2 * len(combinations), f"Beklenmeyen satır sayısı: {len(results)}"
+
+    for _, row in results.iterrows():
+        data, predictions, probabilities = frames[row['symbol']]
+        backtester = Backtester(config)
+        backtester.stop_loss_pct = row['stop_loss_pct']
+        backtester.take_profit_pct = row['take_profit_pct']
+        backtester.max_position_size = row['max_position_size']
+        backtester.max_daily_trades = row['max_daily_trades']
+        equity_log, trades, capital = backtester._run_vectorized(
+            data, predictions, np.max(probabilities, axis=1), row['symbol'], row['confidence_threshold'])
+        metrics = backtester._calculate_performance_metrics(equity_frame(equity_log, data.index), trades)
+        metrics['total_return'] = (capital - backtester.initial_capital) / backtester.initial_capital
+
+        for name in METRIC_COLUMNS:
+            assert np.isclose(row[name], metrics[name], rtol=1e-9, atol=1e-12), \
+                f"{row['symbol']} #{row['combination_id']} '{name}' farklı: {row[name]} / {metrics[name]}"
+
+    best = results[results['rank'] == 1]
+    print(f"✅ {len(combinations)} kombinasyon x 2 hisse Backtester ile tutarlı "
+          f"(en iyi Sharpe: {best['sharpe_ratio'].max():.2f})")
+
+def test_portfolio_invariants():
+    """Portföy backtest: nakit, günlük işlem sınırı ve sermaye mutabakatı"""
+    print("\n🔍 Portföy backtest testi...")
+
+    config = stress_config(load_config())
+    config['PORTFOLIO_BACKTEST'] = {'max_daily_trades': 3, 'use_volatility_buckets': False}
+    loader = DataLoader(config)
+
+    symbol_data = {}
+    for seed, symbol in enumerate(("THYAO.IS", "AKBNK.IS", "GARAN.IS", "ASELS.IS", "EREGL.IS")):
+        data = loader.load_cached_stock_data(symbol, "2y")
+        if data.empty:
+            continue
+        # Hisselerin takvimleri farklı olsun diye her birinden farklı sayıda bar atılır
+        data = data.iloc[seed * 10:]
+        predictions, probabilities = random_signals(len(data), seed)
+        symbol_data[symbol] = (data, predictions, probabilities)
+
+    if len(symbol_data) < 2:
+        pytest.skip("Portföy için yeterli hisse verisi yok")
+
+    results = PortfolioBacktester(config).run_backtest(symbol_data)
+    equity_df = results['equity_curve']
+    trades = pd.DataFrame(results['trades'])
+
+    assert not (equity_df['capital'] < -1e-6).any(), "Nakit negatife düştü"
+    assert np.allclose(equity_df['equity'], equity_df['capital'] + equity_df['position_value']), \
+        "Equity = nakit + pozisyon değeri sağlanmıyor"
+
+    buys_per_day = trades[trades['action'] == 'buy'].groupby(trades['date'].dt.normalize()).size()
+    assert not len(buys_per_day) or buys_per_day.max() <= 3, \
+        f"Günlük işlem sınırı aşıldı: {buys_per_day.max()}"
+
+    # Son sermaye = başlangıç - alış (büyüklük + maliyet) + satış (tutar - maliyet)
+    buys = trades[trades['action'] == 'buy']
+    sells = trades[trades['action'] == 'sell']
+    expected = (config['BACKTEST_CONFIG']['initial_capital']
+                - (buys['position_size'] + buys['costs']).sum()
+                + (sells['position_size'] - sells['costs']).sum())
+    assert np.isclose(expected, results['final_capital']), \
+        f"Sermaye mutabakatı tutmuyor: {expected} / {results['final_capital']}"
+    assert len(buys) == len(sells), "Açık pozisyon kaldı"
+
+    metrics = results['performance_metrics']
+    print(f"✅ {len(symbol_data)} hisse, {len(equity_df)} bar, {len(trades)} işlem, "
+          f"en fazla {metrics['max_open_positions']} açık pozisyon")
+
+def test_robustness():
+    """Monte Carlo analizi: kâr/zarar mutabakatı, gözlenen metrik eşliği ve hisse başına süre"""
+    print("\n🔍 Sağlamlık analizi testi...")
+
+    config = stress_config(load_config())
+    config['ROBUSTNESS'] = {'methods': ['block_bootstrap', 'trade_shuffle', 'trade_bootstrap'],
+                            'n_simulations': 2000}
+    analyzer = MonteCarloAnalyzer(config)
+
+    data = load_or_skip(config, "THYAO.IS", "1h")
+    predictions, probabilities = random_signals(len(data), 1)
+    backtester = Backtester(config)
+    results = backtester.run_backtest(data, predictions, probabilities, "THYAO.IS")
+
+    pnl = trade_pnl(results)
+    assert np.isclose(pnl.sum(), results['final_capital'] - backtester.initial_capital), \
+        "İşlem kâr/zararları son sermaye ile tutmuyor"
+
+    start = time.perf_counter()
+    analysis = analyzer.analyze(results, backtester.initial_capital)
+    elapsed = time.perf_counter() - start
+
+    observed = analysis['block_bootstrap']['observed']
+    metrics = results['performance_metrics']
+    assert np.isclose(observed['sharpe_ratio'], metrics['sharpe_ratio']) and \
+        np.isclose(observed['max_drawdown'], metrics['max_drawdown']), \
+        "Gözlenen metrikler backtest metrikleri ile tutmuyor"
+
+    for method, summary in analysis.items():
+        for name, interval in summary['intervals'].items():
+            assert interval['lower'] <= interval['median'] <= interval['upper'], \
+                f"{method} {name} aralığı geçersiz"
+
+    print(analyzer.format_report(analysis))
+    print(f"✅ {len(analysis)} yöntem x 2000 simülasyon: {elapsed:.2f} s")
+    assert elapsed < 1.0, f"Analiz hisse başına 1 saniyeyi aştı: {elapsed:.2f} s"
+
+def test_backtest_log():
+    """Kolonlu kayıtlar: yazılıp bellek eşlemeli okunan sonuç backtest ile aynı"""
+    print("\n🔍 Backtest kayıt testi...")
+
+    config = stress_config(load_config())
+    data = load_or_skip(config, "THYAO.IS", "1h")
+
+    predictions, probabilities = random_signals(len(data), 3)
+    results = Backtester(config).run_backtest(data, predictions, probabilities, "THYAO.IS")
+
+    with tempfile.TemporaryDirectory() as directory:
+        save_backtest_log(results, directory)
+        loaded = load_backtest_results(directory)
+
+        assert isinstance(loaded['equity_log'], np.memmap), "Equity kaydı bellek eşlemeli açılmadı"
+        expected = results['equity_curve'].set_axis(results['equity_curve'].index.as_unit('ns'))
+        pd.testing.assert_frame_equal(expected, loaded['equity_curve'],
+                                      check_dtype=False, check_freq=False, rtol=0, atol=0)
+        assert pd.DataFrame(results['trades']).to_dict('records') == loaded['trades'], "İşlem kayıtları farklı"
+        assert loaded['performance_metrics'] == results['performance_metrics'], "Metrikler farklı"
+        del loaded
+
+    print(f"✅ {len(results['equity_log'])} bar, {len(results['trades'])} işlem kayıttan aynen okundu")
+
+def test_backtest_cache():
+    """Backtest önbelleği: tekrar isteğe diskten yanıt, yeni/güncellenen bar veya modelde geçersizleşme"""
+    print("\n🔍 Backtest önbellek testi...")
+
+    config = stress_config(load_config())
+    data = load_or_skip(config, "THYAO.IS", "1h")
+
+    with tempfile.TemporaryDirectory() as directory:
+        config['BACKTEST_CACHE'] = {'enabled': True, 'cache_dir': os.path.join(directory, 'cache')}
+        model_path = os.path.join(directory, 'model.joblib')
+        with open(model_path, 'wb') as f:
+            f.write(b'model-v1')
+
+        runs = []
+        def run_func(frame):
+            def run():
+                runs.append(len(frame))
+                predictions, probabilities = random_signals(len(frame), 5)
+                return Backtester(config).run_backtest(frame, predictions, probabilities, "THYAO.IS")
+            return run
+
+        cache = BacktestCache(config)
+        first, cached_first = cache.get_or_run(model_path, "THYAO.IS", (data,), run_func(data))
+        second, cached_second = cache.get_or_run(model_path, "THYAO.IS", (data,), run_func(data))
+        assert not cached_first and cached_second and len(runs) == 1, "Tekrar isteği önbellekten gelmedi"
+        assert second['trades'] == first['trades'] and second['final_capital'] == first['final_capital'], \
+            "Önbellekteki sonuç farklı"
+
+        # Yeni bar: yeniden çalışır, eski filigranlı kayıt silinir
+        older = data.iloc[:-1]
+        cache.get_or_run(model_path, "THYAO.IS", (older,), run_func(older))
+        assert len(runs) == 2 and cache.get_stats()['entries'] == 1, "Yeni veri önbelleği geçersizleştirmedi"
+
+        # Son bar yerinde güncellendi (aynı zaman damgası ve bar sayısı): yeniden çalışır
+        revised = older.copy()
+        revised.iloc[-1, revised.columns.get_loc('close')] *= 1.01
+        cache.get_or_run(model_path, "THYAO.IS", (revised,), run_func(revised))
+        assert len(runs) == 3 and cache.get_stats()['entries'] == 1, "Güncellenen son bar önbelleği geçersizleştirmedi"
+
+        # Yeni model: yeniden çalışır
+        with open(model_path, 'wb') as f:
+            f.write(b'model-v2')
+        cache.get_or_run(model_path, "THYAO.IS", (revised,), run_func(revised))
+        assert len(runs) == 4, "Yeni model önbelleği geçersizleştirmedi"
+
+    print(f"✅ Önbellek isabet/ıska: {cache.hits}/{cache.misses}")
+
+def test_streaming_backtest():
+    """Akış backtest: kapanış bazlı çıkışta loop motoruyla aynı, sonuç parça boyutundan bağımsız"""
+    print("\n🔍 Akış backtest testi...")
+
+    config = stress_config(load_config())
+    loader = DataLoader(config)
+    data = load_or_skip(config, "THYAO.IS", "1h")
+
+    predictions, probabilities = random_signals(len(data), 1)
+    reference = Backtester(config).run_backtest(data, predictions, probabilities, "THYAO.IS", engine='loop')
+    volatility = data['close'].pct_change().dropna().std() * np.sqrt(252)
+
+    signal_table = pd.DataFrame({'prediction': predictions, 'up': probabilities[:, 1],
+                                 'down': probabilities[:, 0]}, index=data.index)
+    def signals(frame):
+        rows = signal_table.loc[frame.index]
+        return frame.index, rows['prediction'].to_numpy(), rows[['down', 'up']].to_numpy()
+
+    def run(chunk_size, intrabar_exits):
+        config['STREAMING_BACKTEST'] = {'chunk_size': chunk_size, 'warmup': 0, 'intrabar_exits': intrabar_exits}
+        chunks = with_signals(stream_bars(loader.get_cache_path("THYAO.IS", "1h"), chunk_size), signals, 0)
+        return StreamingBacktester(config).run_symbol("THYAO.IS", chunks, volatility=volatility)
+
+    closing = run(500, False)
+    assert closing['trades'] == reference['trades'] and closing['final_capital'] == reference['final_capital'], \
+        "Kapanış bazlı akış sonucu loop motorundan farklı"
+    for name, value in reference['performance_metrics'].items():
+        assert np.isclose(value, closing['performance_metrics'][name]), \
+            f"'{name}' farklı: {value} / {closing['performance_metrics'][name]}"
+
+    small, large = run(300, True), run(len(data), True)
+    assert small['trades'] == large['trades'] and small['final_capital'] == large['final_capital'], \
+        "Bar içi çıkışlı sonuç parça boyutuna bağlı"
+
+    print(f"✅ Kapanış bazlı {len(closing['trades'])} işlem aynı; bar içi çıkışlar {small['exit_counts']}")
+
+def loop_first_passage(close, targets, horizon, tolerance, direction=None, start=0, stop=None):
+    """Eski satır satır tarama (PriceTargetPredictor döngüleri) - çekirdek için referans"""
+    n = len(close)
+    stop = n if stop is None else stop
+    periods = np.full((len(targets), stop - start), -1, dtype=np.int64)
+    for i, target in enumerate(targets):
+        for j in range(start, stop):
+            for k in range(j + 1, min(j + horizon + 1, n)):
+                change = abs(close[k] - close[j]) / close[j]
+                move = 1 if close[k] > close[j] else 0
+                if (direction is None or move == direction) and abs(change - target) < target * tolerance:
+                    periods[i, j - start] = k - j
+                    break
+    return periods
+
+def test_walk_forward_segments():
+    """Walk-forward segmentleri: örtüşmeyen test, arındırma boşluğu, rolling pencere"""
+    print("\n🔍 Walk-forward segment testi...")
+
+    for mode, window in [("expanding", None), ("rolling", 100)]:
+        segments = walk_forward_segments(500, retrain_every=21, min_train=150, mode=mode, window=window, gap=5)
+        covered = np.concatenate([np.arange(test.start, test.stop) for _, test in segments])
+        assert np.array_equal(covered, np.arange(150, 500)), \
+            f"{mode}: test segmentleri kesimden sona kadar örtüşmeden kapsamıyor"
+        for train, test in segments:
+            assert train.stop + 5 == test.start, f"{mode}: arındırma boşluğu yanlış ({train.stop} -> {test.start})"
+            assert mode != "rolling" or train.stop - train.start <= window, \
+                f"rolling pencere aşıldı: {train.stop - train.start}"
+
+    print(f"✅ {len(segments)} segment, boşluk ve kapsama doğru")
+
+def test_first_passage():
+    """İlk geçiş çekirdeği ve hedef süre tablosu eski döngülerle aynı periyotları vermeli"""
+    print("\n🎯 İlk geçiş eşliği testi...")
+
+    rng = np.random.default_rng(7)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 400)))
+    close[150:160] = close[150]  # Yatay bölüm: değişim 0, yön aşağı/yatay sayılır
+    targets = [0.005, 0.01, 0.02, 0.05, 0.1]
+
+    # (ufuk, tolerans, başlangıç): hedef fiyat analizi ve son 100 bar analizi
+    for horizon, tolerance, start, series in [(99, 0.3, 0, close), (49, 0.1, 20, close[-100:])]:
+        stop = len(series) - 10
+        for direction in (None, 1, 0):
+            expected = loop_first_passage(series, targets, horizon, tolerance, direction, start, stop)
+            actual = first_passage_periods(series, targets, horizon, tolerance,
+                                           direction=direction, start=start, stop=stop)
+            assert np.array_equal(expected, actual), f"{horizon}/{tolerance} yön={direction}: çekirdek döngüden farklı"
+            assert (expected > 0).any(), f"{horizon}/{tolerance} yön={direction}: hiç hedefe ulaşılmadı"
+
+    # Tablo ızgara noktalarında döngüden hesaplanan yüzdeliklerle aynı olmalı
+    grid = np.array(targets)
+    table = HitTimeTable.build(close, grid)
+    for direction in (None, 1, 0):
+        periods = loop_first_passage(close, targets, 99, 0.3, direction, 0, len(close) - 10)
+        for i, target in enumerate(targets):
+            expected = hit_time_quantiles(periods[i])
+            actual = table.lookup(target, direction)
+            assert (expected is None) == (actual is None) and \
+                (expected is None or np.allclose(expected, actual)), \
+                f"Tablo yön={direction} hedef={target}: {actual} / {expected}"
+
+    print("✅ Çekirdek ve tablo iki konfigürasyonda, üç yönde döngüyle aynı")
+
+def test_benchmark():
+    """Çok yıllık saatlik veride motor hız karşılaştırması"""
+    print("\n⏱️  Hız testi...")
+
+    config = stress_config(load_config())
+    data = load_or_skip(config, "THYAO.IS", "1h")
+
+    # ~2 yıllık saatlik veriyi ardışık dönemlere kaydırarak ~8 yıla uzat
+    span = data.index[-1] - data.index[0] + pd.Timedelta(days=1)
+    long_data = pd.concat([data.set_axis(data.index + span * k) for k in range(4)])
+
+    print(f"   Numba: {'var' if NUMBA_AVAILABLE else 'yok (saf NumPy/Python çekirdek)'}")
+    for name, frame in [("2 yıl", data), ("8 yıl", long_data)]:
+        predictions, probabilities = random_signals(len(frame))
+        timings = {}
+        for engine in ('loop', 'vectorized'):
+            start = time.perf_counter()
+            Backtester(config).run_backtest(frame, predictions, probabilities, "THYAO.IS", engine=engine)
+            timings[engine] = time.perf_counter() - start
+        print(f"   {name} ({len(frame)} bar): loop {timings['loop']:.3f} s, "
+              f"vectorized {timings['vectorized']:.3f} s ({timings['loop'] / timings['vectorized']:.1f}x)")
+
+    print("✅ Hız ölçümü tamamlandı")
+
+def main():
+    """Ana test fonksiyonu"""
+    print("🚀 Backtest Motoru Testi")
+    print("=" * 60)
+
+    test_results = []
+    test_results.append(("Model Eşliği", run_test(test_model_parity)))
+    test_results.append(("Stres Eşliği", run_test(test_stress_parity)))
+    test_results.append(("Tarama Tutarlılığı", run_test(test_sweep_consistency)))
+    test_results.append(("Portföy Backtest", run_test(test_portfolio_invariants)))
+    test_results.append(("Sağlamlık Analizi", run_test(test_robustness)))
+    test_results.append(("Backtest Kayıtları", run_test(test_backtest_log)))
+    test_results.append(("Backtest Önbelleği", run_test(test_backtest_cache)))
+    test_results.append(("Akış Backtest", run_test(test_streaming_backtest)))
+    test_results.append(("Walk-Forward Segment", run_test(test_walk_forward_segments)))
+    test_results.append(("İlk Geçiş Eşliği", run_test(test_first_passage)))
+    test_results.append(("Hız", run_test(test_benchmark)))
+
+    print("\n" + "=" * 60)
+    print("📊 TEST SONUÇLARI")
+    print("=" * 60)
+
+    passed = 0
+    total = len(test_results)
+
+    for test_name, result in test_results:
+        status = "✅ BAŞARILI" if result else "❌ BAŞARISIZ"
+        print(f"{test_name:20} : {status}")
+        if result:
+            passed += 1
+
+    print("=" * 60)
+    print(f"Toplam: {passed}/{total} test başarılı")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Hedef Fiyat Testi
+Hedef süre tablosu önbelleğini, Monte Carlo hedef olasılıklarını ve toplu hedef hesabını test eder
+(pytest ile veya betik olarak çalışır)
+"""
+
+import sys
+import os
+import logging
+import yaml
+
+import pytest
+import numpy as np
+import pandas as pd
+
+# Proje modüllerini import et
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from data_loader import DataLoader
+from hit_time_table import HitTimeTableCache
+from price_target_predictor import PriceTargetPredictor
+from price_path_simulator import PricePathSimulator, first_passage_times
+
+# Logging ayarları
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+SYMBOLS = ["THYAO.IS", "AKBNK.IS", "GARAN.IS"]
+
+def load_config():
+    with open('config.yaml', 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f)
+
+def load_panel(config):
+    """Önbellekteki hisse verileri; veri yoksa testi atlar"""
+    loader = DataLoader(config)
+    panel = {symbol: loader.load_cached_stock_data(symbol, "2y") for symbol in SYMBOLS}
+    missing = [symbol for symbol, data in panel.items() if data.empty]
+    if missing:
+        pytest.skip(f"Veri yüklenemedi: {', '.join(missing)}")
+    # 50 bardan kısa veri hisse bazlı analize düşer
+    panel["SHORT.IS"] = panel[SYMBOLS[0]].tail(40)
+    return panel
+
+def assert_same(batch, single, path):
+    """İç içe sözlükleri karşılaştırır (sayılar göreli 1e-9 toleransla)"""
+    if isinstance(single, dict):
+        assert isinstance(batch, dict) and batch.keys() == single.keys(), f"{path}: anahtarlar farklı"
+        for key in single:
+            assert_same(batch[key], single[key], f"{path}.{key}")
+    elif isinstance(single, (float, np.floating)) and not isinstance(single, bool):
+        assert batch == pytest.approx(single, rel=1e-9, nan_ok=True), f"{path}: {batch} != {single}"
+    else:
+        assert batch == single, f"{path}: {batch} != {single}"
+
+def synthetic_prices(n=400, seed=7):
+    """Tekrarlanabilir rastgele yürüyüş kapanışları (günlük indeks)"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    index = pd.date_range("2023-01-02", periods=n, freq="B")
+    return pd.DataFrame({'open': close, 'high': close * 1.005, 'low': close * 0.995,
+                         'close': close, 'volume': 1000}, index=index)
+
+def run_test(test_func):
+    """Testi betik olarak çalıştırır; assert hatası veya atlama başarısız sayılır"""
+    try:
+        test_func()
+        return True
+    except pytest.skip.Exception as e:
+        print(f"⏭️  Atlandı: {e}")
+    except AssertionError as e:
+        print(f"❌ {e}")
+    except Exception as e:
+        print(f"❌ Test hatası: {str(e)}")
+    return False
+
+def test_hit_time_cache_invalidation():
+    """Hedef süre tablosu: aynı veride önbellekten, son bar güncellenince yeniden oluşturulur"""
+    print("🔍 Hedef süre tablosu önbellek testi...")
+
+    cache = HitTimeTableCache(np.geomspace(0.005, 0.4, 41))
+    data = synthetic_prices()
+
+    first = cache.get("TEST.IS", "1d", data)
+    assert cache.get("TEST.IS", "1d", data.copy()) is first, "Aynı veri için tablo yeniden oluşturuldu"
+
+    # Son bar aynı zaman damgası ve bar sayısıyla yeniden yazıldı
+    revised = data.copy()
+    revised.iloc[-1, revised.columns.get_loc('close')] *= 1.03
+    rebuilt = cache.get("TEST.IS", "1d", revised)
+    assert rebuilt is not first, "Güncellenen son bar eski tabloyu döndürdü"
+    assert cache.get_stats()['misses'] == 2 and cache.get_stats()['entries'] == 1, \
+        f"Beklenmeyen önbellek durumu: {cache.get_stats()}"
+
+    print(f"✅ Önbellek isabet/ıska: {cache.hits}/{cache.misses}")
+
+def simulation_inputs(data, prob_up=0.6):
+    """Yükseliş yönlü, giderek uzaklaşan üç hedef ve bir stop"""
+    price = float(data['close'].iloc[-1])
+    return {'TEST.IS': {
+        'close': data['close'].to_numpy(),
+        'current_price': price,
+        'prob_up': prob_up,
+        'targets': {'conservative': price * 1.03, 'moderate': price * 1.07, 'aggressive': price * 1.15},
+        'stop_loss': price * 0.95
+    }}
+
+def test_first_passage_times():
+    """İlk ulaşma barları: seviye başına tam matris taramasıyla aynı sonuç"""
+    print("🔍 İlk ulaşma barı testi...")
+
+    rng = np.random.default_rng(0)
+    levels = {'up': 0.03, 'zero': 0.0, 'far': 0.5, 'down': -0.04}
+    for horizon in (1, 7, 120):
+        paths = np.cumsum(rng.normal(0, 0.02, (horizon, 2000)).astype(np.float32), axis=0)
+        first = first_passage_times(paths, levels)
+        for name, level in levels.items():
+            hit = paths >= level if level >= 0 else paths <= level
+            expected = np.where(hit.any(axis=0), hit.argmax(axis=0), horizon)
+            assert np.array_equal(first[name], expected), f"{name} (horizon={horizon}) farklı"
+
+    print("✅ Birikimli uç değer + ikili arama tarama ile aynı")
+
+def test_simulation_monotonicity():
+    """Uzak hedefin olasılığı daha düşük, tahmini süresi daha uzun"""
+    print("🔍 Simülasyon monotonluk testi...")
+
+    data = synthetic_prices()
+    for method in ('bootstrap', 'gbm'):
+        simulator = PricePathSimulator({'PRICE_SIMULATION': {'method': method, 'n_paths': 5000}})
+        result = simulator.simulate(simulation_inputs(data))['TEST.IS']
+        assert result is not None, f"{method}: simülasyon sonucu yok"
+
+        targets = [result['targets'][name] for name in ('conservative', 'moderate', 'aggressive')]
+        probabilities = [target['probability'] for target in targets]
+        assert probabilities[0] > probabilities[1] > probabilities[2] > 0, \
+            f"{method}: olasılıklar azalmıyor {probabilities}"
+
+        medians = [target['eta_periods'][50] for target in targets]
+        assert medians[0] <= medians[1] <= medians[2], f"{method}: süreler artmıyor {medians}"
+        assert 0 < result['stop_probability'] < 1, f"{method}: stop olasılığı {result['stop_probability']}"
+
+        print(f"✅ {method}: olasılık {[round(p, 3) for p in probabilities]}, medyan süre {medians}")
+
+def test_simulation_seed():
+    """Aynı tohum aynı sonucu, farklı tohum farklı sonucu verir"""
+    print("🔍 Simülasyon tohum testi...")
+
+    data = synthetic_prices()
+    inputs = simulation_inputs(data)
+    config = {'PRICE_SIMULATION': {'n_paths': 5000, 'seed': 11}}
+
+    first = PricePathSimulator(config).simulate(inputs)
+    assert PricePathSimulator(config).simulate(inputs) == first, "Aynı tohum farklı sonuç verdi"
+
+    config['PRICE_SIMULATION']['seed'] = 12
+    assert PricePathSimulator(config).simulate(inputs) != first, "Farklı tohum aynı sonucu verdi"
+
+    print("✅ Simülasyon tohumla tekrarlanabilir")
+
+def test_chart_patterns_batch():
+    """Toplu grafik analizi hisse bazlı _analyze_chart_patterns ile aynı"""
+    print("🔍 Toplu grafik analizi testi...")
+
+    config = load_config()
+    panel = load_panel(config)
+    predictor = PriceTargetPredictor(config)
+
+    batch = predictor.analyze_chart_patterns_batch(panel)
+    assert list(batch) == list(panel), "Sonuç sırası panelden farklı"
+    for symbol, data in panel.items():
+        assert_same(batch[symbol], predictor._analyze_chart_patterns(data), symbol)
+        print(f"✅ {symbol}: {batch[symbol]['pattern']} / {batch[symbol]['trend_strength']}")
+
+def test_price_targets_batch():
+    """Toplu hedef fiyatlar hisse bazlı calculate_price_targets (simulate=False) ile aynı"""
+    print("🔍 Toplu hedef fiyat testi...")
+
+    config = load_config()
+    panel = load_panel(config)
+    predictor = PriceTargetPredictor(config)
+
+    predictions = [1, 0, 1, 1]
+    confidences = [0.72, 0.64, 0.3, 0.55]
+    volatilities = [data['close'].pct_change().std() * np.sqrt(252) for data in panel.values()]
+
+    batch = predictor.calculate_price_targets_batch(panel, predictions, confidences, volatilities, model_data={})
+    for i, (symbol, data) in enumerate(panel.items()):
+        single = predictor.calculate_price_targets(
+            data['close'].iloc[-1], predictions[i], confidences[i], volatilities[i], data, {}, symbol=symbol
+        )
+        assert single['simulation'] is None, "Hisse bazlı çağrı varsayılan olarak simülasyon yaptı"
+        assert_same({key: value for key, value in batch[symbol].items() if key != 'simulation'},
+                    {key: value for key, value in single.items() if key != 'simulation'}, symbol)
+
+        if predictor.simulator.enabled and len(data) > predictor.simulator.min_history:
+            assert batch[symbol]['simulation'] is not None, f"{symbol}: toplu simülasyon sonucu yok"
+        print(f"✅ {symbol}: orta hedef {batch[symbol]['targets']['moderate']:.2f}")
+
+def main():
+    """Ana test fonksiyonu"""
+    print("🚀 Hedef Fiyat Testi")
+    print("=" * 60)
+
+    test_results = []
+    test_results.append(("Süre Tablosu Önbelleği", run_test(test_hit_time_cache_invalidation)))
+    test_results.append(("İlk Ulaşma Barı", run_test(test_first_passage_times)))
+    test_results.append(("Simülasyon Monotonluğu", run_test(test_simulation_monotonicity)))
+    test_results.append(("Simülasyon Tohumu", run_test(test_simulation_seed)))
+    test_results.append(("Toplu Grafik Analizi", run_test(test_chart_patterns_batch)))
+    test_results.append(("Toplu Hedef Fiyat", run_test(test_price_targets_batch)))
+
+    print("\n" + "=" * 60)
+    print("📊 TEST SONUÇLARI")
+    print("=" * 60)
+
+    passed = 0
+    total = len(test_results)
+
+    for test_name, result in test_results:
+        status = "✅ BAŞARILI" if result else "❌ BAŞARISIZ"
+        print(f"{test_name:24} : {status}")
+        if result:
+            passed += 1
+
+    print("=" * 60)
+    print(f"Toplam: {passed}/{total} test başarılı")
+
+if __name__ == "__main__":
+    main()
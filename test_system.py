@@ -8,20 +8,41 @@ import sys
 import os
 import yaml
 import logging
+import tempfile
 from datetime import datetime
 
+import pytest
+import numpy as np
+import xgboost as xgb
+
 # Proje modüllerini import et
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
 from data_loader import DataLoader
 from feature_engineering import FeatureEngineer
 from model_train import StockDirectionPredictor
+from model_cache import get_model_cache
+from pooled_training import PooledTrainer
+from batch_inference import BatchPredictor
 from backtest import Backtester
 
 # Logging ayarları
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def run_test(test_func):
+    """assert ile yazılmış testi betik olarak çalıştırır; atlanan test başarısız sayılır"""
+    try:
+        test_func()
+        return True
+    except pytest.skip.Exception as e:
+        print(f"⏭️  Atlandı: {e}")
+    except AssertionError as e:
+        print(f"❌ {e}")
+    except Exception as e:
+        print(f"❌ Test hatası: {str(e)}")
+    return False
+
 def test_data_loading():
     """Veri yükleme testi"""
     print("🔍 Veri yükleme testi...")
@@ -145,6 +166,99 @@ def test_model_training():
         print(f"❌ Model eğitimi hatası: {str(e)}")
         return False
 
+def test_model_cache_scaler():
+    """Yüklenen modelin yeniden eğitimi önbellekteki scaler'ı değiştirmemeli"""
+    print("\n🧊 Model önbelleği scaler testi...")
+    
+    with open('config.yaml', 'r', encoding='utf-8') as f:
+        config = yaml.safe_load(f)
+    
+    loader = DataLoader(config)
+    engineer = FeatureEngineer(config)
+    
+    data = loader.load_cached_stock_data("THYAO.IS", "2y")
+    if data.empty:
+        pytest.skip("THYAO.IS verisi yüklenemedi")
+    
+    features_df = engineer.create_all_features(data)
+    predictor = StockDirectionPredictor(config)
+    X, y = predictor.prepare_data(features_df)
+    half = len(X) // 2
+    
+    with tempfile.TemporaryDirectory() as model_dir:
+        predictor.model_dir = model_dir
+        predictor.train_model(X.iloc[:half], y.iloc[:half])
+        model_path = predictor.save_model("scaler_test.joblib")
+        
+        # Yükle, farklı veriyle yeniden eğit, aynı yolu tekrar yükle
+        reloaded = StockDirectionPredictor(config)
+        assert reloaded.load_model(model_path), "Model yüklenemedi"
+        expected_mean = reloaded.scaler.mean_.copy()
+        expected_scale = reloaded.scaler.scale_.copy()
+        hits_before = get_model_cache().get_stats()['hits']
+        reloaded.train_model(X.iloc[half:], y.iloc[half:])
+        
+        again = StockDirectionPredictor(config)
+        assert again.load_model(model_path), "Model tekrar yüklenemedi"
+        assert get_model_cache().get_stats()['hits'] > hits_before, "İkinci yükleme önbellekten gelmedi"
+        assert np.array_equal(again.scaler.mean_, expected_mean) and \
+            np.array_equal(again.scaler.scale_, expected_scale), \
+            "Yeniden eğitim önbellekteki scaler'ı değiştirdi"
+    
+    print("✅ Önbellekteki scaler yeniden eğitimden etkilenmedi")
+
+def test_pooled_training():
+    """Havuzlu eğitim: harici bellekli ve bellek içi yolda tek model, hisse başına tahmin"""
+    print("\n🧺 Havuzlu eğitim testi...")
+    
+    with open('config.yaml', 'r', encoding='utf-8') as f:
+        config = yaml.safe_load(f)
+    
+    loader = DataLoader(config)
+    engineer = FeatureEngineer(config)
+    
+    features = {}
+    for symbol in ("THYAO.IS", "AKBNK.IS", "GARAN.IS"):
+        data = loader.load_cached_stock_data(symbol, "2y")
+        if not data.empty:
+            features[symbol] = engineer.create_all_features(data)
+    if len(features) < 2:
+        pytest.skip("Havuz için yeterli hisse verisi yok")
+    
+    for external in (True, False):
+        config['POOLED_TRAINING'] = {'memory_budget_mb': 64, 'symbol_feature': True,
+                                     'external_memory': external, 'keep_shards': False}
+        with tempfile.TemporaryDirectory() as directory:
+            predictor = StockDirectionPredictor(config)
+            predictor.model_dir = directory
+            trainer = PooledTrainer(config, predictor, shard_dir=directory)
+            try:
+                for symbol, features_df in features.items():
+                    assert trainer.add_symbol(symbol, features_df.copy()) > 0, f"{symbol} havuza eklenemedi"
+                results = trainer.train()
+            finally:
+                trainer.cleanup()
+            
+            assert results is not None, "Havuzlu eğitim sonuç döndürmedi"
+            # XGBoost 2.x'te harici bellek isteği bellek içi yola düşer
+            expected_external = external and hasattr(xgb, 'ExtMemQuantileDMatrix')
+            assert results['pooled']['external_memory'] == expected_external, "Harici bellek modu yanlış"
+            assert results['pooled']['symbols'] == list(features), "Havuzdaki hisseler eksik"
+            
+            model_path = predictor.save_model("pooled_test.joblib")
+            predictions = BatchPredictor(config).predict(
+                {symbol: features_df.copy() for symbol, features_df in features.items()},
+                model_paths={symbol: model_path for symbol in features}
+            )
+            for symbol in features:
+                result = predictions.get(symbol)
+                assert result is not None, f"{symbol} için tahmin dönmedi"
+                assert result['prediction'] in (0, 1) and 0.0 <= result['confidence'] <= 1.0, \
+                    f"{symbol} tahmini geçersiz: {result}"
+        
+        print(f"✅ Harici bellek {external}: {results['pooled']['rows']} satır, "
+              f"{len(features)} hissenin tahmini alındı")
+
 def test_backtesting():
     """Backtesting testi"""
     print("\n📈 Backtesting testi...")
@@ -219,6 +333,8 @@ def main():
     test_results.append(("Veri Yükleme", test_data_loading()))
     test_results.append(("Özellik Mühendisliği", test_feature_engineering()))
     test_results.append(("Model Eğitimi", test_model_training()))
+    test_results.append(("Scaler Önbelleği", run_test(test_model_cache_scaler)))
+    test_results.append(("Havuzlu Eğitim", run_test(test_pooled_training)))
     test_results.append(("Backtesting", test_backtesting()))
     
     # Sonuçları göster
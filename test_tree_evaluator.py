@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+NumPy Ağaç Değerlendirici Testi
+NumpyTreeEvaluator'ın XGBoost ile olasılık eşliğini (pytest) ve küçük batch gecikmesini test eder
+"""
+
+import sys
+import os
+import time
+import yaml
+import logging
+import functools
+
+import pytest
+import numpy as np
+
+# Proje modüllerini import et
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from data_loader import DataLoader
+from feature_engineering import FeatureEngineer
+from model_train import StockDirectionPredictor
+from tree_evaluator import NumpyTreeEvaluator
+
+# Logging ayarları
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+@functools.lru_cache(maxsize=1)
+def train_test_model():
+    """THYAO verisiyle model eğitir; (predictor, ölçeklenmiş X) döndürür (veri yoksa test atlanır)"""
+    with open('config.yaml', 'r', encoding='utf-8') as f:
+        config = yaml.safe_load(f)
+
+    loader = DataLoader(config)
+    engineer = FeatureEngineer(config)
+    predictor = StockDirectionPredictor(config)
+
+    data = loader.load_cached_stock_data("THYAO.IS", "1y")
+    if data.empty:
+        pytest.skip("THYAO.IS verisi yüklenemedi")
+
+    features_df = engineer.create_all_features(data)
+    X, y = predictor.prepare_data(features_df)
+    if X.empty:
+        pytest.skip("Model verisi hazırlanamadı")
+
+    predictor.train_model(X, y)
+    X_scaled = (X.to_numpy(dtype=np.float64) - predictor.scaler.mean_) / predictor.scaler.scale_
+    return predictor, X_scaled
+
+def test_probability_parity():
+    """Olasılık eşliği testi (margin bit düzeyinde, olasılık en fazla 1 ulp)"""
+    print("🔍 Olasılık eşliği testi...")
+
+    predictor, X_scaled = train_test_model()
+    evaluator = NumpyTreeEvaluator.from_model(predictor.model)
+    booster = predictor.model.get_booster()
+
+    # Eksik değer (default yön) yolunu da test et
+    X_missing = X_scaled.copy()
+    rng = np.random.default_rng(42)
+    X_missing[rng.random(X_missing.shape) < 0.05] = np.nan
+
+    for name, X in [("Tam veri", X_scaled), ("Eksik değerli", X_missing)]:
+        xgb_margin = booster.inplace_predict(X, predict_type='margin')
+        np_margin = evaluator.predict_margin(X)
+        assert np.array_equal(xgb_margin, np_margin), \
+            f"{name}: margin farklı ({np.sum(xgb_margin != np_margin)} satır)"
+
+        xgb_proba = predictor.model.predict_proba(X)
+        np_proba = evaluator.predict_proba(X)
+        # expf bazı girdilerde doğru yuvarlanmadığından en fazla 1 ulp fark kabul edilir
+        ulp_diff = np.abs(xgb_proba.view(np.int32) - np_proba.view(np.int32)).max()
+        assert ulp_diff <= 1, f"{name}: olasılık farkı {ulp_diff} ulp"
+
+        assert np.array_equal(predictor.model.predict(X), evaluator.predict(X)), f"{name}: sınıf tahminleri farklı"
+
+        exact = np.mean(xgb_proba == np_proba)
+        print(f"✅ {name}: {len(X)} satır, margin birebir, olasılık birebir oranı {exact:.2%}")
+
+    info = evaluator.get_info()
+    print(f"   Ağaç: {info['n_trees']}, Düğüm: {info['n_nodes']}, Derinlik: {info['max_depth']}")
+
+def check_latency(predictor, X_scaled):
+    """Tek satır / küçük batch gecikme karşılaştırması (predict_proba vs NumPy)"""
+    print("\n⏱️  Gecikme testi...")
+
+    try:
+        evaluator = NumpyTreeEvaluator.from_model(predictor.model)
+
+        def benchmark(func, X, repeats):
+            func(X)  # ısınma
+            start = time.perf_counter()
+            for _ in range(repeats):
+                func(X)
+            return (time.perf_counter() - start) / repeats * 1000
+
+        # NumPy maliyeti satırla doğrusal: ~30 satırdan sonra XGBoost daha hızlı (numpy_max_rows)
+        for batch_size in (1, 5, 16, 50):
+            X = X_scaled[-batch_size:]
+            xgb_ms = benchmark(predictor.model.predict_proba, X, 200)
+            np_ms = benchmark(evaluator.predict_proba, X, 200)
+            print(f"   {batch_size:3d} satır: XGBoost {xgb_ms:.3f} ms, NumPy {np_ms:.3f} ms "
+                  f"({xgb_ms / np_ms:.1f}x)")
+
+        print("✅ Gecikme ölçümü tamamlandı")
+        return True
+
+    except Exception as e:
+        print(f"❌ Gecikme testi hatası: {str(e)}")
+        return False
+
+def main():
+    """Ana test fonksiyonu"""
+    print("🚀 NumPy Ağaç Değerlendirici Testi")
+    print("=" * 60)
+
+    test_results = []
+    try:
+        test_probability_parity()
+        test_results.append(("Olasılık Eşliği", True))
+    except pytest.skip.Exception as e:
+        print(f"❌ Test modeli eğitilemedi: {e}")
+        return
+    except AssertionError as e:
+        print(f"❌ {e}")
+        test_results.append(("Olasılık Eşliği", False))
+
+    predictor, X_scaled = train_test_model()
+    test_results.append(("Gecikme", check_latency(predictor, X_scaled)))
+
+    print("\n" + "=" * 60)
+    print("📊 TEST SONUÇLARI")
+    print("=" * 60)
+
+    passed = 0
+    total = len(test_results)
+
+    for test_name, result in test_results:
+        status = "✅ BAŞARILI" if result else "❌ BAŞARISIZ"
+        print(f"{test_name:20} : {status}")
+        if result:
+            passed += 1
+
+    print("=" * 60)
+    print(f"Toplam: {passed}/{total} test başarılı")
+
+if __name__ == "__main__":
+    main()